@@ -0,0 +1,182 @@
+import asyncio
+import json
+import logging
+import time
+
+import asyncpg
+import numpy as np
+from pgvector.asyncpg import register_vector
+
+from config import Config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class AsyncDatabaseManager:
+    def __init__(self, storage_profile=None, pool_size=None):
+        """
+        Async, pooled read path for concurrent searches
+        
+        Queries go through an asyncpg pool of up to pool_size connections (DB_POOL_SIZE by
+        default). asyncpg prepares each distinct query once per connection and keeps the
+        statement in its cache, so repeated searches skip parsing and planning, and pgvector's
+        codecs send query vectors in binary instead of as text to be cast. The tables are
+        created and written by DatabaseManager; this class only reads them.
+        
+        Args:
+            storage_profile: Storage profile whose embeddings table is searched (default: STORAGE_PROFILE)
+            pool_size: Maximum number of pooled connections
+        """
+        self.storage_profile = Config.get_storage_profile(storage_profile)
+        self.embeddings_table = self.storage_profile["table"]
+        self.column_type = self.storage_profile["column_type"]
+        self.dimension = self.storage_profile["dimension"]
+        self.pool_size = max(1, pool_size or Config.DB_POOL_SIZE)
+        self.pool = None
+        self._connecting = None
+        self.stats = {
+            'searches': 0,
+            'search_time': 0.0
+        }
+        
+        if self.storage_profile["index"] == "binary":
+            # Hamming-distance candidates from the bit index, re-ranked by exact cosine distance
+            self.search_sql = f"""
+                SELECT
+                    d.id,
+                    d.filename,
+                    d.content,
+                    d.chunk_index,
+                    d.metadata,
+                    1 - (c.embedding <=> $1) as similarity
+                FROM (
+                    SELECT document_id, embedding
+                    FROM {self.embeddings_table}
+                    ORDER BY binary_quantize(embedding)::bit({self.dimension}) <~> $2::bit({self.dimension})
+                    LIMIT $3
+                ) c
+                JOIN documents d ON c.document_id = d.id
+                ORDER BY similarity DESC
+                LIMIT $4
+            """
+        else:
+            self.search_sql = f"""
+                SELECT
+                    d.id,
+                    d.filename,
+                    d.content,
+                    d.chunk_index,
+                    d.metadata,
+                    1 - (de.embedding <=> $1) as similarity
+                FROM {self.embeddings_table} de
+                JOIN documents d ON de.document_id = d.id
+                ORDER BY de.embedding <=> $1
+                LIMIT $2
+            """
+    
+    async def connect(self):
+        """Open the connection pool; concurrent callers share a single pool"""
+        if self._connecting is None:
+            self._connecting = asyncio.ensure_future(self._create_pool())
+        try:
+            await self._connecting
+        except Exception:
+            # Let the next call try again instead of failing forever
+            self._connecting = None
+            raise
+    
+    async def _create_pool(self):
+        start_time = time.time()
+        self.pool = await asyncpg.create_pool(
+            Config.DATABASE_URL,
+            min_size=1,
+            max_size=self.pool_size,
+            init=self._init_connection
+        )
+        logger.info(f"Async connection pool ready in {time.time() - start_time:.2f}s (up to {self.pool_size} connections)")
+    
+    async def _init_connection(self, connection):
+        """Per-connection codecs: pgvector types in binary, jsonb decoded to dicts as with psycopg2"""
+        await register_vector(connection)
+        await connection.set_type_codec('jsonb', encoder=json.dumps, decoder=json.loads, schema='pg_catalog')
+    
+    def fit_embedding_dimension(self, embedding):
+        """Truncate or zero-pad an embedding to the storage profile's dimension"""
+        embedding = np.asarray(embedding, dtype=np.float32)
+        if embedding.shape[0] > self.dimension:
+            return embedding[:self.dimension]
+        if embedding.shape[0] < self.dimension:
+            return np.concatenate([embedding, np.zeros(self.dimension - embedding.shape[0], dtype=np.float32)])
+        return embedding
+    
+    async def search_similar_documents(self, query_embedding, top_k=5):
+        """Search for similar documents using cosine similarity"""
+        await self.connect()
+        start_time = time.time()
+        query_embedding = self.fit_embedding_dimension(query_embedding)
+        try:
+            async with self.pool.acquire() as connection:
+                if self.storage_profile["index"] == "binary":
+                    candidates = min(1000, top_k * max(1, Config.BINARY_RERANK_FACTOR))
+                    query_bits = ((query_embedding > 0).astype(np.uint8) + ord('0')).tobytes().decode('ascii')
+                    # SET LOCAL needs a transaction; an HNSW scan returns at most ef_search rows
+                    async with connection.transaction():
+                        await connection.execute(f"SET LOCAL hnsw.ef_search = {max(40, candidates)}")
+                        rows = await connection.fetch(self.search_sql, query_embedding, asyncpg.BitString(query_bits),
+                                                      candidates, top_k)
+                else:
+                    rows = await connection.fetch(self.search_sql, query_embedding, top_k)
+        except Exception as e:
+            logger.error(f"Error searching documents: {e}")
+            raise
+        
+        search_time = time.time() - start_time
+        self.stats['searches'] += 1
+        self.stats['search_time'] += search_time
+        logger.debug(f"🔍 Async vector search: {len(rows)} results in {search_time:.4f}s")
+        return [dict(row) for row in rows]
+    
+    async def search_fulltext(self, query, top_k=5):
+        """Full-text search over documents.content_tsv, ranked by ts_rank_cd (see DatabaseManager.search_fulltext)"""
+        await self.connect()
+        start_time = time.time()
+        try:
+            async with self.pool.acquire() as connection:
+                rows = await connection.fetch("""
+                    SELECT
+                        d.id,
+                        d.filename,
+                        d.content,
+                        d.chunk_index,
+                        d.metadata,
+                        ts_rank_cd(d.content_tsv, q.query) as text_score
+                    FROM documents d,
+                         (SELECT replace(plainto_tsquery($1::text::regconfig, $2)::text, ' & ', ' | ')::tsquery AS query) q
+                    WHERE d.content_tsv @@ q.query
+                    ORDER BY text_score DESC, d.id
+                    LIMIT $3
+                """, Config.FULLTEXT_CONFIG, query, top_k)
+        except Exception as e:
+            logger.error(f"Error in full-text search: {e}")
+            raise
+        logger.debug(f"🔤 Async full-text search: {len(rows)} results in {time.time() - start_time:.4f}s")
+        return [dict(row) for row in rows]
+    
+    def get_stats(self):
+        """Pool size and search counters"""
+        return {
+            "pool_size": self.pool.get_size() if self.pool is not None else 0,
+            "pool_idle": self.pool.get_idle_size() if self.pool is not None else 0,
+            "pool_max_size": self.pool_size,
+            "searches": self.stats['searches'],
+            "avg_search_ms": self.stats['search_time'] / self.stats['searches'] * 1000 if self.stats['searches'] else 0.0
+        }
+    
+    async def close(self):
+        """Close the connection pool"""
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
+            self._connecting = None
+            logger.info("Async connection pool closed")
@@ -11,9 +11,24 @@ class Config:
     JINA_API_KEY = os.getenv("JINA_API_KEY")
     JINA_MODEL_NAME = "jina-embeddings-v4"  # 3.8B model with 2048 dimensions
     
-    # Vector dimensions for jina-embeddings-v4 (truncated to 2000 for PostgreSQL)
-    VECTOR_DIMENSION = 2048  # Original embedding dimension from jina-embeddings-v4
-    DB_VECTOR_DIMENSION = 2000  # Truncated dimension for PostgreSQL storage
+    # Vector storage profiles: dimensions requested from the API (None = all 2048), stored dimension,
+    # column type and index. Each profile has its own embeddings table, so profiles can be switched
+    # (missing embeddings are backfilled on the next upload) and benchmarked side by side.
+    STORAGE_PROFILES = {
+        "full": {"api_dimensions": None, "dimension": 2000, "column_type": "vector", "index": "hnsw"},  # Truncated to pgvector's 2000-dimension index limit
+        "halfvec": {"api_dimensions": None, "dimension": 2048, "column_type": "halfvec", "index": "hnsw"},  # float16, all dimensions; pgvector >= 0.7.0
+        "dim1024": {"api_dimensions": 1024, "dimension": 1024, "column_type": "vector", "index": "hnsw"},  # Jina Matryoshka dimensions
+        "dim512": {"api_dimensions": 512, "dimension": 512, "column_type": "vector", "index": "hnsw"},
+        "dim256": {"api_dimensions": 256, "dimension": 256, "column_type": "vector", "index": "hnsw"},
+        "binary": {"api_dimensions": None, "dimension": 2048, "column_type": "vector", "index": "binary"},  # Hamming index, float32 re-rank; pgvector >= 0.7.0
+    }
+    STORAGE_PROFILE = os.getenv("STORAGE_PROFILE", "full")
+    BINARY_RERANK_FACTOR = int(os.getenv("BINARY_RERANK_FACTOR", "10"))  # Hamming candidates re-ranked per requested result
+    
+    # Vector dimensions for jina-embeddings-v4 under the configured storage profile
+    MODEL_VECTOR_DIMENSION = 2048  # Full embedding dimension of jina-embeddings-v4
+    VECTOR_DIMENSION = STORAGE_PROFILES.get(STORAGE_PROFILE, {}).get("api_dimensions") or MODEL_VECTOR_DIMENSION  # Dimension returned by the API
+    DB_VECTOR_DIMENSION = STORAGE_PROFILES.get(STORAGE_PROFILE, STORAGE_PROFILES["full"])["dimension"]  # Dimension stored in PostgreSQL
     
     # Chunking configuration
     CHUNK_SIZE = 1000
@@ -21,3 +36,60 @@ class Config:
     
     # Search configuration
     TOP_K_RESULTS = 5
+    SEARCH_MODE = os.getenv("SEARCH_MODE", "vector")  # "vector", "text" (full-text only) or "hybrid" (both, fused by reciprocal rank)
+    HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "20"))  # Results taken from each leg before fusion
+    RRF_K = int(os.getenv("RRF_K", "60"))  # Reciprocal rank fusion constant: score = sum of 1 / (RRF_K + rank)
+    FULLTEXT_CONFIG = os.getenv("FULLTEXT_CONFIG", "english")  # PostgreSQL text search configuration for documents.content_tsv
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))  # Pooled connections shared by concurrent searches
+    
+    # Bulk ingestion configuration
+    BULK_INGESTION = os.getenv("BULK_INGESTION", "true").lower() == "true"
+    BULK_INSERT_METHOD = os.getenv("BULK_INSERT_METHOD", "copy")  # "copy" (binary COPY) or "values" (execute_values)
+    BULK_TRANSACTION_SIZE = int(os.getenv("BULK_TRANSACTION_SIZE", "5000"))  # Chunks per commit
+    BULK_INSERT_PAGE_SIZE = int(os.getenv("BULK_INSERT_PAGE_SIZE", "1000"))  # Rows per INSERT statement / COPY
+    
+    # Embedding client configuration
+    EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))  # Max texts per API request
+    EMBEDDING_MAX_BATCH_TOKENS = int(os.getenv("EMBEDDING_MAX_BATCH_TOKENS", "32000"))  # Estimated tokens per API request
+    EMBEDDING_CONCURRENCY = int(os.getenv("EMBEDDING_CONCURRENCY", "4"))  # Batches in flight at once
+    EMBEDDING_TIMEOUT = float(os.getenv("EMBEDDING_TIMEOUT", "120"))  # Seconds per API request
+    EMBEDDING_MAX_RETRIES = int(os.getenv("EMBEDDING_MAX_RETRIES", "5"))  # Retries on 429/5xx/network errors
+    EMBEDDING_MAX_BACKOFF = float(os.getenv("EMBEDDING_MAX_BACKOFF", "60"))  # Upper bound for one backoff sleep
+    
+    # Embedding cache configuration
+    EMBEDDING_CACHE = os.getenv("EMBEDDING_CACHE", "true").lower() == "true"
+    EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "embedding_cache.sqlite3")
+    EMBEDDING_CACHE_MAX_MB = float(os.getenv("EMBEDDING_CACHE_MAX_MB", "1024"))  # Least recently used rows evicted beyond this
+    QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "1024"))  # Query embeddings kept in memory
+    
+    # Search result cache configuration
+    RESULT_CACHE = os.getenv("RESULT_CACHE", "true").lower() == "true"
+    RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", "256"))  # Searches kept in memory, least recently used evicted
+    RESULT_CACHE_TTL = float(os.getenv("RESULT_CACHE_TTL", "300"))  # Seconds before a cached result expires
+    RESULT_CACHE_SIMILARITY = float(os.getenv("RESULT_CACHE_SIMILARITY", "0.95"))  # Query embedding cosine that reuses another query's results
+    
+    # Ingestion pipeline configuration
+    PDF_WORKERS = int(os.getenv("PDF_WORKERS", "0"))  # PDF extraction processes; 0 = one per CPU core
+    INGEST_BATCH_CHUNKS = int(os.getenv("INGEST_BATCH_CHUNKS", "256"))  # Chunks embedded and stored together
+    INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", "4"))  # Batches buffered between pipeline stages
+    INCREMENTAL_INGESTION = os.getenv("INCREMENTAL_INGESTION", "true").lower() == "true"  # Skip unchanged files, re-embed only changed chunks
+    
+    # Local search tier configuration
+    LOCAL_INDEX = os.getenv("LOCAL_INDEX", "false").lower() == "true"  # Search in-process, use Postgres only to fetch content
+    LOCAL_INDEX_DIR = os.getenv("LOCAL_INDEX_DIR", "local_index")
+    LOCAL_INDEX_DTYPE = os.getenv("LOCAL_INDEX_DTYPE", "float32")  # "float32", or "float16" for half the memory at some CPU cost per query
+    LOCAL_INDEX_NPROBE = int(os.getenv("LOCAL_INDEX_NPROBE", "16"))  # IVF lists searched per query
+    LOCAL_INDEX_IVF_MIN_VECTORS = int(os.getenv("LOCAL_INDEX_IVF_MIN_VECTORS", "20000"))  # Exact search below this size
+    LOCAL_INDEX_SYNC_INTERVAL = float(os.getenv("LOCAL_INDEX_SYNC_INTERVAL", "30"))  # Seconds between checks for new rows
+    
+    @classmethod
+    def get_storage_profile(cls, name=None):
+        """Settings of a storage profile (STORAGE_PROFILE by default) with its name and embeddings table"""
+        name = name or cls.STORAGE_PROFILE
+        if name not in cls.STORAGE_PROFILES:
+            raise ValueError(f"Unknown storage profile '{name}'. Choose one of: {', '.join(cls.STORAGE_PROFILES)}")
+        profile = dict(cls.STORAGE_PROFILES[name])
+        profile["name"] = name
+        # The default profile keeps the original table, so existing databases need no migration
+        profile["table"] = "document_embeddings" if name == "full" else f"document_embeddings_{name}"
+        return profile
@@ -1,9 +1,15 @@
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
+from psycopg2.pool import ThreadedConnectionPool
 import pgvector
 from config import Config
+from local_index import LocalVectorIndex
+from contextlib import contextmanager
+import io
 import logging
 import re
+import struct
+import threading
 import numpy as np
 import time
 import psutil
@@ -11,11 +17,78 @@ import psutil
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# PostgreSQL binary COPY framing: signature, flags, header extension length ... tuples ... -1 trailer
+PGCOPY_HEADER = b'PGCOPY\n\xff\r\n\x00' + struct.pack('>ii', 0, 0)
+PGCOPY_TRAILER = struct.pack('>h', -1)
+
+# Big-endian element type of each pgvector column type in binary COPY
+BINARY_ELEMENT_TYPES = {'vector': '>f4', 'halfvec': '>f2'}
+
+def encode_vector_binary(embedding: np.ndarray, column_type: str = 'vector') -> bytes:
+    """Encode an embedding in pgvector's binary format: int16 dimensions, int16 unused, big-endian float4 (float2 for halfvec) values"""
+    return struct.pack('>hh', embedding.shape[0], 0) + embedding.astype(BINARY_ELEMENT_TYPES[column_type]).tobytes()
+
+def vector_literal(embedding: np.ndarray) -> str:
+    """pgvector's text form '[x1,x2,...]', which the server parses far faster than a numeric[] array cast"""
+    return '[' + ','.join(map(str, embedding.tolist())) + ']'
+
+def version_tuple(version: str) -> tuple:
+    """(0, 7, 4) for '0.7.4'"""
+    return tuple(int(part) for part in re.findall(r'\d+', version))
+
+def iter_copy_binary_rows(data: bytes):
+    """Yield each row of a binary COPY TO STDOUT stream as a list of raw field values (None for NULL)"""
+    extension_length = struct.unpack_from('>i', data, 15)[0]
+    pos = 19 + extension_length
+    while True:
+        (field_count,) = struct.unpack_from('>h', data, pos)
+        pos += 2
+        if field_count == -1:
+            return
+        fields = []
+        for _ in range(field_count):
+            (length,) = struct.unpack_from('>i', data, pos)
+            pos += 4
+            if length == -1:
+                fields.append(None)
+                continue
+            fields.append(data[pos:pos + length])
+            pos += length
+        yield fields
+
 class DatabaseManager:
-    def __init__(self):
+    def __init__(self, storage_profile=None):
+        # The storage profile decides the embeddings table, its column type and dimension, and its index
+        self.storage_profile = Config.get_storage_profile(storage_profile)
+        self.embeddings_table = self.storage_profile["table"]
+        self.column_type = self.storage_profile["column_type"]
+        self.dimension = self.storage_profile["dimension"]
         self.connection = None
         self.connect()
         self.setup_database()
+        
+        # Searches borrow pooled connections, so concurrent searches (and the legs of a hybrid
+        # search) each run on their own connection; the pool is opened on first use
+        self.pool = None
+        self._pool_lock = threading.Lock()
+        self._pool_slots = threading.BoundedSemaphore(max(1, Config.DB_POOL_SIZE))
+        
+        # Optional in-process search tier; Postgres then only serves content by id
+        self.local_index = None
+        self.last_index_sync = 0.0
+        self._index_sync_lock = threading.Lock()
+        if Config.LOCAL_INDEX:
+            index_dir = Config.LOCAL_INDEX_DIR
+            if self.storage_profile["name"] != "full":
+                index_dir = f"{index_dir}_{self.storage_profile['name']}"
+            self.local_index = LocalVectorIndex(
+                index_dir,
+                dimension=self.dimension,
+                dtype=Config.LOCAL_INDEX_DTYPE,
+                nprobe=Config.LOCAL_INDEX_NPROBE,
+                ivf_min_vectors=Config.LOCAL_INDEX_IVF_MIN_VECTORS
+            )
+            self.sync_local_index()
     
     def connect(self):
         """Establish connection to PostgreSQL database"""
@@ -28,6 +101,24 @@ class DatabaseManager:
             logger.error(f"Error connecting to database: {e}")
             raise
     
+    @contextmanager
+    def pooled_connection(self):
+        """Borrow a pooled connection, waiting while all DB_POOL_SIZE connections are in use"""
+        if self.pool is None:
+            with self._pool_lock:
+                if self.pool is None:
+                    # minconn = maxconn: psycopg2 closes returned connections beyond minconn instead of keeping them
+                    size = max(1, Config.DB_POOL_SIZE)
+                    self.pool = ThreadedConnectionPool(size, size, Config.DATABASE_URL)
+        # ThreadedConnectionPool raises instead of waiting when it is exhausted
+        with self._pool_slots:
+            connection = self.pool.getconn()
+            try:
+                yield connection
+            finally:
+                # putconn rolls back the read-only transaction (and any SET LOCAL) before reuse
+                self.pool.putconn(connection)
+    
     def clean_text_for_db(self, text: str) -> str:
         """Clean text specifically for database insertion"""
         if not text:
@@ -51,9 +142,14 @@ class DatabaseManager:
         try:
             with self.connection.cursor() as cursor:
                 # Check if pgvector extension is available
-                cursor.execute("SELECT * FROM pg_extension WHERE extname = 'vector'")
-                if not cursor.fetchone():
+                cursor.execute("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+                extension = cursor.fetchone()
+                if not extension:
                     logger.warning("pgvector extension not found. Please ensure it's installed in your database.")
+                elif (self.column_type == "halfvec" or self.storage_profile["index"] == "binary") \
+                        and version_tuple(extension[0]) < (0, 7, 0):
+                    raise RuntimeError(f"Storage profile '{self.storage_profile['name']}' needs pgvector 0.7.0 or later "
+                                       f"(installed: {extension[0]})")
                 
                 # Create documents table
                 cursor.execute("""
@@ -67,29 +163,82 @@ class DatabaseManager:
                     )
                 """)
                 
-                # Create embeddings table with vector column (2000 dimensions for PostgreSQL)
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS document_embeddings (
+                # Create the storage profile's embeddings table (vector(2000) for the default profile)
+                cursor.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {self.embeddings_table} (
                         id SERIAL PRIMARY KEY,
                         document_id INTEGER REFERENCES documents(id) ON DELETE CASCADE,
-                        embedding vector(%s),
+                        embedding {self.column_type}(%s),
                         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                     )
-                """, (Config.DB_VECTOR_DIMENSION,))
+                """, (self.dimension,))
                 
                 # Create indexes for better performance
-                # Use HNSW indexing for 2000 dimensions (within Supabase limits)
-                cursor.execute("""
-                    CREATE INDEX IF NOT EXISTS idx_document_embeddings_vector 
-                    ON document_embeddings USING hnsw (embedding vector_cosine_ops)
+                # Use HNSW indexing (at most 2000 dimensions for vector, 4000 for halfvec)
+                if self.storage_profile["index"] == "binary":
+                    # Only the sign bits are indexed, compared by Hamming distance; search re-ranks with the float32 vectors
+                    index_expression = f"(binary_quantize(embedding)::bit({self.dimension})) bit_hamming_ops"
+                else:
+                    index_expression = f"embedding {self.column_type}_cosine_ops"
+                cursor.execute(f"""
+                    CREATE INDEX IF NOT EXISTS idx_{self.embeddings_table}_vector 
+                    ON {self.embeddings_table} USING hnsw ({index_expression})
                     WITH (m = 16, ef_construction = 64)
                 """)
                 
+                # Finds documents without an embedding in this profile, and speeds up cascading deletes
+                cursor.execute(f"""
+                    CREATE INDEX IF NOT EXISTS idx_{self.embeddings_table}_document_id 
+                    ON {self.embeddings_table}(document_id)
+                """)
+                
                 cursor.execute("""
                     CREATE INDEX IF NOT EXISTS idx_documents_filename 
                     ON documents(filename)
                 """)
                 
+                # Source file and text hash of each chunk, for incremental re-ingestion
+                cursor.execute("""
+                    ALTER TABLE documents
+                    ADD COLUMN IF NOT EXISTS file_path TEXT,
+                    ADD COLUMN IF NOT EXISTS content_hash TEXT
+                """)
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_documents_file_path 
+                    ON documents(file_path)
+                """)
+                # Rows stored before these columns existed carry their source path in metadata
+                cursor.execute("""
+                    UPDATE documents
+                    SET file_path = metadata->>'file_path',
+                        content_hash = encode(sha256(convert_to(content, 'UTF8')), 'hex')
+                    WHERE file_path IS NULL AND metadata ? 'file_path'
+                """)
+                
+                # Full-text search vector of each chunk, kept up to date by PostgreSQL itself
+                # (adding the column computes it for existing rows once)
+                cursor.execute("""
+                    ALTER TABLE documents
+                    ADD COLUMN IF NOT EXISTS content_tsv tsvector
+                    GENERATED ALWAYS AS (to_tsvector(%s::regconfig, content)) STORED
+                """, (Config.FULLTEXT_CONFIG,))
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_documents_content_tsv 
+                    ON documents USING gin (content_tsv)
+                """)
+                
+                # Registry of ingested files: unchanged files are skipped on the next upload
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS ingested_files (
+                        file_path TEXT PRIMARY KEY,
+                        size BIGINT NOT NULL,
+                        mtime DOUBLE PRECISION NOT NULL,
+                        content_hash TEXT NOT NULL,
+                        chunk_count INTEGER,
+                        ingested_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
+                
                 self.connection.commit()
                 logger.info("Database setup completed successfully")
                 
@@ -98,7 +247,7 @@ class DatabaseManager:
             self.connection.rollback()
             raise
     
-    def insert_document_chunk(self, filename, content, chunk_index, metadata=None):
+    def insert_document_chunk(self, filename, content, chunk_index, metadata=None, file_path=None, content_hash=None):
         """Insert a document chunk into the database"""
         try:
             # Clean the content before insertion
@@ -112,10 +261,10 @@ class DatabaseManager:
             
             with self.connection.cursor() as cursor:
                 cursor.execute("""
-                    INSERT INTO documents (filename, content, chunk_index, metadata)
-                    VALUES (%s, %s, %s, %s)
+                    INSERT INTO documents (filename, content, chunk_index, metadata, file_path, content_hash)
+                    VALUES (%s, %s, %s, %s, %s, %s)
                     RETURNING id
-                """, (cleaned_filename, cleaned_content, chunk_index, metadata))
+                """, (cleaned_filename, cleaned_content, chunk_index, metadata, file_path, content_hash))
                 
                 document_id = cursor.fetchone()[0]
                 self.connection.commit()
@@ -126,27 +275,31 @@ class DatabaseManager:
             self.connection.rollback()
             raise
     
+    def fit_embedding_dimension(self, embedding):
+        """Truncate or zero-pad an embedding to the database vector dimension"""
+        if embedding.shape[0] > self.dimension:
+            return embedding[:self.dimension]
+        if embedding.shape[0] < self.dimension:
+            padding = np.zeros(self.dimension - embedding.shape[0], dtype=np.float32)
+            return np.concatenate([embedding, padding])
+        return embedding
+    
     def insert_embedding(self, document_id, embedding):
         """Insert an embedding vector into the database"""
         try:
             # Ensure the embedding has the correct dimension for the database
-            if embedding.shape[0] != Config.DB_VECTOR_DIMENSION:
-                logger.warning(f"Embedding dimension mismatch. Expected {Config.DB_VECTOR_DIMENSION}, got {embedding.shape[0]}")
+            if embedding.shape[0] != self.dimension:
+                logger.warning(f"Embedding dimension mismatch. Expected {self.dimension}, got {embedding.shape[0]}")
                 # Truncate if too long, pad if too short
-                if embedding.shape[0] > Config.DB_VECTOR_DIMENSION:
-                    embedding = embedding[:Config.DB_VECTOR_DIMENSION]
-                else:
-                    # Pad with zeros if too short
-                    padding = np.zeros(Config.DB_VECTOR_DIMENSION - embedding.shape[0], dtype=np.float32)
-                    embedding = np.concatenate([embedding, padding])
+                embedding = self.fit_embedding_dimension(embedding)
             
             # Convert to list and ensure proper vector type
             embedding_list = embedding.tolist()
             
             with self.connection.cursor() as cursor:
-                cursor.execute("""
-                    INSERT INTO document_embeddings (document_id, embedding)
-                    VALUES (%s, %s::vector)
+                cursor.execute(f"""
+                    INSERT INTO {self.embeddings_table} (document_id, embedding)
+                    VALUES (%s, %s::{self.column_type})
                 """, (document_id, embedding_list))
                 
                 self.connection.commit()
@@ -156,8 +309,397 @@ class DatabaseManager:
             self.connection.rollback()
             raise
     
+    def insert_chunks_bulk(self, chunks, embeddings):
+        """
+        Insert document chunks and their embeddings in large batches
+        
+        Each transaction covers Config.BULK_TRANSACTION_SIZE chunks: documents go in
+        through multi-row INSERTs (execute_values) with ids taken from the sequence up
+        front, embeddings through binary COPY (or execute_values when
+        Config.BULK_INSERT_METHOD is "values"). A failed transaction skips only its own chunks.
+        
+        Args:
+            chunks: Dicts with 'filename', 'content', 'chunk_index' and optional 'metadata' (JSON string),
+                'file_path' and 'content_hash'
+            embeddings: One numpy vector per chunk, in the same order
+        
+        Returns:
+            (chunks_stored, chunks_skipped)
+        """
+        start_time = time.time()
+        rows = []
+        vectors = []
+        chunks_skipped = 0
+        for chunk, embedding in zip(chunks, embeddings):
+            cleaned_content = self.clean_text_for_db(chunk['content'])
+            if not cleaned_content:
+                logger.warning(f"Skipping empty chunk {chunk['chunk_index']} from {chunk['filename']}")
+                chunks_skipped += 1
+                continue
+            rows.append((self.clean_text_for_db(chunk['filename']), cleaned_content, chunk['chunk_index'],
+                         chunk.get('metadata'), chunk.get('file_path'), chunk.get('content_hash')))
+            vectors.append(self.fit_embedding_dimension(embedding))
+        
+        chunks_stored = 0
+        transaction_size = max(1, Config.BULK_TRANSACTION_SIZE)
+        for start in range(0, len(rows), transaction_size):
+            batch_rows = rows[start:start + transaction_size]
+            batch_vectors = vectors[start:start + transaction_size]
+            try:
+                with self.connection.cursor() as cursor:
+                    # Allocate ids first so each embedding is tied to its document without relying on RETURNING order
+                    cursor.execute(
+                        "SELECT nextval(pg_get_serial_sequence('documents', 'id')) FROM generate_series(1, %s)",
+                        (len(batch_rows),)
+                    )
+                    document_ids = [row[0] for row in cursor.fetchall()]
+                    execute_values(
+                        cursor,
+                        "INSERT INTO documents (id, filename, content, chunk_index, metadata, file_path, content_hash) VALUES %s",
+                        [(document_id,) + row for document_id, row in zip(document_ids, batch_rows)],
+                        page_size=Config.BULK_INSERT_PAGE_SIZE
+                    )
+                    self._insert_embeddings(cursor, document_ids, batch_vectors)
+                self.connection.commit()
+                chunks_stored += len(batch_rows)
+                logger.info(f"Stored {start + len(batch_rows)}/{len(rows)} chunks")
+            except Exception as e:
+                logger.error(f"Error in bulk insert of chunks {start}-{start + len(batch_rows) - 1}: {e}")
+                self.connection.rollback()
+                chunks_skipped += len(batch_rows)
+        
+        total_time = time.time() - start_time
+        rate = chunks_stored / total_time if total_time > 0 else 0.0
+        logger.info(f"📦 Bulk insert completed: {chunks_stored} chunks in {total_time:.2f}s ({rate:.0f} chunks/s)")
+        return chunks_stored, chunks_skipped
+    
+    def insert_embeddings(self, document_ids, embeddings):
+        """Store embeddings for documents that are already in the database (backfilling a storage profile)"""
+        try:
+            with self.connection.cursor() as cursor:
+                self._insert_embeddings(cursor, list(document_ids),
+                                        [self.fit_embedding_dimension(embedding) for embedding in embeddings])
+            self.connection.commit()
+        except Exception as e:
+            logger.error(f"Error inserting embeddings: {e}")
+            self.connection.rollback()
+            raise
+    
+    def get_documents_without_embeddings(self, after_id=0, limit=1000):
+        """(id, content) of documents with no embedding in this storage profile's table, in id order after after_id"""
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"""
+                SELECT d.id, d.content
+                FROM documents d
+                WHERE d.id > %s
+                  AND NOT EXISTS (SELECT 1 FROM {self.embeddings_table} de WHERE de.document_id = d.id)
+                ORDER BY d.id
+                LIMIT %s
+            """, (after_id, limit))
+            rows = cursor.fetchall()
+        self.connection.commit()
+        return rows
+    
+    def _insert_embeddings(self, cursor, document_ids, vectors):
+        """Insert embeddings with binary COPY, or execute_values when Config.BULK_INSERT_METHOD is "values" """
+        if Config.BULK_INSERT_METHOD == "copy":
+            self._copy_embeddings(cursor, document_ids, vectors)
+        else:
+            execute_values(
+                cursor,
+                f"INSERT INTO {self.embeddings_table} (document_id, embedding) VALUES %s",
+                [(document_id, vector.tolist()) for document_id, vector in zip(document_ids, vectors)],
+                template=f"(%s, %s::{self.column_type})",
+                page_size=Config.BULK_INSERT_PAGE_SIZE
+            )
+    
+    def _copy_embeddings(self, cursor, document_ids, vectors):
+        """Stream embeddings into the embeddings table with binary COPY, one page of rows per COPY"""
+        page_size = max(1, Config.BULK_INSERT_PAGE_SIZE)
+        for start in range(0, len(document_ids), page_size):
+            buffer = io.BytesIO()
+            buffer.write(PGCOPY_HEADER)
+            for document_id, vector in zip(document_ids[start:start + page_size], vectors[start:start + page_size]):
+                encoded = encode_vector_binary(vector, self.column_type)
+                # Two fields: int4 document_id, then the vector
+                buffer.write(struct.pack('>hii', 2, 4, document_id))
+                buffer.write(struct.pack('>i', len(encoded)))
+                buffer.write(encoded)
+            buffer.write(PGCOPY_TRAILER)
+            buffer.seek(0)
+            cursor.copy_expert(
+                f"COPY {self.embeddings_table} (document_id, embedding) FROM STDIN WITH (FORMAT binary)",
+                buffer
+            )
+    
+    def get_file_registry(self):
+        """All ingested files as {file_path: {'size', 'mtime', 'content_hash', 'chunk_count'}}"""
+        with self.connection.cursor(cursor_factory=RealDictCursor) as cursor:
+            cursor.execute("SELECT file_path, size, mtime, content_hash, chunk_count FROM ingested_files")
+            registry = {row['file_path']: dict(row) for row in cursor.fetchall()}
+        self.connection.commit()
+        return registry
+    
+    def get_stored_file_paths(self):
+        """Every distinct file path with stored chunks or a registry entry"""
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT file_path FROM documents WHERE file_path IS NOT NULL "
+                "UNION SELECT file_path FROM ingested_files"
+            )
+            paths = [row[0] for row in cursor.fetchall()]
+        self.connection.commit()
+        return paths
+    
+    def rename_files(self, renames):
+        """
+        Move chunks and registry entries from old to new file paths ({old path: new path})
+        
+        When a new path already has chunks, or several old paths map to it, the copy that was
+        there first is kept and the others are deleted. Returns how many chunks were deleted.
+        """
+        deleted = 0
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute("SELECT DISTINCT file_path FROM documents WHERE file_path = ANY(%s)",
+                               (list(set(renames.values())),))
+                taken = {row[0] for row in cursor.fetchall()}
+                cursor.execute("SELECT file_path FROM ingested_files WHERE file_path = ANY(%s)",
+                               (list(set(renames.values())),))
+                registered = {row[0] for row in cursor.fetchall()}
+                for old_path, new_path in sorted(renames.items()):
+                    if new_path in taken or new_path in registered:
+                        cursor.execute("DELETE FROM documents WHERE file_path = %s", (old_path,))
+                        deleted += cursor.rowcount
+                        cursor.execute("DELETE FROM ingested_files WHERE file_path = %s", (old_path,))
+                        continue
+                    cursor.execute(
+                        """
+                        UPDATE documents
+                        SET file_path = %s,
+                            metadata = CASE WHEN metadata ? 'file_path'
+                                            THEN jsonb_set(metadata, '{file_path}', to_jsonb(%s::text))
+                                            ELSE metadata END
+                        WHERE file_path = %s
+                        """,
+                        (new_path, new_path, old_path)
+                    )
+                    if cursor.rowcount:
+                        taken.add(new_path)
+                    cursor.execute("UPDATE ingested_files SET file_path = %s WHERE file_path = %s", (new_path, old_path))
+                    if cursor.rowcount:
+                        registered.add(new_path)
+            self.connection.commit()
+            logger.info(f"Re-keyed {len(renames)} stored file paths ({deleted} duplicate chunks deleted)")
+            return deleted
+        except Exception as e:
+            logger.error(f"Error renaming stored file paths: {e}")
+            self.connection.rollback()
+            raise
+    
+    def get_file_chunks(self, file_paths):
+        """Stored chunks of the given files as {file_path: [(document id, chunk_index, content_hash)]}"""
+        chunks = {}
+        if not file_paths:
+            return chunks
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT file_path, id, chunk_index, content_hash FROM documents WHERE file_path = ANY(%s) ORDER BY id",
+                (list(file_paths),)
+            )
+            for file_path, document_id, chunk_index, content_hash in cursor.fetchall():
+                chunks.setdefault(file_path, []).append((document_id, chunk_index, content_hash))
+        self.connection.commit()
+        return chunks
+    
+    def delete_files(self, file_paths):
+        """Delete every chunk of the given files (embeddings cascade) and their registry entries"""
+        if not file_paths:
+            return 0
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute("DELETE FROM documents WHERE file_path = ANY(%s)", (list(file_paths),))
+                deleted = cursor.rowcount
+                cursor.execute("DELETE FROM ingested_files WHERE file_path = ANY(%s)", (list(file_paths),))
+            self.connection.commit()
+            return deleted
+        except Exception as e:
+            logger.error(f"Error deleting files {file_paths}: {e}")
+            self.connection.rollback()
+            raise
+    
+    def apply_file_updates(self, updates):
+        """
+        Finish the re-ingestion of changed files in one transaction
+        
+        Args:
+            updates: Dicts with 'delete_ids' (stale chunk ids), 'reindex' ((id, chunk_index, metadata)
+                for kept chunks whose position may have moved) and 'fingerprint' (registry row to
+                upsert, or None to leave the file unregistered so the next upload retries it)
+        """
+        delete_ids = [document_id for update in updates for document_id in update['delete_ids']]
+        reindex = [row for update in updates for row in update['reindex']]
+        fingerprints = [update['fingerprint'] for update in updates if update['fingerprint'] is not None]
+        try:
+            with self.connection.cursor() as cursor:
+                if delete_ids:
+                    cursor.execute("DELETE FROM documents WHERE id = ANY(%s)", (delete_ids,))
+                if reindex:
+                    execute_values(
+                        cursor,
+                        """
+                        UPDATE documents AS d
+                        SET chunk_index = v.chunk_index, metadata = v.metadata::jsonb
+                        FROM (VALUES %s) AS v(id, chunk_index, metadata)
+                        WHERE d.id = v.id
+                        """,
+                        reindex,
+                        page_size=Config.BULK_INSERT_PAGE_SIZE
+                    )
+                if fingerprints:
+                    execute_values(
+                        cursor,
+                        """
+                        INSERT INTO ingested_files (file_path, size, mtime, content_hash, chunk_count)
+                        VALUES %s
+                        ON CONFLICT (file_path) DO UPDATE
+                        SET size = EXCLUDED.size, mtime = EXCLUDED.mtime, content_hash = EXCLUDED.content_hash,
+                            chunk_count = COALESCE(EXCLUDED.chunk_count, ingested_files.chunk_count),
+                            ingested_at = CURRENT_TIMESTAMP
+                        """,
+                        [(fp['file_path'], fp['size'], fp['mtime'], fp['content_hash'], fp.get('chunk_count'))
+                         for fp in fingerprints],
+                        page_size=Config.BULK_INSERT_PAGE_SIZE
+                    )
+            self.connection.commit()
+        except Exception as e:
+            logger.error(f"Error applying file updates: {e}")
+            self.connection.rollback()
+            raise
+    
+    def sync_local_index(self, wait=True):
+        """
+        Bring the local search tier up to date with the embeddings table (new rows and deleted documents)
+        
+        One sync runs at a time, on the manager's own connection. With wait=False the call
+        returns at once when another thread is already syncing.
+        """
+        if self.local_index is None:
+            return
+        if not self._index_sync_lock.acquire(blocking=wait):
+            return
+        try:
+            self._sync_local_index()
+        finally:
+            self._index_sync_lock.release()
+    
+    def _sync_local_index(self):
+        start_time = time.time()
+        index = self.local_index
+        # Searches trigger syncs, so they run on a pooled connection, never the one uploads write on;
+        # one repeatable-read transaction keeps the row count and the copied rows consistent
+        with self.pooled_connection() as connection:
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+                    cursor.execute(
+                        f"SELECT COALESCE(MAX(id), 0), COUNT(*), "
+                        f"COALESCE(pg_sequence_last_value(pg_get_serial_sequence(%s, 'id')), 0) FROM {self.embeddings_table}",
+                        (self.embeddings_table,)
+                    )
+                    max_id, total, last_issued_id = cursor.fetchone()
+                    # Deleting the newest rows (re-ingesting the last file) lowers MAX(id) but never the
+                    # id sequence; only a recreated table starts issuing ids below the watermark again
+                    if last_issued_id < index.watermark:
+                        logger.warning(f"{self.embeddings_table} was recreated; rebuilding the local index")
+                        index.reset()
+                    
+                    added = 0
+                    while max_id > index.watermark:
+                        # Embeddings come out in pgvector's binary format, avoiding text parsing of 2000 floats per row
+                        buffer = io.BytesIO()
+                        cursor.copy_expert(
+                            f"COPY (SELECT id, document_id, embedding FROM {self.embeddings_table} "
+                            f"WHERE id > {int(index.watermark)} ORDER BY id LIMIT {int(Config.BULK_TRANSACTION_SIZE)}) "
+                            f"TO STDOUT WITH (FORMAT binary)",
+                            buffer
+                        )
+                        row_ids, document_ids, vectors = [], [], []
+                        for row_id, document_id, embedding in iter_copy_binary_rows(buffer.getvalue()):
+                            row_ids.append(struct.unpack('>i', row_id)[0])
+                            if document_id is None or embedding is None:
+                                continue
+                            dimension = struct.unpack_from('>h', embedding)[0]
+                            document_ids.append(struct.unpack('>i', document_id)[0])
+                            vectors.append(np.frombuffer(embedding, dtype=BINARY_ELEMENT_TYPES[self.column_type], count=dimension, offset=4))
+                        if not row_ids:
+                            break
+                        if vectors:
+                            index.add(document_ids, np.stack(vectors), watermark=row_ids[-1])
+                        else:
+                            index.watermark = row_ids[-1]
+                        added += len(vectors)
+                    
+                    deleted = 0
+                    if total != index.live_count:
+                        live_before = index.live_count
+                        cursor.execute(f"SELECT document_id FROM {self.embeddings_table}")
+                        index.retain(row[0] for row in cursor.fetchall())
+                        deleted = max(0, live_before - index.live_count)
+                connection.commit()
+                index.commit()
+                self.last_index_sync = time.time()
+                if added or deleted:
+                    logger.info(f"🗂️ Local index synced in {time.time() - start_time:.2f}s: +{added} -{deleted} vectors ({index.live_count} total)")
+            except Exception as e:
+                logger.error(f"Error syncing local index: {e}")
+                connection.rollback()
+                raise
+    
+    def get_documents_by_ids(self, document_ids):
+        """Fetch document rows by id, in the order of document_ids"""
+        if not document_ids:
+            return []
+        with self.pooled_connection() as connection, connection.cursor(cursor_factory=RealDictCursor) as cursor:
+            cursor.execute("""
+                SELECT id, filename, content, chunk_index, metadata
+                FROM documents
+                WHERE id = ANY(%s)
+            """, (list(document_ids),))
+            rows = {row['id']: row for row in cursor.fetchall()}
+        return [rows[document_id] for document_id in document_ids if document_id in rows]
+    
+    def _search_local(self, query_embedding, top_k):
+        """Top-k search in the local index, hydrating the hits from Postgres"""
+        start_time = time.time()
+        if time.time() - self.last_index_sync > Config.LOCAL_INDEX_SYNC_INTERVAL:
+            # Concurrent searches do not queue behind a sync that another search started
+            self.sync_local_index(wait=False)
+        
+        step1_start = time.time()
+        hits = self.local_index.search(self.fit_embedding_dimension(query_embedding), top_k)
+        step1_time = time.time() - step1_start
+        
+        step2_start = time.time()
+        similarities = dict(hits)
+        results = self.get_documents_by_ids([document_id for document_id, _ in hits])
+        for result in results:
+            result['similarity'] = similarities[result['id']]
+        step2_time = time.time() - step2_start
+        
+        total_time = time.time() - start_time
+        logger.info("🔍 Local Search Performance Profile:")
+        logger.info(f"  ⏱️  Total time: {total_time:.4f}s")
+        logger.info(f"     - In-process vector search: {step1_time:.6f}s")
+        logger.info(f"     - Content fetch from PostgreSQL: {step2_time:.6f}s")
+        logger.info(f"  📈 Results found: {len(results)}")
+        return results
+    
     def search_similar_documents(self, query_embedding, top_k=5):
         """Search for similar documents using cosine similarity"""
+        if self.local_index is not None:
+            return self._search_local(query_embedding, top_k)
+        
         start_time = time.time()
         timings = {}
         
@@ -168,40 +710,43 @@ class DatabaseManager:
             
             # Step 1: Dimension adjustment timing
             step1_start = time.time()
-            if query_embedding.shape[0] != Config.DB_VECTOR_DIMENSION:
-                if query_embedding.shape[0] > Config.DB_VECTOR_DIMENSION:
-                    query_embedding = query_embedding[:Config.DB_VECTOR_DIMENSION]
+            if query_embedding.shape[0] != self.dimension:
+                if query_embedding.shape[0] > self.dimension:
+                    query_embedding = query_embedding[:self.dimension]
                 else:
-                    padding = np.zeros(Config.DB_VECTOR_DIMENSION - query_embedding.shape[0], dtype=np.float32)
+                    padding = np.zeros(self.dimension - query_embedding.shape[0], dtype=np.float32)
                     query_embedding = np.concatenate([query_embedding, padding])
             step1_time = time.time() - step1_start
             timings['dimension_adjustment'] = step1_time
             
             # Step 2: Vector conversion timing
             step2_start = time.time()
-            query_embedding_list = query_embedding.tolist()
+            query_vector = vector_literal(query_embedding)
             step2_time = time.time() - step2_start
             timings['vector_conversion'] = step2_time
             
             # Step 3: Database query timing
             step3_start = time.time()
-            with self.connection.cursor(cursor_factory=RealDictCursor) as cursor:
-                # Execute the search query
-                cursor.execute("""
-                    SELECT 
-                        d.id,
-                        d.filename,
-                        d.content,
-                        d.chunk_index,
-                        d.metadata,
-                        1 - (de.embedding <=> %s::vector) as similarity
-                    FROM document_embeddings de
-                    JOIN documents d ON de.document_id = d.id
-                    ORDER BY de.embedding <=> %s::vector
-                    LIMIT %s
-                """, (query_embedding_list, query_embedding_list, top_k))
-                
-                results = cursor.fetchall()
+            with self.pooled_connection() as connection, connection.cursor(cursor_factory=RealDictCursor) as cursor:
+                if self.storage_profile["index"] == "binary":
+                    results = self._search_binary(cursor, query_embedding, query_vector, top_k)
+                else:
+                    # Execute the search query
+                    cursor.execute(f"""
+                        SELECT 
+                            d.id,
+                            d.filename,
+                            d.content,
+                            d.chunk_index,
+                            d.metadata,
+                            1 - (de.embedding <=> %s::{self.column_type}) as similarity
+                        FROM {self.embeddings_table} de
+                        JOIN documents d ON de.document_id = d.id
+                        ORDER BY de.embedding <=> %s::{self.column_type}
+                        LIMIT %s
+                    """, (query_vector, query_vector, top_k))
+                    
+                    results = cursor.fetchall()
             step3_time = time.time() - step3_start
             timings['database_query'] = step3_time
             
@@ -227,6 +772,90 @@ class DatabaseManager:
             logger.error(f"Error searching documents: {e}")
             raise
     
+    def _search_binary(self, cursor, query_embedding, query_vector, top_k):
+        """
+        Binary-quantized search: Hamming-distance candidates from the bit index, re-ranked by exact cosine
+        
+        The query is quantized here the way binary_quantize() quantizes stored vectors (1 for positive values).
+        """
+        candidates = min(1000, top_k * max(1, Config.BINARY_RERANK_FACTOR))
+        query_bits = ((query_embedding > 0).astype(np.uint8) + ord('0')).tobytes().decode('ascii')
+        # An HNSW scan returns at most ef_search rows (1000 at most), so it must cover the candidate list
+        cursor.execute("SET LOCAL hnsw.ef_search = %s", (max(40, candidates),))
+        cursor.execute(f"""
+            SELECT 
+                d.id,
+                d.filename,
+                d.content,
+                d.chunk_index,
+                d.metadata,
+                1 - (c.embedding <=> %s::vector) as similarity
+            FROM (
+                SELECT document_id, embedding
+                FROM {self.embeddings_table}
+                ORDER BY binary_quantize(embedding)::bit({self.dimension}) <~> %s::bit({self.dimension})
+                LIMIT %s
+            ) c
+            JOIN documents d ON c.document_id = d.id
+            ORDER BY similarity DESC
+            LIMIT %s
+        """, (query_vector, query_bits, candidates, top_k))
+        return cursor.fetchall()
+    
+    def search_fulltext(self, query, top_k=5):
+        """
+        Full-text search over documents.content_tsv, ranked by ts_rank_cd
+        
+        Query terms are OR-ed, so a chunk matching only some of them (a program name or code in a
+        longer question) is still found; chunks matching more terms, closer together, rank higher.
+        """
+        start_time = time.time()
+        try:
+            with self.pooled_connection() as connection, connection.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("""
+                    SELECT 
+                        d.id,
+                        d.filename,
+                        d.content,
+                        d.chunk_index,
+                        d.metadata,
+                        ts_rank_cd(d.content_tsv, q.query) as text_score
+                    FROM documents d,
+                         (SELECT replace(plainto_tsquery(%s::regconfig, %s)::text, ' & ', ' | ')::tsquery AS query) q
+                    WHERE d.content_tsv @@ q.query
+                    ORDER BY text_score DESC, d.id
+                    LIMIT %s
+                """, (Config.FULLTEXT_CONFIG, query, top_k))
+                results = cursor.fetchall()
+            logger.info(f"🔤 Full-text search: {len(results)} results in {time.time() - start_time:.4f}s")
+            return results
+        except Exception as e:
+            logger.error(f"Error in full-text search: {e}")
+            raise
+    
+    def get_storage_stats(self):
+        """Row count and on-disk size of this storage profile's embeddings table and its indexes"""
+        try:
+            # Stats are read while uploads may be writing, so they use a pooled connection
+            with self.pooled_connection() as connection, connection.cursor() as cursor:
+                cursor.execute(
+                    f"SELECT COUNT(*), pg_table_size(%s::regclass), pg_indexes_size(%s::regclass) FROM {self.embeddings_table}",
+                    (self.embeddings_table, self.embeddings_table)
+                )
+                vectors, table_bytes, index_bytes = cursor.fetchone()
+        except Exception as e:
+            logger.error(f"Error getting storage stats: {e}")
+            return {}
+        return {
+            "profile": self.storage_profile["name"],
+            "table": self.embeddings_table,
+            "column": f"{self.column_type}({self.dimension})",
+            "vectors": vectors,
+            "table_bytes": table_bytes,
+            "index_bytes": index_bytes,
+            "bytes_per_vector": (table_bytes + index_bytes) / vectors if vectors else 0.0
+        }
+    
     def get_document_count(self):
         """Get total number of documents in the database"""
         try:
@@ -239,6 +868,8 @@ class DatabaseManager:
     
     def close(self):
         """Close database connection"""
+        if self.pool is not None:
+            self.pool.closeall()
         if self.connection:
             self.connection.close()
             logger.info("Database connection closed")
@@ -1,13 +1,28 @@
 import PyPDF2
+import hashlib
 import os
 import re
-from typing import List, Dict, Any
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from config import Config
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def text_hash(text: str) -> str:
+    """SHA-256 of a chunk's text, used to recognise chunks that are already stored"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def file_fingerprint(path: str) -> Dict[str, Any]:
+    """Path, size, mtime and SHA-256 of a file's bytes"""
+    stat = os.stat(path)
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1024 * 1024), b''):
+            digest.update(block)
+    return {'file_path': path, 'size': stat.st_size, 'mtime': stat.st_mtime, 'content_hash': digest.hexdigest()}
+
 class DocumentProcessor:
     def __init__(self):
         self.chunk_size = Config.CHUNK_SIZE
@@ -31,27 +46,30 @@ class DocumentProcessor:
         
         return text
     
+    def iter_pdf_pages(self, pdf_path: str) -> Iterator[Tuple[int, str]]:
+        """Yield (page number, cleaned text) for each page of a PDF that has text"""
+        with open(pdf_path, 'rb') as file:
+            pdf_reader = PyPDF2.PdfReader(file)
+            for page_num, page in enumerate(pdf_reader.pages):
+                page_text = page.extract_text()
+                if page_text:
+                    # Clean the page text
+                    cleaned_text = self.clean_text(page_text)
+                    if cleaned_text:
+                        yield page_num + 1, cleaned_text
+    
     def extract_text_from_pdf(self, pdf_path: str) -> str:
         """Extract text content from a PDF file"""
         try:
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                text = ""
-                
-                for page_num, page in enumerate(pdf_reader.pages):
-                    page_text = page.extract_text()
-                    if page_text:
-                        # Clean the page text
-                        cleaned_text = self.clean_text(page_text)
-                        if cleaned_text:
-                            text += f"\n--- Page {page_num + 1} ---\n{cleaned_text}\n"
-                
-                # Final cleaning of the entire text
-                text = self.clean_text(text)
-                
-                logger.info(f"Successfully extracted and cleaned text from {pdf_path}")
-                return text
-                
+            # Pages are joined once at the end instead of growing one string page by page
+            parts = [f"\n--- Page {page_num} ---\n{page_text}\n" for page_num, page_text in self.iter_pdf_pages(pdf_path)]
+            
+            # Final cleaning of the entire text
+            text = self.clean_text("".join(parts))
+            
+            logger.info(f"Successfully extracted and cleaned text from {pdf_path}")
+            return text
+            
         except Exception as e:
             logger.error(f"Error extracting text from {pdf_path}: {e}")
             raise
@@ -123,20 +141,85 @@ class DocumentProcessor:
             logger.error(f"Error processing document {pdf_path}: {e}")
             raise
     
+    def list_pdf_files(self, directory_path: str) -> List[str]:
+        """
+        Paths of the PDF files in a directory
+        
+        Paths are resolved (absolute, symlinks followed), so the same file gets the same path
+        in the file registry however the directory was spelled.
+        """
+        directory_path = os.path.realpath(directory_path)
+        return [os.path.join(directory_path, filename) for filename in sorted(os.listdir(directory_path))
+                if filename.lower().endswith('.pdf')]
+    
+    def iter_pdf_documents(self, pdf_paths: List[str], known_hashes: Dict[str, str] = None,
+                           failed_files: List[str] = None) -> Iterator[Tuple[Dict[str, Any], Optional[List[Dict[str, Any]]]]]:
+        """
+        Stream (fingerprint, chunks) for each PDF, extracting files in parallel
+        
+        PDFs are parsed in a process pool of PDF_WORKERS processes (one per CPU core by default).
+        At most two files per worker are in flight, so memory depends on document size, not on
+        how many documents there are. Results arrive in completion order. chunks is None when the
+        file's content hash equals known_hashes[path] (the file was touched but not changed).
+        Files that fail are logged, appended to failed_files and skipped.
+        """
+        if not pdf_paths:
+            return
+        known_hashes = known_hashes or {}
+        
+        workers = min(Config.PDF_WORKERS or os.cpu_count() or 1, len(pdf_paths))
+        max_in_flight = workers * 2
+        remaining = iter(pdf_paths)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            in_flight = {}
+            while True:
+                # Keep the pool fed without queueing every file up front
+                while len(in_flight) < max_in_flight:
+                    pdf_path = next(remaining, None)
+                    if pdf_path is None:
+                        break
+                    future = executor.submit(_process_pdf_worker, pdf_path, known_hashes.get(pdf_path))
+                    in_flight[future] = pdf_path
+                if not in_flight:
+                    break
+                
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pdf_path = in_flight.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        logger.error(f"Error processing document {pdf_path}: {e}")
+                        if failed_files is not None:
+                            failed_files.append(pdf_path)
+                        continue
+                    yield result
+    
+    def iter_pdf_directory(self, directory_path: str, failed_files: List[str] = None) -> Iterator[Dict[str, Any]]:
+        """Stream the chunks of every PDF in a directory (see iter_pdf_documents)"""
+        total_chunks = 0
+        for _, chunks in self.iter_pdf_documents(self.list_pdf_files(directory_path), failed_files=failed_files):
+            total_chunks += len(chunks)
+            yield from chunks
+        
+        logger.info(f"Processed {total_chunks} total chunks from directory {directory_path}")
+    
     def process_pdf_directory(self, directory_path: str) -> List[Dict[str, Any]]:
         """Process all PDF files in a directory"""
-        all_chunks = []
-        
         try:
-            for filename in os.listdir(directory_path):
-                if filename.lower().endswith('.pdf'):
-                    pdf_path = os.path.join(directory_path, filename)
-                    chunks = self.process_pdf_document(pdf_path)
-                    all_chunks.extend(chunks)
-            
-            logger.info(f"Processed {len(all_chunks)} total chunks from directory {directory_path}")
-            return all_chunks
+            return list(self.iter_pdf_directory(directory_path))
             
         except Exception as e:
             logger.error(f"Error processing directory {directory_path}: {e}")
             raise
+
+
+def _process_pdf_worker(pdf_path: str, known_hash: Optional[str] = None):
+    """Process-pool entry point: fingerprint one PDF and, unless its content is known, extract and chunk it"""
+    fingerprint = file_fingerprint(pdf_path)
+    if known_hash is not None and fingerprint['content_hash'] == known_hash:
+        return fingerprint, None
+    chunks = DocumentProcessor().process_pdf_document(pdf_path)
+    for chunk in chunks:
+        chunk['text_hash'] = text_hash(chunk['content'])
+    return fingerprint, chunks
@@ -0,0 +1,199 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Keys are looked up this many at a time (SQLite caps bound parameters per statement)
+LOOKUP_CHUNK = 500
+# Eviction trims the store to this fraction of its size limit so it does not run on every write
+EVICTION_TARGET = 0.9
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form of a text for cache keys: NFC, whitespace runs collapsed, trimmed"""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def text_hash(text: str) -> str:
+    """SHA-256 of the normalized text"""
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    def __init__(self, path, model, dimension, max_size_mb=1024, query_cache_size=1024):
+        """
+        Persistent embedding cache keyed by (model, dimension, normalized text hash)
+        
+        Embeddings are stored as float32 blobs in SQLite; query embeddings are also
+        kept in an in-process LRU. The least recently used rows are evicted once the
+        stored embeddings exceed max_size_mb.
+        """
+        self.path = path
+        self.model = model
+        self.dimension = dimension
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+        self.query_cache_size = query_cache_size
+        self._queries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'query_hits': 0,
+            'query_misses': 0,
+            'evictions': 0
+        }
+        
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                dimension INTEGER NOT NULL,
+                text_hash TEXT NOT NULL,
+                embedding BLOB NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, dimension, text_hash)
+            ) WITHOUT ROWID
+        """)
+        self.connection.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used_idx ON embeddings (last_used)")
+        self.connection.commit()
+        self.size_bytes, self.entries = self._measure()
+        logger.info(f"Embedding cache opened at {path} ({self.entries} entries, {self.size_bytes / 1024 / 1024:.1f} MB)")
+    
+    def _measure(self):
+        row = self.connection.execute("SELECT COALESCE(SUM(length(embedding)), 0), COUNT(*) FROM embeddings").fetchone()
+        return row[0], row[1]
+    
+    def get_many(self, texts):
+        """Cached embeddings aligned with texts, None for misses"""
+        hashes = [text_hash(text) for text in texts]
+        found = {}
+        with self._lock:
+            unique = list(dict.fromkeys(hashes))
+            for start in range(0, len(unique), LOOKUP_CHUNK):
+                chunk = unique[start:start + LOOKUP_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self.connection.execute(
+                    f"SELECT text_hash, embedding FROM embeddings "
+                    f"WHERE model = ? AND dimension = ? AND text_hash IN ({placeholders})",
+                    [self.model, self.dimension] + chunk
+                )
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32).copy()
+            if found:
+                now = time.time()
+                self.connection.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND dimension = ? AND text_hash = ?",
+                    [(now, self.model, self.dimension, key) for key in found]
+                )
+                self.connection.commit()
+            results = [found.get(key) for key in hashes]
+            hits = sum(1 for result in results if result is not None)
+            self.stats['hits'] += hits
+            self.stats['misses'] += len(results) - hits
+        return results
+    
+    def put_many(self, texts, embeddings):
+        """Store embeddings for texts, evicting least recently used rows when over the size limit"""
+        now = time.time()
+        rows = {}
+        for text, embedding in zip(texts, embeddings):
+            if embedding is not None:
+                rows[text_hash(text)] = np.asarray(embedding, dtype=np.float32).tobytes()
+        if not rows:
+            return
+        with self._lock:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, dimension, text_hash, embedding, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(self.model, self.dimension, key, blob, now) for key, blob in rows.items()]
+            )
+            self.connection.commit()
+            # Replaced rows are counted twice until the next eviction re-measures the store
+            self.size_bytes += sum(len(blob) for blob in rows.values())
+            self.entries += len(rows)
+            if self.size_bytes > self.max_bytes:
+                self._evict_locked()
+    
+    def _evict_locked(self):
+        """Delete least recently used rows until the store is under EVICTION_TARGET of its limit"""
+        self.size_bytes, self.entries = self._measure()
+        target = int(self.max_bytes * EVICTION_TARGET)
+        evicted = 0
+        while self.size_bytes > target:
+            rows = self.connection.execute(
+                "SELECT model, dimension, text_hash, length(embedding) FROM embeddings ORDER BY last_used LIMIT 1000"
+            ).fetchall()
+            if not rows:
+                break
+            batch = []
+            for model, dimension, key, size in rows:
+                batch.append((model, dimension, key))
+                self.size_bytes -= size
+                if self.size_bytes <= target:
+                    break
+            self.connection.executemany(
+                "DELETE FROM embeddings WHERE model = ? AND dimension = ? AND text_hash = ?", batch
+            )
+            evicted += len(batch)
+        self.connection.commit()
+        self.entries -= evicted
+        self.stats['evictions'] += evicted
+        logger.info(f"🧹 Evicted {evicted} cached embeddings ({self.size_bytes / 1024 / 1024:.1f} MB kept)")
+    
+    def get_query(self, text):
+        """Embedding of a search query from the in-process LRU, falling back to the persistent store"""
+        key = text_hash(text)
+        with self._lock:
+            embedding = self._queries.get(key)
+            if embedding is not None:
+                self._queries.move_to_end(key)
+                self.stats['query_hits'] += 1
+                return embedding
+            self.stats['query_misses'] += 1
+        embedding = self.get_many([text])[0]
+        if embedding is not None:
+            self._remember_query(key, embedding)
+        return embedding
+    
+    def put_query(self, text, embedding):
+        """Store a query embedding in the LRU and the persistent store"""
+        self._remember_query(text_hash(text), embedding)
+        self.put_many([text], [embedding])
+    
+    def _remember_query(self, key, embedding):
+        if self.query_cache_size <= 0:
+            return
+        with self._lock:
+            self._queries[key] = embedding
+            self._queries.move_to_end(key)
+            while len(self._queries) > self.query_cache_size:
+                self._queries.popitem(last=False)
+    
+    def get_stats(self):
+        """Snapshot of cache counters"""
+        with self._lock:
+            stats = dict(self.stats)
+            lookups = stats['hits'] + stats['misses']
+            stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+            stats['entries'] = self.entries
+            stats['size_mb'] = round(self.size_bytes / 1024 / 1024, 2)
+            stats['query_lru_entries'] = len(self._queries)
+        return stats
+    
+    def close(self):
+        """Close the SQLite connection"""
+        with self._lock:
+            self.connection.close()
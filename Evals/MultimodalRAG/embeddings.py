@@ -1,18 +1,74 @@
 import requests
+from requests.adapters import HTTPAdapter
 import numpy as np
 from config import Config
+from embedding_cache import EmbeddingCache, normalize_text
 import logging
+import random
+import threading
 import time
 import psutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from email.utils import parsedate_to_datetime
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Statuses worth retrying: rate limiting and transient server errors
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+# Rough characters per token, used to size batches before the API counts them
+CHARS_PER_TOKEN = 4
+
+
+class EmbeddingError(Exception):
+    """The embeddings API could not produce embeddings (after retries, where retrying made sense)"""
+    
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class TokenLimitError(EmbeddingError):
+    """The API rejected a request for exceeding the model's token limit"""
+
+
+class EmbeddingBatchError(EmbeddingError):
+    """Some texts of a batch run failed; the embeddings that did succeed are kept"""
+    
+    def __init__(self, message, embeddings, failed_indices):
+        super().__init__(message)
+        self.embeddings = embeddings  # Aligned with the input texts, None where embedding failed
+        self.failed_indices = failed_indices
+
+
+def estimate_tokens(text):
+    """Cheap token estimate for batch sizing"""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta seconds or HTTP date), or None"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
 class EmbeddingsManager:
-    def __init__(self):
+    def __init__(self, storage_profile=None):
         if not Config.JINA_API_KEY:
             raise ValueError("JINA_API_KEY is required. Please set it in your .env file.")
         
+        # Reduced-dimension profiles ask the API for Matryoshka-truncated embeddings
+        self.storage_profile = Config.get_storage_profile(storage_profile)
+        self.api_dimensions = self.storage_profile["api_dimensions"]
+        self.dimension = self.api_dimensions or Config.MODEL_VECTOR_DIMENSION
+        
         # Jina AI embeddings API endpoint
         self.api_url = "https://api.jina.ai/v1/embeddings"
         self.headers = {
@@ -20,7 +76,37 @@ class EmbeddingsManager:
             "Content-Type": "application/json",
             "Accept": "application/json"
         }
-        logger.info("Jina AI embeddings client initialized successfully")
+        self.concurrency = max(1, Config.EMBEDDING_CONCURRENCY)
+        
+        # One keep-alive session shared by the worker threads, with a pooled connection per in-flight batch
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        
+        # Lowered whenever the API rejects a batch as too long, so later batches are planned to fit
+        self.max_batch_tokens = max(1, Config.EMBEDDING_MAX_BATCH_TOKENS)
+        self._lock = threading.Lock()
+        self.stats = {
+            'requests': 0,
+            'retries': 0,
+            'batch_splits': 0,
+            'failed_texts': 0
+        }
+        
+        # Already-embedded texts (re-ingested chunks, repeated queries) are served without an API call
+        self.cache = None
+        if Config.EMBEDDING_CACHE:
+            self.cache = EmbeddingCache(
+                Config.EMBEDDING_CACHE_PATH,
+                model=Config.JINA_MODEL_NAME,
+                dimension=self.dimension,
+                max_size_mb=Config.EMBEDDING_CACHE_MAX_MB,
+                query_cache_size=Config.QUERY_CACHE_SIZE
+            )
+        logger.info(f"Jina AI embeddings client initialized successfully "
+                    f"({self.dimension} dimensions, concurrency {self.concurrency})")
     
     def truncate_embedding(self, embedding: np.ndarray) -> np.ndarray:
         """Truncate embedding from 2048 to 2000 dimensions for PostgreSQL storage"""
@@ -30,8 +116,102 @@ class EmbeddingsManager:
             return truncated
         return embedding
     
+    def _is_token_limit(self, response):
+        """Whether an error response means the input was too long for the model"""
+        if response.status_code == 413:
+            return True
+        if response.status_code != 400:
+            return False
+        body = response.text.lower()
+        return "token" in body and any(word in body for word in ("limit", "exceed", "too long", "maximum"))
+    
+    def _post_embeddings(self, texts):
+        """
+        POST one batch to the embeddings API and return its "data" items in input order
+        
+        429/5xx responses and network errors are retried with exponential backoff
+        (or the server's Retry-After); other errors are raised immediately.
+        """
+        payload = {
+            "model": Config.JINA_MODEL_NAME,
+            "input": texts
+        }
+        # Without a dimensions parameter the API returns all 2048 dimensions
+        if self.api_dimensions:
+            payload["dimensions"] = self.api_dimensions
+        for attempt in range(Config.EMBEDDING_MAX_RETRIES + 1):
+            self._count('requests')
+            retry_after = None
+            try:
+                response = self.session.post(self.api_url, json=payload, timeout=Config.EMBEDDING_TIMEOUT)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = EmbeddingError(f"API request failed: {e}")
+            else:
+                if response.status_code == 200:
+                    items = sorted(response.json()["data"], key=lambda item: item.get("index", 0))
+                    if len(items) != len(texts):
+                        raise EmbeddingError(f"API returned {len(items)} embeddings for {len(texts)} texts")
+                    return items
+                message = f"API request failed with status {response.status_code}: {response.text[:500]}"
+                if self._is_token_limit(response):
+                    raise TokenLimitError(message, response.status_code)
+                error = EmbeddingError(message, response.status_code)
+                if response.status_code not in RETRYABLE_STATUSES:
+                    raise error
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            
+            if attempt == Config.EMBEDDING_MAX_RETRIES:
+                raise error
+            if retry_after is None:
+                retry_after = 2 ** attempt * random.uniform(0.75, 1.25)
+            delay = min(Config.EMBEDDING_MAX_BACKOFF, retry_after)
+            self._count('retries')
+            logger.warning(f"⚠️ {error} - retrying in {delay:.1f}s (attempt {attempt + 1}/{Config.EMBEDDING_MAX_RETRIES})")
+            time.sleep(delay)
+    
+    def _embed_batch(self, texts):
+        """Embed one batch, halving it whenever the API reports the token limit was exceeded"""
+        try:
+            items = self._post_embeddings(texts)
+        except TokenLimitError:
+            if len(texts) == 1:
+                raise
+            tokens = sum(estimate_tokens(text) for text in texts)
+            with self._lock:
+                self.max_batch_tokens = max(1, min(self.max_batch_tokens, tokens // 2))
+                self.stats['batch_splits'] += 1
+            middle = len(texts) // 2
+            logger.warning(f"⚠️ Batch of {len(texts)} texts (~{tokens} tokens) exceeds the token limit, splitting")
+            return self._embed_batch(texts[:middle]) + self._embed_batch(texts[middle:])
+        return [np.array(item["embedding"], dtype=np.float32) for item in items]
+    
+    def _plan_batches(self, texts, batch_size):
+        """Group text indices into batches of at most batch_size texts and max_batch_tokens estimated tokens"""
+        with self._lock:
+            max_tokens = self.max_batch_tokens
+        batches = []
+        current = []
+        current_tokens = 0
+        for index, text in enumerate(texts):
+            tokens = estimate_tokens(text)
+            if current and (len(current) >= batch_size or current_tokens + tokens > max_tokens):
+                batches.append(current)
+                current = []
+                current_tokens = 0
+            current.append(index)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+    
     def generate_embedding(self, text):
         """Generate embedding for a given text using Jina AI embeddings API"""
+        if self.cache is not None:
+            cached = self.cache.get_query(text)
+            if cached is not None:
+                logger.info(f"⚡ Embedding served from cache, shape: {cached.shape}")
+                return cached
+        
         start_time = time.time()
         cpu_start = psutil.cpu_percent()
         memory_start = psutil.virtual_memory().used / 1024 / 1024  # MB
@@ -39,29 +219,17 @@ class EmbeddingsManager:
         try:
             # Step 1: Prepare payload
             step1_start = time.time()
-            payload = {
-                "model": Config.JINA_MODEL_NAME,
-                "input": [text]
-                # No dimensions parameter - get full 2048 dimensions
-            }
+            texts = [text]
             step1_time = time.time() - step1_start
             
             # Step 2: Make API request
             step2_start = time.time()
-            response = requests.post(
-                self.api_url,
-                headers=self.headers,
-                json=payload
-            )
+            items = self._post_embeddings(texts)
             step2_time = time.time() - step2_start
             
-            if response.status_code != 200:
-                raise Exception(f"API request failed with status {response.status_code}: {response.text}")
-            
             # Step 3: Process response
             step3_start = time.time()
-            data = response.json()
-            embedding = data["data"][0]["embedding"]
+            embedding = items[0]["embedding"]
             
             # Convert to numpy array
             embedding_array = np.array(embedding, dtype=np.float32)
@@ -83,61 +251,124 @@ class EmbeddingsManager:
             logger.info(f"  🖥️  CPU usage: {cpu_end - cpu_start:.1f}%")
             logger.info(f"  📏 Generated embedding shape: {embedding_array.shape}")
             
+            if self.cache is not None:
+                self.cache.put_query(text, embedding_array)
+            
             return embedding_array
             
         except Exception as e:
             logger.error(f"Error generating embedding: {e}")
             raise
     
-    def generate_embeddings_batch(self, texts, batch_size=10):
-        """Generate embeddings for multiple texts in batches"""
+    def generate_embeddings_batch(self, texts, batch_size=None):
+        """
+        Generate embeddings for multiple texts, keeping up to EMBEDDING_CONCURRENCY batches in flight
+        
+        Texts found in the embedding cache (and repeats within texts) are not sent to the API.
+        
+        Returns:
+            List of embeddings aligned with texts
+        
+        Raises:
+            EmbeddingBatchError: if any batch still failed after retries; its embeddings
+                attribute holds the successful results (None for the failed texts)
+        """
+        if batch_size is None:
+            batch_size = Config.EMBEDDING_BATCH_SIZE
         start_time = time.time()
-        embeddings = []
         
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i + batch_size]
-            batch_start = time.time()
-            
-            try:
-                payload = {
-                    "model": Config.JINA_MODEL_NAME,
-                    "input": batch
-                    # No dimensions parameter - get full 2048 dimensions
-                }
-                
-                response = requests.post(
-                    self.api_url,
-                    headers=self.headers,
-                    json=payload
-                )
-                
-                if response.status_code != 200:
-                    raise Exception(f"API request failed with status {response.status_code}: {response.text}")
-                
-                data = response.json()
-                batch_embeddings = [np.array(item["embedding"], dtype=np.float32) 
-                                  for item in data["data"]]
-                embeddings.extend(batch_embeddings)
-                
-                batch_time = time.time() - batch_start
-                logger.info(f"Processed batch {i//batch_size + 1}/{(len(texts) + batch_size - 1)//batch_size} in {batch_time:.4f}s")
-                
-            except Exception as e:
-                logger.error(f"Error processing batch {i//batch_size + 1}: {e}")
-                # Add zero vectors for failed embeddings to maintain alignment
-                embeddings.extend([np.zeros(Config.VECTOR_DIMENSION, dtype=np.float32)] * len(batch))
+        if self.cache is not None:
+            embeddings = self.cache.get_many(texts)
+        else:
+            embeddings = [None] * len(texts)
+        # Each distinct missing text (by its cache key form) is embedded once, then copied to every position it occurs at
+        positions = {}
+        for index, (text, embedding) in enumerate(zip(texts, embeddings)):
+            if embedding is None:
+                positions.setdefault(normalize_text(text), []).append(index)
+        pending = [texts[indices[0]] for indices in positions.values()]
+        if len(pending) < len(texts):
+            logger.info(f"⚡ {len(texts) - len(pending)}/{len(texts)} embeddings served from cache or duplicates")
+        
+        pending_embeddings, failed = self._embed_texts(pending, batch_size)
+        failed_indices = sorted(index for position in failed for index in positions[normalize_text(pending[position])])
+        for text, embedding in zip(pending, pending_embeddings):
+            if embedding is not None:
+                for index in positions[normalize_text(text)]:
+                    embeddings[index] = embedding
         
         total_time = time.time() - start_time
-        logger.info(f"🚀 Batch embedding generation completed in {total_time:.4f}s for {len(texts)} texts")
+        logger.info(f"🚀 Batch embedding generation completed in {total_time:.4f}s for {len(texts)} texts "
+                    f"({len(pending)} sent to the API, {self.concurrency} batches in flight)")
         
+        if failed_indices:
+            self._count('failed_texts', len(failed_indices))
+            raise EmbeddingBatchError(f"{len(failed_indices)}/{len(texts)} texts could not be embedded",
+                                      embeddings, failed_indices)
         return embeddings
     
+    def _embed_texts(self, texts, batch_size):
+        """
+        Embed texts through the API with up to EMBEDDING_CONCURRENCY batches in flight
+        
+        Returns:
+            (embeddings aligned with texts with None for failures, indices of failed texts)
+        """
+        embeddings = [None] * len(texts)
+        failed_indices = []
+        batches = self._plan_batches(texts, max(1, batch_size))
+        if not batches:
+            return embeddings, failed_indices
+        
+        def run_batch(batch):
+            batch_start = time.time()
+            return self._embed_batch([texts[i] for i in batch]), time.time() - batch_start
+        
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(batches))) as executor:
+            futures = {executor.submit(run_batch, batch): (number, batch) for number, batch in enumerate(batches, 1)}
+            for future in as_completed(futures):
+                number, batch = futures[future]
+                try:
+                    batch_embeddings, batch_time = future.result()
+                except Exception as e:
+                    logger.error(f"Error processing batch {number}: {e}")
+                    failed_indices.extend(batch)
+                    continue
+                for index, embedding in zip(batch, batch_embeddings):
+                    embeddings[index] = embedding
+                # Cached per batch so an interrupted run keeps what it already paid for
+                if self.cache is not None:
+                    self.cache.put_many([texts[i] for i in batch], batch_embeddings)
+                logger.info(f"Processed batch {number}/{len(batches)} ({len(batch)} texts) in {batch_time:.4f}s")
+        return embeddings, failed_indices
+    
     def validate_embedding_dimension(self, embedding):
         """Validate that embedding has the correct dimension"""
-        if embedding.shape[0] != Config.VECTOR_DIMENSION:
-            raise ValueError(f"Embedding dimension mismatch. Expected {Config.VECTOR_DIMENSION}, got {embedding.shape[0]}")
+        if embedding.shape[0] != self.dimension:
+            raise ValueError(f"Embedding dimension mismatch. Expected {self.dimension}, got {embedding.shape[0]}")
         return True
     
     def prepare_embedding_for_db(self, embedding):
         """Prepare embedding for database storage by truncating to 2000 dimensions"""
         return self.truncate_embedding(embedding)
+    
+    def _count(self, key, amount=1):
+        with self._lock:
+            self.stats[key] += amount
+    
+    def get_stats(self):
+        """Snapshot of embedding client counters"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['max_batch_tokens'] = self.max_batch_tokens
+        stats['concurrency'] = self.concurrency
+        stats['dimension'] = self.dimension
+        if self.cache is not None:
+            stats['cache'] = self.cache.get_stats()
+        return stats
+    
+    def close(self):
+        """Close pooled HTTP connections and the embedding cache"""
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
@@ -0,0 +1,304 @@
+import json
+import logging
+import os
+import threading
+
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+META_FILE = "meta.json"
+VECTORS_FILE = "vectors.bin"  # Row-major normalized vectors in the configured dtype
+IDS_FILE = "ids.bin"  # int64 document id per row
+CENTROIDS_FILE = "centroids.npy"
+ASSIGNMENTS_FILE = "assignments.bin"  # int32 IVF list per row
+
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE = 50000
+# The IVF index is retrained once the index has grown this much since it was trained
+RETRAIN_GROWTH = 2.0
+# Rows of deleted documents are compacted away once they are this fraction of the index
+COMPACT_DEAD_FRACTION = 0.25
+# Rows added since training are re-sorted into their lists once they are this fraction of the index
+UNSORTED_TAIL_FRACTION = 0.25
+# Rows converted to float32 at a time during exact search and assignment
+BLOCK_ROWS = 32768
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize rows so cosine similarity becomes a dot product"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class LocalVectorIndex:
+    def __init__(self, directory, dimension, dtype="float32", nprobe=16, ivf_min_vectors=20000):
+        """
+        In-process cosine search over a memory-mapped copy of document_embeddings
+        
+        Vectors are stored normalized in an append-only file and searched exactly while
+        the index is small. From ivf_min_vectors rows on, an IVF index (spherical k-means
+        centroids in NumPy) restricts each search to the nprobe closest lists. Training
+        rewrites the file ordered by list, so a probed list is one contiguous slice; rows
+        added later form a tail that is searched per list until the next re-sort.
+        """
+        self.directory = directory
+        self.dimension = dimension
+        self.dtype = np.dtype(dtype)
+        self.nprobe = max(1, nprobe)
+        self.ivf_min_vectors = ivf_min_vectors
+        self._lock = threading.RLock()
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+    
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+    
+    def _load(self):
+        """Open the index files, discarding them if they were built with another dimension or dtype"""
+        meta = {}
+        if os.path.exists(self._path(META_FILE)):
+            with open(self._path(META_FILE)) as f:
+                meta = json.load(f)
+        if meta.get('dimension') != self.dimension or meta.get('dtype') != self.dtype.name:
+            meta = {}
+            for name in (VECTORS_FILE, IDS_FILE, CENTROIDS_FILE, ASSIGNMENTS_FILE):
+                if os.path.exists(self._path(name)):
+                    os.remove(self._path(name))
+        
+        self.count = meta.get('count', 0)
+        self.watermark = meta.get('watermark', 0)
+        self.trained_count = meta.get('trained_count', 0)
+        self.sorted_count = meta.get('sorted_count', 0)
+        # Rows appended after the last meta write belong to an interrupted sync and are dropped
+        self._truncate(VECTORS_FILE, self.count * self.dimension * self.dtype.itemsize)
+        self._truncate(IDS_FILE, self.count * 8)
+        self._map()
+        self.alive = np.ones(self.count, dtype=bool)
+        
+        self.centroids = None
+        self.assignments = None
+        if self.trained_count and os.path.exists(self._path(CENTROIDS_FILE)):
+            self._truncate(ASSIGNMENTS_FILE, self.count * 4)
+            if os.path.getsize(self._path(ASSIGNMENTS_FILE)) == self.count * 4:
+                self.centroids = np.load(self._path(CENTROIDS_FILE))
+                self.assignments = np.fromfile(self._path(ASSIGNMENTS_FILE), dtype=np.int32)
+                self._build_lists()
+        if self.centroids is None:
+            self.trained_count = 0
+            self.sorted_count = 0
+    
+    def _truncate(self, name, size):
+        path = self._path(name)
+        if not os.path.exists(path):
+            open(path, 'wb').close()
+        if os.path.getsize(path) > size:
+            with open(path, 'r+b') as f:
+                f.truncate(size)
+    
+    def _map(self):
+        """Memory-map the vector and id files at the current row count"""
+        if self.count:
+            self.vectors = np.memmap(self._path(VECTORS_FILE), dtype=self.dtype, mode='r',
+                                     shape=(self.count, self.dimension))
+            self.ids = np.fromfile(self._path(IDS_FILE), dtype=np.int64, count=self.count)
+        else:
+            self.vectors = np.zeros((0, self.dimension), dtype=self.dtype)
+            self.ids = np.zeros(0, dtype=np.int64)
+    
+    @property
+    def live_count(self):
+        return int(self.alive.sum())
+    
+    def reset(self):
+        """Drop every row (the source table was recreated)"""
+        with self._lock:
+            for name in (META_FILE, VECTORS_FILE, IDS_FILE, CENTROIDS_FILE, ASSIGNMENTS_FILE):
+                if os.path.exists(self._path(name)):
+                    os.remove(self._path(name))
+            self._load()
+    
+    def add(self, document_ids, vectors, watermark):
+        """Append embeddings; watermark is the highest document_embeddings.id they cover"""
+        with self._lock:
+            vectors = normalize_rows(vectors)
+            with open(self._path(VECTORS_FILE), 'ab') as f:
+                f.write(vectors.astype(self.dtype).tobytes())
+            with open(self._path(IDS_FILE), 'ab') as f:
+                f.write(np.asarray(document_ids, dtype=np.int64).tobytes())
+            if self.centroids is not None:
+                assignments = self._assign(vectors)
+                with open(self._path(ASSIGNMENTS_FILE), 'ab') as f:
+                    f.write(assignments.tobytes())
+                self.assignments = np.concatenate([self.assignments, assignments])
+            self.count += len(vectors)
+            self.alive = np.concatenate([self.alive, np.ones(len(vectors), dtype=bool)])
+            self.watermark = max(self.watermark, watermark)
+            self._map()
+    
+    def retain(self, document_ids):
+        """Mark rows whose document is not in document_ids as deleted"""
+        with self._lock:
+            self.alive = np.isin(self.ids, np.asarray(list(document_ids), dtype=np.int64))
+    
+    def commit(self):
+        """Compact, (re)train the IVF index when due, and persist the row count and watermark"""
+        with self._lock:
+            if self.count and self.count - self.live_count > self.count * COMPACT_DEAD_FRACTION:
+                self._compact()
+            live = self.live_count
+            if live >= self.ivf_min_vectors and (self.centroids is None or live >= self.trained_count * RETRAIN_GROWTH):
+                self._train()
+            elif live < self.ivf_min_vectors and self.centroids is not None:
+                self._drop_ivf()
+            elif self.centroids is not None and self.count - self.sorted_count > self.count * UNSORTED_TAIL_FRACTION:
+                self._sort_by_list()
+            if self.centroids is not None:
+                self._build_lists()
+            self._write_meta()
+    
+    def _write_meta(self):
+        meta = {
+            'dimension': self.dimension,
+            'dtype': self.dtype.name,
+            'count': self.count,
+            'watermark': self.watermark,
+            'trained_count': self.trained_count,
+            'sorted_count': self.sorted_count
+        }
+        temp_path = self._path(META_FILE + '.tmp')
+        with open(temp_path, 'w') as f:
+            json.dump(meta, f)
+        os.replace(temp_path, self._path(META_FILE))
+    
+    def _rewrite(self, rows):
+        """Rewrite the files to hold only the given rows, in the given order"""
+        temp_path = self._path(VECTORS_FILE + '.tmp')
+        with open(temp_path, 'wb') as f:
+            for start in range(0, len(rows), BLOCK_ROWS):
+                f.write(np.ascontiguousarray(self.vectors[rows[start:start + BLOCK_ROWS]]).tobytes())
+        ids = self.ids[rows]
+        alive = self.alive[rows]
+        self.vectors = None
+        os.replace(temp_path, self._path(VECTORS_FILE))
+        ids.tofile(self._path(IDS_FILE))
+        if self.assignments is not None:
+            self.assignments = self.assignments[rows]
+            self.assignments.tofile(self._path(ASSIGNMENTS_FILE))
+        self.count = len(rows)
+        self.alive = alive
+        self._map()
+    
+    def _compact(self):
+        """Drop the rows of deleted documents (the list-ordered prefix stays ordered)"""
+        keep = np.flatnonzero(self.alive)
+        removed = self.count - len(keep)
+        self.sorted_count = int(self.alive[:self.sorted_count].sum())
+        self._rewrite(keep)
+        logger.info(f"🧹 Local index compacted: {removed} deleted rows removed")
+    
+    def _sort_by_list(self):
+        """Order live rows by IVF list so each list is a contiguous slice"""
+        live_rows = np.flatnonzero(self.alive)
+        self._rewrite(live_rows[np.argsort(self.assignments[live_rows], kind='stable')])
+        self.sorted_count = self.count
+    
+    def _train(self):
+        """Spherical k-means over a sample of the live rows, then assign every row to its closest list"""
+        live_rows = np.flatnonzero(self.alive)
+        nlist = int(min(4096, max(16, 4 * np.sqrt(len(live_rows)))))
+        rng = np.random.default_rng(0)
+        sample_rows = np.sort(rng.choice(live_rows, size=min(len(live_rows), KMEANS_SAMPLE), replace=False))
+        sample = self.vectors[sample_rows].astype(np.float32)
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)]
+        for _ in range(KMEANS_ITERATIONS):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            order = np.argsort(labels, kind='stable')
+            clusters, starts = np.unique(labels[order], return_index=True)
+            sums = np.add.reduceat(sample[order], starts, axis=0)
+            # Empty lists are reseeded with random sample rows
+            centroids = sample[rng.choice(len(sample), size=nlist, replace=False)]
+            centroids[clusters] = sums
+            centroids = normalize_rows(centroids)
+        
+        self.centroids = centroids
+        self.assignments = np.concatenate([self._assign(self.vectors[start:start + BLOCK_ROWS])
+                                           for start in range(0, self.count, BLOCK_ROWS)])
+        np.save(self._path(CENTROIDS_FILE), self.centroids)
+        self._sort_by_list()
+        self.trained_count = len(live_rows)
+        logger.info(f"🧭 Local IVF index trained: {nlist} lists over {len(live_rows)} vectors")
+    
+    def _drop_ivf(self):
+        self.centroids = None
+        self.assignments = None
+        self.trained_count = 0
+        self.sorted_count = 0
+        for name in (CENTROIDS_FILE, ASSIGNMENTS_FILE):
+            if os.path.exists(self._path(name)):
+                os.remove(self._path(name))
+    
+    def _assign(self, vectors):
+        return np.argmax(np.asarray(vectors, dtype=np.float32) @ self.centroids.T, axis=1).astype(np.int32)
+    
+    def _build_lists(self):
+        """Slice bounds of each IVF list in the sorted prefix, and row numbers of each list in the tail"""
+        nlist = len(self.centroids)
+        self.list_bounds = np.searchsorted(self.assignments[:self.sorted_count], np.arange(nlist + 1))
+        tail = self.assignments[self.sorted_count:]
+        order = np.argsort(tail, kind='stable')
+        bounds = np.searchsorted(tail[order], np.arange(nlist + 1))
+        self.tail_lists = [self.sorted_count + order[bounds[i]:bounds[i + 1]] for i in range(nlist)]
+    
+    def search(self, query_embedding, top_k):
+        """Top-k (document id, cosine similarity) pairs, best first"""
+        query = normalize_rows(query_embedding[:self.dimension])
+        with self._lock:
+            if not self.count:
+                return []
+            if self.centroids is not None:
+                probes = np.argpartition(-(self.centroids @ query), min(self.nprobe, len(self.centroids)) - 1)[:self.nprobe]
+                row_parts, score_parts = [], []
+                for probe in probes:
+                    start, end = self.list_bounds[probe], self.list_bounds[probe + 1]
+                    if end > start:
+                        row_parts.append(np.arange(start, end))
+                        score_parts.append(np.asarray(self.vectors[start:end], dtype=np.float32) @ query)
+                    tail = self.tail_lists[probe]
+                    if len(tail):
+                        row_parts.append(tail)
+                        score_parts.append(np.asarray(self.vectors[tail], dtype=np.float32) @ query)
+                if not row_parts:
+                    return []
+                rows = np.concatenate(row_parts)
+                scores = np.concatenate(score_parts)
+                scores[~self.alive[rows]] = -np.inf
+            else:
+                rows = None
+                scores = np.concatenate([np.asarray(self.vectors[start:start + BLOCK_ROWS], dtype=np.float32) @ query
+                                         for start in range(0, self.count, BLOCK_ROWS)])
+                scores[~self.alive] = -np.inf
+            
+            k = min(top_k, len(scores))
+            if k <= 0:
+                return []
+            best = np.argpartition(-scores, k - 1)[:k]
+            best = best[np.argsort(-scores[best])]
+            best = best[np.isfinite(scores[best])]
+            positions = rows[best] if rows is not None else best
+            return [(int(self.ids[position]), float(scores[index])) for position, index in zip(positions, best)]
+    
+    def get_stats(self):
+        """Snapshot of index size and layout"""
+        with self._lock:
+            return {
+                'vectors': self.live_count,
+                'dtype': self.dtype.name,
+                'size_mb': round(self.count * self.dimension * self.dtype.itemsize / 1024 / 1024, 2),
+                'ivf_lists': len(self.centroids) if self.centroids is not None else 0,
+                'nprobe': self.nprobe,
+                'watermark': self.watermark
+            }
@@ -55,6 +55,12 @@ def main():
             print(f"  Chunks processed: {upload_result['chunks_processed']}")
             print(f"  Chunks stored: {upload_result['chunks_stored']}")
             print(f"  Files processed: {upload_result['files_processed']}")
+            if upload_result.get('files_failed'):
+                print(f"  ⚠️  Files that could not be read: {upload_result['files_failed']}")
+            if upload_result.get('chunks_backfilled'):
+                print(f"  Stored chunks embedded for the current storage profile: {upload_result['chunks_backfilled']}")
+            if upload_result.get('embedding_failures'):
+                print(f"  ⚠️  Chunks without embeddings (not stored): {upload_result['embedding_failures']}")
         else:
             print(f"❌ Document upload failed: {upload_result.get('message', 'Unknown error')}")
             return
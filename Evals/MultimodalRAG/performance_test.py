@@ -4,12 +4,15 @@ Performance Test Script for RAG System
 This script will help identify bottlenecks in query processing
 """
 
+import asyncio
 import time
 import psutil
 import logging
 from rag_system import RAGSystem
 from embeddings import EmbeddingsManager
 from database import DatabaseManager
+from async_database import AsyncDatabaseManager
+from config import Config
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -141,6 +144,37 @@ def test_full_rag_performance():
     except Exception as e:
         print(f"❌ Full RAG test failed: {e}")
 
+def test_result_cache_performance():
+    """Test repeated and reworded queries against the search result cache"""
+    print("\n♻️  Testing Search Result Cache")
+    print("=" * 50)
+    
+    if not Config.RESULT_CACHE:
+        print("⚠️  RESULT_CACHE is disabled, skipping")
+        return
+    
+    try:
+        rag = RAGSystem()
+        
+        # Each query, then the same query again, then a near-identical rewording
+        test_queries = [
+            ("machine learning algorithms", "Machine learning algorithms?"),
+            ("deep learning applications", "applications of deep learning")
+        ]
+        
+        for query, reworded in test_queries:
+            print(f"\n🎯 Query = '{query}'")
+            for label, text in (("cold", query), ("repeat", query), ("reworded", reworded)):
+                start_time = time.time()
+                results = rag.search_documents(text, top_k=5)
+                print(f"  {label:>9}: {time.time() - start_time:.4f}s, {len(results)} results")
+        
+        print(f"\n📊 Cache: {rag.get_system_stats()['result_cache']}")
+        rag.close()
+        
+    except Exception as e:
+        print(f"❌ Result cache test failed: {e}")
+
 def test_database_connection_performance():
     """Test database connection and query performance"""
     print("\n🗄️ Testing Database Connection Performance")
@@ -192,6 +226,57 @@ def test_database_connection_performance():
     except Exception as e:
         print(f"❌ Database performance test failed: {e}")
 
+def test_concurrent_search_throughput():
+    """Test search throughput with concurrent clients on the async connection pool"""
+    print("\n⚡ Testing Concurrent Search Throughput")
+    print("=" * 50)
+    
+    try:
+        import numpy as np
+        
+        db_manager = DatabaseManager()
+        count = db_manager.get_document_count()
+        if count == 0:
+            print("⚠️  No documents stored, skipping")
+            db_manager.close()
+            return
+        
+        rng = np.random.default_rng(0)
+        test_embeddings = [rng.standard_normal(db_manager.dimension).astype(np.float32) for _ in range(64)]
+        
+        # Baseline: one search at a time on the synchronous path
+        start_time = time.time()
+        for embedding in test_embeddings[:16]:
+            db_manager.search_similar_documents(embedding, top_k=5)
+        sequential_rate = 16 / (time.time() - start_time)
+        print(f"🐢 Sequential (psycopg2): {sequential_rate:.1f} searches/s")
+        db_manager.close()
+        
+        async def measure(manager, concurrency, total=64):
+            async def client(offset):
+                for i in range(offset, total, concurrency):
+                    await manager.search_similar_documents(test_embeddings[i % len(test_embeddings)], top_k=5)
+            start_time = time.time()
+            await asyncio.gather(*(client(offset) for offset in range(concurrency)))
+            return total / (time.time() - start_time)
+        
+        async def run():
+            manager = AsyncDatabaseManager()
+            try:
+                # Warm-up opens the pool's connections and prepares the statement on each
+                await measure(manager, manager.pool_size, manager.pool_size)
+                for concurrency in (1, 4, 16, 64):
+                    rate = await measure(manager, concurrency)
+                    print(f"⚡ {concurrency:>2} concurrent clients (asyncpg pool of {manager.pool_size}): {rate:.1f} searches/s")
+                print(f"📊 Pool: {manager.get_stats()}")
+            finally:
+                await manager.close()
+        
+        asyncio.run(run())
+        
+    except Exception as e:
+        print(f"❌ Concurrent search test failed: {e}")
+
 def main():
     """Run all performance tests"""
     print("🚀 RAG System Performance Analysis")
@@ -207,6 +292,8 @@ def main():
     test_database_connection_performance()
     test_database_search_performance()
     test_full_rag_performance()
+    test_result_cache_performance()
+    test_concurrent_search_throughput()
     
     print("\n" + "=" * 60)
     print("🎯 Performance Analysis Complete!")
@@ -1,119 +1,517 @@
 from database import DatabaseManager
-from embeddings import EmbeddingsManager
+from async_database import AsyncDatabaseManager
+from embeddings import EmbeddingsManager, EmbeddingBatchError
 from document_processor import DocumentProcessor
+from result_cache import SearchResultCache
 from config import Config
+import asyncio
 import logging
 import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# End-of-stream marker passed through the ingestion pipeline queues
+_END = object()
+
+
+def _put(q: queue.Queue, item, stop: threading.Event) -> bool:
+    """Put into a bounded queue, giving up (False) once the pipeline is stopped"""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.5)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _get(q: queue.Queue, stop: threading.Event):
+    """Get from a pipeline queue; returns _END once the pipeline is stopped"""
+    while not stop.is_set():
+        try:
+            return q.get(timeout=0.5)
+        except queue.Empty:
+            continue
+    return _END
+
+
+def reciprocal_rank_fusion(ranked_lists: Dict[str, List[Dict[str, Any]]], k: int = 60) -> List[Dict[str, Any]]:
+    """
+    Merge ranked result lists by reciprocal rank fusion
+    
+    A document scores the sum of 1 / (k + rank) over the lists it appears in (ranks start at 1), so
+    agreement between lists outweighs a high rank in just one. Returns merged rows, best first, with
+    'fusion_score' and '<list name>_rank' (None where the document is absent from that list) added.
+    """
+    fused = {}
+    for name, results in ranked_lists.items():
+        for rank, row in enumerate(results, 1):
+            entry = fused.get(row['id'])
+            if entry is None:
+                entry = fused[row['id']] = {f"{list_name}_rank": None for list_name in ranked_lists}
+                entry['fusion_score'] = 0.0
+            for key, value in row.items():
+                entry.setdefault(key, value)
+            entry['fusion_score'] += 1.0 / (k + rank)
+            entry[f"{name}_rank"] = rank
+    return sorted(fused.values(), key=lambda entry: entry['fusion_score'], reverse=True)
+
 class RAGSystem:
-    def __init__(self):
+    def __init__(self, storage_profile: str = None):
         """Initialize the RAG system with database, embeddings, and document processing"""
         try:
-            self.db_manager = DatabaseManager()
-            self.embeddings_manager = EmbeddingsManager()
+            self.db_manager = DatabaseManager(storage_profile)
+            # Async read path for event-loop servers; its pool opens on the first async search
+            self.async_db_manager = AsyncDatabaseManager(storage_profile)
+            self.embeddings_manager = EmbeddingsManager(storage_profile)
             self.doc_processor = DocumentProcessor()
+            # Runs the full-text leg of hybrid searches while the calling thread runs the vector leg
+            self.search_executor = ThreadPoolExecutor(max_workers=max(1, Config.DB_POOL_SIZE), thread_name_prefix="search")
+            self._search_lock = threading.Lock()
+            self.search_stats = {
+                'searches': 0,
+                'total_time': 0.0,
+                'vector_leg_time': 0.0,
+                'vector_legs': 0,
+                'text_leg_time': 0.0,
+                'text_legs': 0
+            }
+            # Repeated and near-identical queries are answered from memory until the corpus changes
+            self.result_cache = None
+            if Config.RESULT_CACHE:
+                self.result_cache = SearchResultCache(
+                    max_entries=Config.RESULT_CACHE_SIZE,
+                    ttl=Config.RESULT_CACHE_TTL,
+                    similarity_threshold=Config.RESULT_CACHE_SIMILARITY
+                )
             logger.info("RAG system initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize RAG system: {e}")
             raise
     
     def upload_documents(self, pdf_directory: str) -> Dict[str, Any]:
-        """Upload and process all PDF documents from a directory"""
+        """
+        Upload and process all PDF documents from a directory
+        
+        Runs as a streaming pipeline: PDFs are extracted in a process pool, and their chunks
+        move in batches of INGEST_BATCH_CHUNKS through bounded queues to embedding and then
+        database insertion. The three stages overlap, and memory stays flat however many
+        documents the directory holds.
+        
+        With INCREMENTAL_INGESTION, files whose size, mtime or content hash match the registry
+        are skipped. In changed files only chunks with new text are embedded and inserted;
+        stale chunks and files removed from the directory are deleted.
+        
+        Stored chunks without an embedding in the current storage profile (after a switch of
+        STORAGE_PROFILE) are embedded at the end, see backfill_embeddings.
+        """
         try:
             logger.info(f"Starting document upload from directory: {pdf_directory}")
+            start_time = time.time()
             
-            # Process all PDF documents
-            processed_chunks = self.doc_processor.process_pdf_directory(pdf_directory)
-            
-            if not processed_chunks:
+            pdf_paths = self.doc_processor.list_pdf_files(pdf_directory)
+            if not pdf_paths:
                 logger.warning("No PDF documents found in the directory")
                 return {"status": "warning", "message": "No PDF documents found", "chunks_processed": 0}
             
-            # Generate embeddings for all chunks
-            chunk_texts = [chunk['content'] for chunk in processed_chunks]
-            logger.info(f"Generating embeddings for {len(chunk_texts)} chunks...")
+            stats = {'chunks_processed': 0, 'chunks_embedded': 0, 'embedding_failures': 0,
+                     'chunks_stored': 0, 'chunks_skipped': 0, 'chunks_reused': 0, 'chunks_deleted': 0,
+                     'files_unchanged': 0, 'files_removed': 0}
+            files = set()
+            failed_files = []
             
-            embeddings = self.embeddings_manager.generate_embeddings_batch(chunk_texts)
+            incremental = Config.INCREMENTAL_INGESTION
+            known_hashes = {}
+            stored_chunks = {}
+            if incremental:
+                pdf_paths, known_hashes, stored_chunks = self._plan_incremental(pdf_directory, pdf_paths, stats)
+            # Files with a chunk that was not stored stay unregistered, so the next upload retries them
+            incomplete_files = set()
+            errors = []
+            stop = threading.Event()
+            chunk_queue = queue.Queue(maxsize=max(1, Config.INGEST_QUEUE_SIZE))
+            store_queue = queue.Queue(maxsize=max(1, Config.INGEST_QUEUE_SIZE))
             
-            # Store documents and embeddings in database
-            chunks_stored = 0
-            chunks_skipped = 0
+            def extract_stage():
+                try:
+                    # A file's update travels in the same batch as its last new chunk, so it is
+                    # applied (and the file registered) only after all of its chunks are stored
+                    batch = []
+                    file_updates = []
+                    for fingerprint, chunks in self.doc_processor.iter_pdf_documents(pdf_paths, known_hashes, failed_files):
+                        new_chunks, update = self._diff_file(fingerprint, chunks, stored_chunks.pop(fingerprint['file_path'], []), stats)
+                        if not incremental:
+                            update['fingerprint'] = None
+                        batch.extend(new_chunks)
+                        file_updates.append(update)
+                        if len(batch) >= Config.INGEST_BATCH_CHUNKS or len(file_updates) >= Config.INGEST_BATCH_CHUNKS:
+                            if not _put(chunk_queue, (batch, file_updates), stop):
+                                return
+                            batch = []
+                            file_updates = []
+                    if batch or file_updates:
+                        _put(chunk_queue, (batch, file_updates), stop)
+                except Exception as e:
+                    errors.append(e)
+                    stop.set()
+                finally:
+                    _put(chunk_queue, _END, stop)
             
-            for i, (chunk, embedding) in enumerate(zip(processed_chunks, embeddings)):
+            def store_stage():
                 try:
-                    # Store document chunk
-                    document_id = self.db_manager.insert_document_chunk(
-                        filename=chunk['filename'],
-                        content=chunk['content'],
-                        chunk_index=chunk['chunk_index'],
-                        metadata=json.dumps(chunk)
-                    )
-                    
-                    # Skip if document insertion failed (e.g., empty content)
-                    if document_id is None:
-                        chunks_skipped += 1
-                        logger.warning(f"Skipped chunk {i} from {chunk['filename']} (empty or invalid content)")
-                        continue
-                    
-                    # Store embedding (will be automatically truncated to 2000 dimensions)
-                    self.embeddings_manager.validate_embedding_dimension(embedding)
-                    self.db_manager.insert_embedding(document_id, embedding)
-                    
-                    chunks_stored += 1
-                    
-                    if (i + 1) % 10 == 0:
-                        logger.info(f"Processed {i + 1}/{len(processed_chunks)} chunks")
-                        
+                    while True:
+                        item = _get(store_queue, stop)
+                        if item is _END:
+                            return
+                        chunks, embeddings, file_updates = item
+                        chunks_stored, chunks_skipped = self._store_chunks(chunks, embeddings)
+                        stats['chunks_stored'] += chunks_stored
+                        stats['chunks_skipped'] += chunks_skipped
+                        if chunks_skipped:
+                            # Which rows failed is not known, so none of this batch's files are registered
+                            incomplete_files.update(chunk['file_path'] for chunk in chunks)
+                        for update in file_updates:
+                            if update['fingerprint'] is not None and update['fingerprint']['file_path'] in incomplete_files:
+                                logger.warning(f"⚠️ {update['fingerprint']['file_path']} was not fully stored and will be retried on the next upload")
+                                update['fingerprint'] = None
+                        if file_updates:
+                            self.db_manager.apply_file_updates(file_updates)
+                        logger.info(f"Stored {stats['chunks_stored']} chunks so far")
                 except Exception as e:
-                    logger.error(f"Error storing chunk {i}: {e}")
-                    chunks_skipped += 1
-                    continue
+                    errors.append(e)
+                    stop.set()
+            
+            extractor = threading.Thread(target=extract_stage, name="pdf-extract", daemon=True)
+            writer = threading.Thread(target=store_stage, name="db-writer", daemon=True)
+            extractor.start()
+            writer.start()
+            try:
+                # Embedding runs on this thread, between extraction and storage
+                while True:
+                    item = _get(chunk_queue, stop)
+                    if item is _END:
+                        break
+                    batch, file_updates = item
+                    stats['chunks_processed'] += len(batch)
+                    files.update(update['file_path'] for update in file_updates)
+                    chunks, embeddings = [], []
+                    if batch:
+                        logger.info(f"Generating embeddings for {len(batch)} chunks ({stats['chunks_processed']} extracted so far)...")
+                        chunks, embeddings = self._embed_chunks(batch, stats)
+                    embedded = {id(chunk) for chunk in chunks}
+                    incomplete_files.update(chunk['file_path'] for chunk in batch if id(chunk) not in embedded)
+                    if not _put(store_queue, (chunks, embeddings, file_updates), stop):
+                        break
+            except Exception:
+                stop.set()
+                raise
+            finally:
+                _put(store_queue, _END, stop)
+                writer.join()
+                extractor.join()
+            if errors:
+                raise errors[0]
             
-            logger.info(f"Document upload completed. {chunks_stored}/{len(processed_chunks)} chunks stored successfully, {chunks_skipped} skipped")
+            backfill = self.backfill_embeddings()
+            stats['embedding_failures'] += backfill['embedding_failures']
+            
+            # New and deleted chunks become visible to the local search tier right away
+            self.db_manager.sync_local_index()
+            
+            # Cached search results may no longer match the corpus
+            if self.result_cache is not None and (stats['chunks_stored'] or stats['chunks_deleted'] or backfill['chunks_embedded']):
+                self.result_cache.invalidate()
+            
+            chunks_skipped = stats['chunks_skipped'] + stats['embedding_failures']
+            logger.info(f"Document upload completed in {time.time() - start_time:.2f}s. "
+                        f"{stats['chunks_stored']}/{stats['chunks_processed']} chunks stored successfully, {chunks_skipped} skipped")
+            if incremental:
+                logger.info(f"♻️ Incremental upload: {stats['files_unchanged']} files unchanged, {stats['files_removed']} removed, "
+                            f"{stats['chunks_reused']} chunks reused, {stats['chunks_deleted']} stale chunks deleted")
             
             return {
                 "status": "success",
-                "chunks_processed": len(processed_chunks),
-                "chunks_stored": chunks_stored,
+                "chunks_processed": stats['chunks_processed'],
+                "chunks_stored": stats['chunks_stored'],
                 "chunks_skipped": chunks_skipped,
-                "files_processed": len(set(chunk['filename'] for chunk in processed_chunks))
+                "embedding_failures": stats['embedding_failures'],
+                "files_processed": len(files),
+                "files_failed": len(failed_files),
+                "files_unchanged": stats['files_unchanged'],
+                "files_removed": stats['files_removed'],
+                "chunks_reused": stats['chunks_reused'],
+                "chunks_deleted": stats['chunks_deleted'],
+                "chunks_backfilled": backfill['chunks_embedded']
             }
             
         except Exception as e:
             logger.error(f"Error during document upload: {e}")
+            # Some batches may have been stored or deleted before the failure
+            if self.result_cache is not None:
+                self.result_cache.invalidate()
             return {"status": "error", "message": str(e)}
     
-    def search_documents(self, query: str, top_k: int = None) -> List[Dict[str, Any]]:
-        """Search for relevant documents based on a query"""
+    def backfill_embeddings(self) -> Dict[str, int]:
+        """
+        Embed stored chunks that have no embedding in the current storage profile's table
+        
+        Each profile keeps its own table, and incremental uploads skip unchanged files, so after
+        switching STORAGE_PROFILE this is what fills the new table. Cached embeddings of the same
+        dimension are reused, so only profiles that request other dimensions call the API.
+        """
+        stats = {'chunks_embedded': 0, 'embedding_failures': 0}
+        start_time = time.time()
+        last_id = 0
+        while True:
+            rows = self.db_manager.get_documents_without_embeddings(last_id, max(1, Config.INGEST_BATCH_CHUNKS))
+            if not rows:
+                break
+            # Chunks that fail to embed are passed over here and retried by the next backfill
+            last_id = rows[-1][0]
+            chunks, embeddings = self._embed_chunks([{'id': document_id, 'content': content} for document_id, content in rows], stats)
+            if chunks:
+                self.db_manager.insert_embeddings([chunk['id'] for chunk in chunks], embeddings)
+        if stats['chunks_embedded'] or stats['embedding_failures']:
+            logger.info(f"🔁 Backfilled {stats['chunks_embedded']} embeddings into {self.db_manager.embeddings_table} "
+                        f"in {time.time() - start_time:.2f}s ({stats['embedding_failures']} failed)")
+        return stats
+    
+    def _plan_incremental(self, pdf_directory: str, pdf_paths: List[str], stats: Dict[str, int]) -> tuple:
+        """
+        Compare the directory with the file registry
+        
+        Deletes files that disappeared from the directory and drops files whose size and mtime
+        match their registry entry. Returns the files still to process, their registered content
+        hashes, and their stored chunks.
+        """
+        registry = self.db_manager.get_file_registry()
+        # Files stored before paths were resolved may be registered as relative paths; re-key them
+        stale_paths = {path: os.path.realpath(path) for path in self.db_manager.get_stored_file_paths()
+                       if os.path.realpath(path) != path}
+        if stale_paths:
+            stats['chunks_deleted'] += self.db_manager.rename_files(stale_paths)
+            registry = self.db_manager.get_file_registry()
+        
+        directory = os.path.realpath(pdf_directory)
+        current = set(pdf_paths)
+        removed = [path for path in registry
+                   if os.path.dirname(path) == directory and path not in current]
+        if removed:
+            stats['chunks_deleted'] += self.db_manager.delete_files(removed)
+            stats['files_removed'] = len(removed)
+            logger.info(f"Removed {len(removed)} files that are no longer in {pdf_directory}")
+        
+        to_process = []
+        for path in pdf_paths:
+            entry = registry.get(path)
+            stat = os.stat(path)
+            if entry and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime:
+                stats['files_unchanged'] += 1
+                continue
+            to_process.append(path)
+        
+        known_hashes = {path: registry[path]['content_hash'] for path in to_process if path in registry}
+        logger.info(f"{stats['files_unchanged']} files unchanged since the last upload, {len(to_process)} to check")
+        return to_process, known_hashes, self.db_manager.get_file_chunks(to_process)
+    
+    def _diff_file(self, fingerprint: Dict[str, Any], chunks, stored: List[tuple], stats: Dict[str, int]) -> tuple:
+        """
+        Match a file's new chunks against its stored chunks by text hash
+        
+        Returns:
+            (chunks that need embedding and inserting, file update for DatabaseManager.apply_file_updates)
+        """
+        update = {'file_path': fingerprint['file_path'], 'fingerprint': fingerprint, 'delete_ids': [], 'reindex': []}
+        if chunks is None:
+            # Touched but byte-for-byte unchanged: only the registry's size/mtime need refreshing
+            stats['files_unchanged'] += 1
+            return [], update
+        
+        stored_by_hash = {}
+        for document_id, chunk_index, content_hash in stored:
+            stored_by_hash.setdefault(content_hash, []).append(document_id)
+        
+        new_chunks = []
+        for chunk in chunks:
+            matches = stored_by_hash.get(chunk['text_hash'])
+            if matches:
+                # Same text is already stored and embedded: keep the row, refresh its position
+                update['reindex'].append((matches.pop(0), chunk['chunk_index'], json.dumps(chunk)))
+            else:
+                new_chunks.append(chunk)
+        update['delete_ids'] = [document_id for ids in stored_by_hash.values() for document_id in ids]
+        fingerprint['chunk_count'] = len(chunks)
+        
+        stats['chunks_reused'] += len(update['reindex'])
+        stats['chunks_deleted'] += len(update['delete_ids'])
+        return new_chunks, update
+    
+    def _embed_chunks(self, chunks: List[Dict[str, Any]], stats: Dict[str, int]) -> tuple:
+        """Embed a batch of chunks; returns the chunks that got an embedding and their embeddings"""
+        try:
+            embeddings = self.embeddings_manager.generate_embeddings_batch([chunk['content'] for chunk in chunks])
+        except EmbeddingBatchError as e:
+            # Nothing embedded yet means the API is unusable (bad key, no credits): abort instead of skipping everything
+            if len(e.failed_indices) == len(chunks) and not stats['chunks_embedded']:
+                raise
+            # Chunks without an embedding are left out instead of being stored with a placeholder vector
+            logger.error(f"❌ {e}; those chunks will not be stored")
+            stats['embedding_failures'] += len(e.failed_indices)
+            failed = set(e.failed_indices)
+            chunks = [chunk for i, chunk in enumerate(chunks) if i not in failed]
+            embeddings = [embedding for embedding in e.embeddings if embedding is not None]
+        stats['chunks_embedded'] += len(chunks)
+        return chunks, embeddings
+    
+    def _store_chunks(self, chunks: List[Dict[str, Any]], embeddings) -> tuple:
+        """Store chunks and their embeddings; returns (chunks stored, chunks skipped)"""
+        if Config.BULK_INGESTION:
+            # Large batches per transaction instead of one round trip and commit per row
+            return self._store_chunks_bulk(chunks, embeddings)
+        
+        chunks_stored = 0
+        chunks_skipped = 0
+        for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
+            try:
+                # Store document chunk
+                document_id = self.db_manager.insert_document_chunk(
+                    filename=chunk['filename'],
+                    content=chunk['content'],
+                    chunk_index=chunk['chunk_index'],
+                    metadata=json.dumps(chunk),
+                    file_path=chunk.get('file_path'),
+                    content_hash=chunk.get('text_hash')
+                )
+                
+                # Skip if document insertion failed (e.g., empty content)
+                if document_id is None:
+                    chunks_skipped += 1
+                    logger.warning(f"Skipped chunk {i} from {chunk['filename']} (empty or invalid content)")
+                    continue
+                
+                # Store embedding (will be automatically truncated to 2000 dimensions)
+                self.embeddings_manager.validate_embedding_dimension(embedding)
+                self.db_manager.insert_embedding(document_id, embedding)
+                
+                chunks_stored += 1
+                
+                if (i + 1) % 10 == 0:
+                    logger.info(f"Processed {i + 1}/{len(chunks)} chunks")
+                    
+            except Exception as e:
+                logger.error(f"Error storing chunk {i}: {e}")
+                chunks_skipped += 1
+                continue
+        return chunks_stored, chunks_skipped
+    
+    def _store_chunks_bulk(self, processed_chunks: List[Dict[str, Any]], embeddings) -> tuple:
+        """Store chunks with DatabaseManager.insert_chunks_bulk; chunks with invalid embeddings are skipped"""
+        valid_chunks = []
+        valid_embeddings = []
+        chunks_skipped = 0
+        for i, (chunk, embedding) in enumerate(zip(processed_chunks, embeddings)):
+            try:
+                self.embeddings_manager.validate_embedding_dimension(embedding)
+            except ValueError as e:
+                logger.error(f"Error storing chunk {i}: {e}")
+                chunks_skipped += 1
+                continue
+            valid_chunks.append({
+                'filename': chunk['filename'],
+                'content': chunk['content'],
+                'chunk_index': chunk['chunk_index'],
+                'metadata': json.dumps(chunk),
+                'file_path': chunk.get('file_path'),
+                'content_hash': chunk.get('text_hash')
+            })
+            valid_embeddings.append(embedding)
+        
+        chunks_stored, bulk_skipped = self.db_manager.insert_chunks_bulk(valid_chunks, valid_embeddings)
+        return chunks_stored, chunks_skipped + bulk_skipped
+    
+    def search_documents(self, query: str, top_k: int = None, mode: str = None) -> List[Dict[str, Any]]:
+        """
+        Search for relevant documents based on a query
+        
+        Args:
+            query: Search text
+            top_k: Number of results (default: TOP_K_RESULTS)
+            mode: "vector", "text" or "hybrid" (default: SEARCH_MODE). Hybrid runs the full-text
+                leg on a worker thread while this thread embeds the query and runs the vector leg,
+                each on its own pooled connection, then merges both by reciprocal rank fusion.
+        
+        Returns:
+            Result dicts; 'similarity_score' is the cosine similarity (vector), the ts_rank_cd
+            rank (text) or the fusion score (hybrid, which also adds 'vector_rank' and 'text_rank')
+        
+        With RESULT_CACHE, a query seen before (same mode and top_k) is answered from memory, and
+        in vector mode so is a query whose embedding is within RESULT_CACHE_SIMILARITY of a
+        cached one. Uploads that change the corpus empty the cache.
+        """
         try:
             if top_k is None:
                 top_k = Config.TOP_K_RESULTS
+            mode = mode or Config.SEARCH_MODE
+            if mode not in ("vector", "text", "hybrid"):
+                raise ValueError(f"Unknown search mode '{mode}'. Choose one of: vector, text, hybrid")
             
-            logger.info(f"Searching for query: '{query}' with top_k={top_k}")
+            logger.info(f"Searching for query: '{query}' with top_k={top_k} ({mode} search)")
+            start_time = time.time()
             
-            # Generate embedding for the query
-            query_embedding = self.embeddings_manager.generate_embedding(query)
+            query_embedding = None
+            if self.result_cache is not None:
+                generation = self.result_cache.generation
+                cached = self.result_cache.get(query, mode, top_k, start_time)
+                # Text and hybrid results depend on the query's exact terms, so only vector searches
+                # are answered from a similar query. Embedded once here; the vector leg reuses it on a miss
+                if cached is None and mode == "vector":
+                    query_embedding = self.embeddings_manager.generate_embedding(query)
+                    cached = self.result_cache.get_similar(query_embedding, mode, top_k, start_time)
+                if cached is not None:
+                    logger.info(f"⚡ Search served from result cache in {time.time() - start_time:.4f}s ({len(cached)} results)")
+                    return cached
+                self.result_cache.record_miss()
             
-            # Search for similar documents (query embedding will be automatically adjusted to 2000 dimensions)
-            search_results = self.db_manager.search_similar_documents(query_embedding, top_k)
-            
-            # Format results
-            formatted_results = []
-            for result in search_results:
-                formatted_result = {
-                    'id': result['id'],
-                    'filename': result['filename'],
-                    'content': result['content'],
-                    'chunk_index': result['chunk_index'],
-                    'metadata': result['metadata'],
-                    'similarity_score': float(result['similarity'])
-                }
-                formatted_results.append(formatted_result)
+            vector_time = text_time = None
+            if mode == "vector":
+                search_results, vector_time = self._vector_leg(query, top_k, query_embedding)
+                score_key = 'similarity'
+            elif mode == "text":
+                search_results, text_time = self._text_leg(query, top_k)
+                score_key = 'text_score'
+            else:
+                candidates = max(top_k, Config.HYBRID_CANDIDATES)
+                text_future = self.search_executor.submit(self._text_leg, query, candidates)
+                try:
+                    vector_results, vector_time = self._vector_leg(query, candidates, query_embedding)
+                finally:
+                    text_results, text_time = text_future.result()
+                
+                fusion_start = time.time()
+                search_results = reciprocal_rank_fusion({'vector': vector_results, 'text': text_results}, Config.RRF_K)[:top_k]
+                fusion_time = time.time() - fusion_start
+                score_key = 'fusion_score'
+                
+                total_time = time.time() - start_time
+                logger.info("🔀 Hybrid Search Performance Profile:")
+                logger.info(f"  ⏱️  Total time: {total_time:.4f}s")
+                logger.info("  📊 Leg breakdown (legs run concurrently):")
+                logger.info(f"     - Vector leg (query embedding + vector search): {vector_time:.4f}s, {len(vector_results)} results")
+                logger.info(f"     - Full-text leg: {text_time:.4f}s, {len(text_results)} results")
+                logger.info(f"     - Rank fusion: {fusion_time:.6f}s")
+            self._record_search(time.time() - start_time, vector_time, text_time)
             
+            formatted_results = self._format_results(search_results, score_key, mode)
+            if self.result_cache is not None:
+                self.result_cache.put(query, mode, top_k, formatted_results, time.time() - start_time,
+                                      query_embedding, generation)
             logger.info(f"Search completed. Found {len(formatted_results)} relevant documents")
             return formatted_results
             
@@ -121,6 +519,143 @@ class RAGSystem:
             logger.error(f"Error during document search: {e}")
             return []
     
+    async def search_documents_async(self, query: str, top_k: int = None, mode: str = None) -> List[Dict[str, Any]]:
+        """
+        search_documents for asyncio servers: concurrent calls share the asyncpg pool (DB_POOL_SIZE connections)
+        
+        The query embedding, a blocking HTTP call, runs on the search thread pool so the event loop
+        stays free. In hybrid mode both legs run concurrently. Results, and use of the result
+        cache, match search_documents.
+        """
+        try:
+            if top_k is None:
+                top_k = Config.TOP_K_RESULTS
+            mode = mode or Config.SEARCH_MODE
+            if mode not in ("vector", "text", "hybrid"):
+                raise ValueError(f"Unknown search mode '{mode}'. Choose one of: vector, text, hybrid")
+            start_time = time.time()
+            
+            query_embedding = None
+            if self.result_cache is not None:
+                generation = self.result_cache.generation
+                cached = self.result_cache.get(query, mode, top_k, start_time)
+                if cached is None and mode == "vector":
+                    query_embedding = await asyncio.get_running_loop().run_in_executor(
+                        self.search_executor, self.embeddings_manager.generate_embedding, query
+                    )
+                    cached = self.result_cache.get_similar(query_embedding, mode, top_k, start_time)
+                if cached is not None:
+                    return cached
+                self.result_cache.record_miss()
+            
+            vector_time = text_time = None
+            if mode == "vector":
+                search_results, vector_time = await self._vector_leg_async(query, top_k, query_embedding)
+                score_key = 'similarity'
+            elif mode == "text":
+                search_results, text_time = await self._text_leg_async(query, top_k)
+                score_key = 'text_score'
+            else:
+                candidates = max(top_k, Config.HYBRID_CANDIDATES)
+                (vector_results, vector_time), (text_results, text_time) = await asyncio.gather(
+                    self._vector_leg_async(query, candidates, query_embedding),
+                    self._text_leg_async(query, candidates)
+                )
+                search_results = reciprocal_rank_fusion({'vector': vector_results, 'text': text_results}, Config.RRF_K)[:top_k]
+                score_key = 'fusion_score'
+                logger.info(f"🔀 Async hybrid search in {time.time() - start_time:.4f}s "
+                            f"(vector leg {vector_time:.4f}s, full-text leg {text_time:.4f}s)")
+            self._record_search(time.time() - start_time, vector_time, text_time)
+            formatted_results = self._format_results(search_results, score_key, mode)
+            if self.result_cache is not None:
+                self.result_cache.put(query, mode, top_k, formatted_results, time.time() - start_time,
+                                      query_embedding, generation)
+            return formatted_results
+            
+        except Exception as e:
+            logger.error(f"Error during async document search: {e}")
+            return []
+    
+    async def _vector_leg_async(self, query: str, top_k: int, query_embedding=None) -> tuple:
+        """Embed the query (unless given) on a worker thread and run the vector search on the async pool; returns (results, seconds)"""
+        start_time = time.time()
+        if query_embedding is None:
+            query_embedding = await asyncio.get_running_loop().run_in_executor(
+                self.search_executor, self.embeddings_manager.generate_embedding, query
+            )
+        if self.db_manager.local_index is not None:
+            # The local search tier is in-process NumPy, so it also runs on a worker thread
+            results = await asyncio.get_running_loop().run_in_executor(
+                self.search_executor, self.db_manager.search_similar_documents, query_embedding, top_k
+            )
+        else:
+            results = await self.async_db_manager.search_similar_documents(query_embedding, top_k)
+        return results, time.time() - start_time
+    
+    async def _text_leg_async(self, query: str, top_k: int) -> tuple:
+        """Run the full-text search on the async pool; returns (results, seconds)"""
+        start_time = time.time()
+        results = await self.async_db_manager.search_fulltext(query, top_k)
+        return results, time.time() - start_time
+    
+    def _format_results(self, search_results, score_key: str, mode: str) -> List[Dict[str, Any]]:
+        """Search rows as result dicts, scored by score_key"""
+        formatted_results = []
+        for result in search_results:
+            formatted_result = {
+                'id': result['id'],
+                'filename': result['filename'],
+                'content': result['content'],
+                'chunk_index': result['chunk_index'],
+                'metadata': result['metadata'],
+                'similarity_score': float(result[score_key])
+            }
+            if mode == "hybrid":
+                formatted_result['vector_rank'] = result['vector_rank']
+                formatted_result['text_rank'] = result['text_rank']
+            formatted_results.append(formatted_result)
+        return formatted_results
+    
+    def _vector_leg(self, query: str, top_k: int, query_embedding=None) -> tuple:
+        """Embed the query (unless given) and run the vector search; returns (results, seconds)"""
+        start_time = time.time()
+        # Generate embedding for the query
+        if query_embedding is None:
+            query_embedding = self.embeddings_manager.generate_embedding(query)
+        
+        # Search for similar documents (query embedding is adjusted to the storage profile's dimension)
+        results = self.db_manager.search_similar_documents(query_embedding, top_k)
+        return results, time.time() - start_time
+    
+    def _text_leg(self, query: str, top_k: int) -> tuple:
+        """Run the full-text search; returns (results, seconds)"""
+        start_time = time.time()
+        results = self.db_manager.search_fulltext(query, top_k)
+        return results, time.time() - start_time
+    
+    def _record_search(self, total_time: float, vector_time: float = None, text_time: float = None):
+        with self._search_lock:
+            self.search_stats['searches'] += 1
+            self.search_stats['total_time'] += total_time
+            if vector_time is not None:
+                self.search_stats['vector_legs'] += 1
+                self.search_stats['vector_leg_time'] += vector_time
+            if text_time is not None:
+                self.search_stats['text_legs'] += 1
+                self.search_stats['text_leg_time'] += text_time
+    
+    def get_search_stats(self) -> Dict[str, Any]:
+        """Search counts and average latencies (in milliseconds) overall and per leg"""
+        with self._search_lock:
+            stats = dict(self.search_stats)
+        return {
+            "mode": Config.SEARCH_MODE,
+            "searches": stats['searches'],
+            "avg_total_ms": stats['total_time'] / stats['searches'] * 1000 if stats['searches'] else 0.0,
+            "avg_vector_leg_ms": stats['vector_leg_time'] / stats['vector_legs'] * 1000 if stats['vector_legs'] else 0.0,
+            "avg_text_leg_ms": stats['text_leg_time'] / stats['text_legs'] * 1000 if stats['text_legs'] else 0.0
+        }
+    
     def get_system_stats(self) -> Dict[str, Any]:
         """Get system statistics"""
         try:
@@ -128,11 +663,18 @@ class RAGSystem:
             
             return {
                 "total_documents": document_count,
-                "original_vector_dimension": Config.VECTOR_DIMENSION,
-                "database_vector_dimension": Config.DB_VECTOR_DIMENSION,
+                "storage_profile": self.db_manager.storage_profile["name"],
+                "original_vector_dimension": self.embeddings_manager.dimension,
+                "database_vector_dimension": self.db_manager.dimension,
                 "chunk_size": Config.CHUNK_SIZE,
                 "chunk_overlap": Config.CHUNK_OVERLAP,
-                "embedding_model": Config.JINA_MODEL_NAME
+                "embedding_model": Config.JINA_MODEL_NAME,
+                "embedding_client": self.embeddings_manager.get_stats(),
+                "vector_storage": self.db_manager.get_storage_stats(),
+                "search": self.get_search_stats(),
+                "result_cache": self.result_cache.get_stats() if self.result_cache is not None else None,
+                "async_pool": self.async_db_manager.get_stats(),
+                "local_index": self.db_manager.local_index.get_stats() if self.db_manager.local_index is not None else None
             }
             
         except Exception as e:
@@ -142,7 +684,14 @@ class RAGSystem:
     def close(self):
         """Clean up resources"""
         try:
+            self.search_executor.shutdown(wait=True)
             self.db_manager.close()
+            self.embeddings_manager.close()
             logger.info("RAG system resources cleaned up")
         except Exception as e:
             logger.error(f"Error during cleanup: {e}")
+    
+    async def close_async(self):
+        """Close the async connection pool (inside its event loop), then everything else"""
+        await self.async_db_manager.close()
+        self.close()
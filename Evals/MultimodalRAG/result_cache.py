@@ -0,0 +1,189 @@
+import copy
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from embedding_cache import normalize_text
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class SearchResultCache:
+    def __init__(self, max_entries=256, ttl=300.0, similarity_threshold=0.95):
+        """
+        In-process cache of search results, looked up by query text and by query embedding
+        
+        Entries are keyed by (mode, top_k, normalized query text). A query that misses on its
+        text can still hit an entry of the same mode and top_k whose query embedding has cosine
+        similarity of at least similarity_threshold with its own. Entries expire after ttl
+        seconds, the least recently used go once max_entries is reached, and invalidate() drops
+        everything when the corpus changes. Results are deep-copied on the way in and out, so
+        callers may modify what they get back.
+        """
+        self.max_entries = max(1, int(max_entries))
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Normalized query embeddings, one row per slot; entries with an embedding own a slot
+        self._matrix = None
+        self._slot_keys = [None] * self.max_entries
+        self._free_slots = list(range(self.max_entries - 1, -1, -1))
+        # Bumped by invalidate(), so results of searches that started before it are not stored
+        self.generation = 0
+        self.stats = {
+            'exact_hits': 0,
+            'semantic_hits': 0,
+            'misses': 0,
+            'saved_time': 0.0,
+            'evictions': 0,
+            'expirations': 0,
+            'invalidations': 0
+        }
+    
+    def get(self, query, mode, top_k, start_time=None):
+        """
+        Cached results stored under exactly this query (after text normalization), or None
+        
+        start_time is when the caller's search began; time spent since then is not counted as saved.
+        """
+        start_time = start_time or time.time()
+        key = (mode, top_k, normalize_text(query))
+        with self._lock:
+            entry = self._live_entry_locked(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            self.stats['exact_hits'] += 1
+            self.stats['saved_time'] += max(0.0, entry['search_time'] - (time.time() - start_time))
+            return copy.deepcopy(entry['results'])
+    
+    def get_similar(self, query_embedding, mode, top_k, start_time=None):
+        """Cached results of the most similar query at or above the similarity threshold, or None (start_time as in get)"""
+        start_time = start_time or time.time()
+        query_vector = self._normalize(query_embedding)
+        with self._lock:
+            if self._matrix is None or self._matrix.shape[1] != query_vector.shape[0]:
+                return None
+            scores = self._matrix @ query_vector
+            for slot in np.argsort(-scores):
+                if scores[slot] < self.similarity_threshold:
+                    break
+                key = self._slot_keys[slot]
+                if key is None or key[0] != mode or key[1] != top_k:
+                    continue
+                entry = self._live_entry_locked(key)
+                if entry is None:
+                    continue
+                self._entries.move_to_end(key)
+                self.stats['semantic_hits'] += 1
+                self.stats['saved_time'] += max(0.0, entry['search_time'] - (time.time() - start_time))
+                logger.info(f"♻️  Reusing results of a similar query (cosine {scores[slot]:.3f})")
+                return copy.deepcopy(entry['results'])
+        return None
+    
+    def record_miss(self):
+        """Count a search that neither lookup could answer"""
+        with self._lock:
+            self.stats['misses'] += 1
+    
+    def put(self, query, mode, top_k, results, search_time, query_embedding=None, generation=None):
+        """
+        Store the results of a search that took search_time seconds
+        
+        generation is the value of self.generation when the search started; results are dropped
+        if the cache was invalidated in the meantime. Without query_embedding the entry only
+        serves exact hits.
+        """
+        key = (mode, top_k, normalize_text(query))
+        query_vector = self._normalize(query_embedding) if query_embedding is not None else None
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            if key in self._entries:
+                self._remove_locked(key)
+            while len(self._entries) >= self.max_entries:
+                oldest_key = next(iter(self._entries))
+                self._remove_locked(oldest_key)
+                self.stats['evictions'] += 1
+            
+            slot = None
+            if query_vector is not None:
+                if self._matrix is None or self._matrix.shape[1] != query_vector.shape[0]:
+                    # First embedding (or a new dimension): start an empty matrix, dropping slots of the old one
+                    self._matrix = np.zeros((self.max_entries, query_vector.shape[0]), dtype=np.float32)
+                    for entry in self._entries.values():
+                        entry['slot'] = None
+                    self._slot_keys = [None] * self.max_entries
+                    self._free_slots = list(range(self.max_entries - 1, -1, -1))
+                slot = self._free_slots.pop()
+                self._matrix[slot] = query_vector
+                self._slot_keys[slot] = key
+            
+            self._entries[key] = {
+                'results': copy.deepcopy(results),
+                'search_time': search_time,
+                'expires_at': time.time() + self.ttl,
+                'slot': slot
+            }
+    
+    def invalidate(self):
+        """Drop every entry, e.g. after the corpus changed"""
+        with self._lock:
+            dropped = len(self._entries)
+            for key in list(self._entries):
+                self._remove_locked(key)
+            self.generation += 1
+            self.stats['invalidations'] += 1
+        if dropped:
+            logger.info(f"🧹 Search result cache invalidated ({dropped} entries dropped)")
+    
+    def _live_entry_locked(self, key):
+        """The entry under key unless it is missing or expired (expired entries are removed)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry['expires_at'] <= time.time():
+            self._remove_locked(key)
+            self.stats['expirations'] += 1
+            return None
+        return entry
+    
+    def _remove_locked(self, key):
+        entry = self._entries.pop(key)
+        slot = entry['slot']
+        if slot is not None:
+            # Zero rows score 0, below any sensible threshold
+            self._matrix[slot] = 0.0
+            self._slot_keys[slot] = None
+            self._free_slots.append(slot)
+    
+    @staticmethod
+    def _normalize(embedding):
+        vector = np.asarray(embedding, dtype=np.float32)
+        return vector / max(float(np.linalg.norm(vector)), 1e-12)
+    
+    def get_stats(self):
+        """Hit counts, hit rate and the search time saved by hits (in milliseconds)"""
+        with self._lock:
+            stats = dict(self.stats)
+            entries = len(self._entries)
+        hits = stats['exact_hits'] + stats['semantic_hits']
+        lookups = hits + stats['misses']
+        return {
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "exact_hits": stats['exact_hits'],
+            "semantic_hits": stats['semantic_hits'],
+            "misses": stats['misses'],
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "saved_ms": round(stats['saved_time'] * 1000, 1),
+            "avg_saved_ms_per_hit": round(stats['saved_time'] / hits * 1000, 2) if hits else 0.0,
+            "evictions": stats['evictions'],
+            "expirations": stats['expirations'],
+            "invalidations": stats['invalidations']
+        }
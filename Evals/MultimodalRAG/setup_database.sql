@@ -16,7 +16,19 @@ CREATE TABLE IF NOT EXISTS documents (
     content TEXT NOT NULL,
     chunk_index INTEGER NOT NULL,
     metadata JSONB,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    file_path TEXT,
+    content_hash TEXT
+);
+
+-- Registry of ingested files (size, mtime and content hash) for incremental re-ingestion
+CREATE TABLE IF NOT EXISTS ingested_files (
+    file_path TEXT PRIMARY KEY,
+    size BIGINT NOT NULL,
+    mtime DOUBLE PRECISION NOT NULL,
+    content_hash TEXT NOT NULL,
+    chunk_count INTEGER,
+    ingested_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
 -- Create embeddings table with vector column
@@ -36,9 +48,28 @@ WITH (m = 16, ef_construction = 64);
 CREATE INDEX IF NOT EXISTS idx_documents_filename 
 ON documents(filename);
 
+-- Full-text search vector for hybrid search (FULLTEXT_CONFIG, 'english' by default)
+ALTER TABLE documents
+ADD COLUMN IF NOT EXISTS content_tsv tsvector
+GENERATED ALWAYS AS (to_tsvector('english'::regconfig, content)) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_documents_content_tsv 
+ON documents USING gin (content_tsv);
+
+CREATE INDEX IF NOT EXISTS idx_document_embeddings_document_id 
+ON document_embeddings(document_id);
+
+-- Other storage profiles (STORAGE_PROFILE) get their own table, created by the application, e.g.:
+--   document_embeddings_dim512  embedding vector(512),  HNSW on (embedding vector_cosine_ops)
+--   document_embeddings_halfvec embedding halfvec(2048), HNSW on (embedding halfvec_cosine_ops)
+--   document_embeddings_binary  embedding vector(2048), HNSW on ((binary_quantize(embedding)::bit(2048)) bit_hamming_ops)
+
 CREATE INDEX IF NOT EXISTS idx_documents_created_at 
 ON documents(created_at);
 
+CREATE INDEX IF NOT EXISTS idx_documents_file_path 
+ON documents(file_path);
+
 -- Create a user for the application (optional but recommended)
 -- Replace 'your_password' with a secure password
 CREATE USER rag_user WITH PASSWORD 'your_password';
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Storage Profile Benchmark for RAG System
+Compares recall@k, search latency and storage of each vector storage profile on the stored corpus
+"""
+
+import argparse
+import logging
+import random
+import time
+import numpy as np
+from config import Config
+from database import DatabaseManager
+from embeddings import EmbeddingsManager, EmbeddingBatchError
+from rag_system import RAGSystem
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Per-query profiling logs would drown the results table
+for noisy_logger in ("database", "embeddings", "embedding_cache", "rag_system"):
+    logging.getLogger(noisy_logger).setLevel(logging.WARNING)
+
+def normalize(vectors):
+    """Scale rows to unit length so dot products are cosine similarities"""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+def iter_documents(connection, batch_size):
+    """Yield (ids, contents) batches of every stored chunk in id order"""
+    last_id = 0
+    while True:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT id, content FROM documents WHERE id > %s ORDER BY id LIMIT %s", (last_id, batch_size))
+            rows = cursor.fetchall()
+        connection.commit()
+        if not rows:
+            return
+        last_id = rows[-1][0]
+        yield [row[0] for row in rows], [row[1] for row in rows]
+
+def sample_queries(connection, count, seed, words=12):
+    """Query texts cut from the middle of randomly chosen stored chunks"""
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT id FROM documents")
+        ids = [row[0] for row in cursor.fetchall()]
+        chosen = random.Random(seed).sample(ids, min(count, len(ids)))
+        cursor.execute("SELECT content FROM documents WHERE id = ANY(%s) ORDER BY id", (chosen,))
+        contents = [row[0] for row in cursor.fetchall()]
+    connection.commit()
+    queries = []
+    for content in contents:
+        tokens = content.split()
+        start = len(tokens) // 3
+        queries.append(" ".join(tokens[start:start + words]))
+    return [query for query in queries if query]
+
+def embed(embeddings_manager, texts):
+    """Embeddings for texts (served from the embedding cache when possible), None where embedding failed"""
+    try:
+        return embeddings_manager.generate_embeddings_batch(texts)
+    except EmbeddingBatchError as e:
+        print(f"  ⚠️  {e}")
+        return e.embeddings
+
+def exact_neighbors(connection, queries, top_k, batch_size=1000):
+    """
+    Ground truth: exact top-k document ids per query by cosine similarity of the full 2048-dimension embeddings
+    
+    Documents are scored in batches, so memory stays at one batch of embeddings however large the corpus.
+    """
+    embeddings_manager = EmbeddingsManager("full")
+    try:
+        query_matrix = normalize(np.stack(embed(embeddings_manager, queries)))
+        best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+        best_ids = np.zeros((len(queries), 0), dtype=np.int64)
+        for ids, contents in iter_documents(connection, batch_size):
+            embeddings = embed(embeddings_manager, contents)
+            kept = [i for i, embedding in enumerate(embeddings) if embedding is not None]
+            if not kept:
+                continue
+            scores = query_matrix @ normalize(np.stack([embeddings[i] for i in kept])).T
+            # Merge this batch into the running top-k of every query
+            best_scores = np.concatenate([best_scores, scores], axis=1)
+            best_ids = np.concatenate([best_ids, np.broadcast_to(np.array([ids[i] for i in kept]), scores.shape)], axis=1)
+            if best_scores.shape[1] > top_k:
+                top = np.argpartition(-best_scores, top_k - 1, axis=1)[:, :top_k]
+                best_scores = np.take_along_axis(best_scores, top, axis=1)
+                best_ids = np.take_along_axis(best_ids, top, axis=1)
+        return [set(row.tolist()) for row in best_ids]
+    finally:
+        embeddings_manager.close()
+
+def benchmark_profile(name, queries, truth, top_k):
+    """Backfill one storage profile, then measure its recall@k, search latency and storage"""
+    print(f"\n📦 Profile: {name}")
+    rag = RAGSystem(name)
+    try:
+        backfill_start = time.time()
+        backfill = rag.backfill_embeddings()
+        if backfill['chunks_embedded']:
+            print(f"  🔁 Backfilled {backfill['chunks_embedded']} embeddings in {time.time() - backfill_start:.1f}s")
+        
+        query_embeddings = embed(rag.embeddings_manager, queries)
+        pairs = [(embedding, expected) for embedding, expected in zip(query_embeddings, truth) if embedding is not None]
+        
+        # One untimed pass so every profile is measured with its table and index in the buffer cache
+        for embedding, _ in pairs:
+            rag.db_manager.search_similar_documents(embedding, top_k)
+        
+        latencies = []
+        recalls = []
+        for embedding, expected in pairs:
+            start_time = time.perf_counter()
+            results = rag.db_manager.search_similar_documents(embedding, top_k)
+            latencies.append((time.perf_counter() - start_time) * 1000)
+            recalls.append(len({result['id'] for result in results} & expected) / max(1, len(expected)))
+        
+        storage = rag.db_manager.get_storage_stats()
+        result = {
+            "profile": name,
+            "column": storage.get("column", "?"),
+            "vectors": storage.get("vectors", 0),
+            "storage_mb": (storage.get("table_bytes", 0) + storage.get("index_bytes", 0)) / 1024 / 1024,
+            "index_mb": storage.get("index_bytes", 0) / 1024 / 1024,
+            "bytes_per_vector": storage.get("bytes_per_vector", 0.0),
+            "recall": float(np.mean(recalls)) if recalls else 0.0,
+            "p50_ms": float(np.percentile(latencies, 50)) if latencies else 0.0,
+            "p95_ms": float(np.percentile(latencies, 95)) if latencies else 0.0
+        }
+        print(f"  ✅ recall@{top_k} {result['recall']:.3f}, p50 {result['p50_ms']:.2f} ms, "
+              f"{result['storage_mb']:.1f} MB ({result['bytes_per_vector']:.0f} bytes/vector)")
+        return result
+    finally:
+        rag.close()
+
+def main():
+    """Run the storage profile benchmark"""
+    parser = argparse.ArgumentParser(description="Compare recall, latency and storage of vector storage profiles")
+    parser.add_argument("--profiles", default=",".join(Config.STORAGE_PROFILES),
+                        help="Comma-separated storage profiles (default: all)")
+    parser.add_argument("--queries", type=int, default=50, help="Queries sampled from stored chunks (default: 50)")
+    parser.add_argument("--queries-file", help="File with one query per line, instead of sampled queries")
+    parser.add_argument("--top-k", type=int, default=10, help="Results per query (default: 10)")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for query sampling (default: 42)")
+    args = parser.parse_args()
+    
+    profiles = [name.strip() for name in args.profiles.split(",") if name.strip()]
+    for name in profiles:
+        Config.get_storage_profile(name)
+    # Measure pgvector itself, not the local search tier
+    Config.LOCAL_INDEX = False
+    
+    print("🚀 Vector Storage Profile Benchmark")
+    print("=" * 60)
+    
+    # Query sampling and ground truth only read the documents table
+    db_manager = DatabaseManager("full")
+    try:
+        connection = db_manager.connection
+        if args.queries_file:
+            with open(args.queries_file, encoding="utf-8") as file:
+                queries = [line.strip() for line in file if line.strip()]
+        else:
+            queries = sample_queries(connection, args.queries, args.seed)
+        if not queries:
+            print("❌ No stored documents to benchmark; upload documents first")
+            return
+        print(f"📝 {len(queries)} queries, top_k={args.top_k}, {db_manager.get_document_count()} stored chunks")
+        
+        start_time = time.time()
+        truth = exact_neighbors(connection, queries, args.top_k)
+        print(f"🎯 Exact ground truth (2048-dimension cosine) computed in {time.time() - start_time:.1f}s")
+    finally:
+        db_manager.close()
+    
+    results = []
+    for name in profiles:
+        try:
+            results.append(benchmark_profile(name, queries, truth, args.top_k))
+        except Exception as e:
+            print(f"  ❌ Skipped: {e}")
+    
+    print("\n" + "=" * 100)
+    print(f"{'Profile':<10} {'Column':<16} {'Vectors':>9} {'Total MB':>10} {'Index MB':>10} {'Bytes/vec':>10} "
+          f"{'Recall@' + str(args.top_k):>10} {'p50 ms':>8} {'p95 ms':>8}")
+    print("-" * 100)
+    for result in results:
+        print(f"{result['profile']:<10} {result['column']:<16} {result['vectors']:>9} {result['storage_mb']:>10.1f} "
+              f"{result['index_mb']:>10.1f} {result['bytes_per_vector']:>10.0f} {result['recall']:>10.3f} "
+              f"{result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f}")
+    print("=" * 100)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import struct
+
+import numpy as np
+
+from database import (BINARY_ELEMENT_TYPES, PGCOPY_HEADER, PGCOPY_TRAILER, encode_vector_binary,
+                      iter_copy_binary_rows, vector_literal, version_tuple)
+
+
+def copy_stream(rows, header=PGCOPY_HEADER):
+    """A binary COPY stream as PostgreSQL sends it for rows of raw field values (None for NULL)"""
+    parts = [header]
+    for fields in rows:
+        parts.append(struct.pack('>h', len(fields)))
+        for value in fields:
+            if value is None:
+                parts.append(struct.pack('>i', -1))
+            else:
+                parts.append(struct.pack('>i', len(value)) + value)
+    parts.append(PGCOPY_TRAILER)
+    return b''.join(parts)
+
+
+def decode_vector(data, column_type='vector'):
+    dimension = struct.unpack_from('>h', data)[0]
+    return np.frombuffer(data, dtype=BINARY_ELEMENT_TYPES[column_type], count=dimension, offset=4)
+
+
+def test_encode_vector_binary_layout():
+    data = encode_vector_binary(np.array([1.0, -2.5, 0.0], dtype=np.float32))
+    assert data[:4] == struct.pack('>hh', 3, 0)
+    assert struct.unpack('>3f', data[4:]) == (1.0, -2.5, 0.0)
+
+
+def test_vector_rows_round_trip_through_copy_stream():
+    embeddings = np.random.default_rng(1).standard_normal((3, 2000)).astype(np.float32)
+    rows = [[struct.pack('>i', row_id), struct.pack('>i', row_id + 100), encode_vector_binary(embedding)]
+            for row_id, embedding in enumerate(embeddings, 1)]
+    decoded = list(iter_copy_binary_rows(copy_stream(rows)))
+    assert len(decoded) == 3
+    for (row_id, document_id, embedding), expected_id, expected in zip(decoded, (1, 2, 3), embeddings):
+        assert struct.unpack('>i', row_id)[0] == expected_id
+        assert struct.unpack('>i', document_id)[0] == expected_id + 100
+        np.testing.assert_array_equal(decode_vector(embedding), expected)
+
+
+def test_halfvec_round_trip_keeps_float16_precision():
+    embedding = np.array([0.1, -0.333, 2.0, 65504.0], dtype=np.float32)
+    rows = [[encode_vector_binary(embedding, 'halfvec')]]
+    (decoded,), = iter_copy_binary_rows(copy_stream(rows))
+    np.testing.assert_array_equal(decode_vector(decoded, 'halfvec'), embedding.astype(np.float16))
+
+
+def test_copy_stream_nulls_empty_stream_and_header_extension():
+    assert list(iter_copy_binary_rows(copy_stream([]))) == []
+    header = b'PGCOPY\n\xff\r\n\x00' + struct.pack('>ii', 0, 4) + b'\x00\x00\x00\x00'
+    assert list(iter_copy_binary_rows(copy_stream([[b'\x00\x00\x00\x07', None]], header))) == [[b'\x00\x00\x00\x07', None]]
+
+
+def test_vector_literal_and_version_tuple():
+    assert vector_literal(np.array([1.0, 0.5])) == '[1.0,0.5]'
+    assert version_tuple('0.7.4') == (0, 7, 4)
+    assert version_tuple('0.8.0') > version_tuple('0.7.10')
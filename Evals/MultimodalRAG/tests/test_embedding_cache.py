@@ -0,0 +1,88 @@
+import numpy as np
+
+import embedding_cache
+from embedding_cache import EmbeddingCache, normalize_text, text_hash
+
+DIMENSION = 256
+ROW_BYTES = DIMENSION * 4
+
+
+class FakeClock:
+    """Stands in for the time module so rows get distinct, increasing last_used values"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        self.now += 1.0
+        return self.now
+
+
+def vector(seed):
+    return np.random.default_rng(seed).standard_normal(DIMENSION).astype(np.float32)
+
+
+def test_text_keys_are_whitespace_and_unicode_normalized():
+    assert normalize_text('  café  menu\n') == 'café menu'
+    assert text_hash('café menu') == text_hash(' café   menu ')
+
+
+def test_round_trip_and_hit_counts(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / 'cache.sqlite3'), 'model', DIMENSION)
+    cache.put_many(['a', 'b'], [vector(1), None])
+    found = cache.get_many(['a', 'b', ' a '])
+    np.testing.assert_array_equal(found[0], vector(1))
+    assert found[1] is None
+    np.testing.assert_array_equal(found[2], vector(1))
+    assert (cache.get_stats()['hits'], cache.get_stats()['misses']) == (2, 1)
+    cache.close()
+
+
+def test_entries_are_separated_by_model_and_dimension(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    cache = EmbeddingCache(path, 'model-a', DIMENSION)
+    cache.put_many(['a'], [vector(1)])
+    cache.close()
+    other = EmbeddingCache(path, 'model-b', DIMENSION)
+    assert other.get_many(['a']) == [None]
+    other.close()
+
+
+def test_least_recently_used_rows_are_evicted_below_the_limit(tmp_path, monkeypatch):
+    monkeypatch.setattr(embedding_cache, 'time', FakeClock())
+    cache = EmbeddingCache(str(tmp_path / 'cache.sqlite3'), 'model', DIMENSION, max_size_mb=10 * ROW_BYTES / 1024 / 1024)
+    for index in range(10):
+        cache.put_many([f"text {index}"], [vector(index)])
+    # Reading text 0 makes it the most recently used, so texts 1 and 2 go first
+    cache.get_many(['text 0'])
+    cache.put_many(['text 10'], [vector(10)])
+
+    stats = cache.get_stats()
+    assert stats['evictions'] == 2
+    assert stats['entries'] == 9
+    assert cache.size_bytes <= cache.max_bytes * embedding_cache.EVICTION_TARGET
+    present = [embedding is not None for embedding in cache.get_many([f"text {index}" for index in range(11)])]
+    assert present == [True, False, False] + [True] * 8
+    cache.close()
+
+
+def test_size_is_measured_again_when_reopened(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    cache = EmbeddingCache(path, 'model', DIMENSION)
+    cache.put_many(['a', 'b'], [vector(1), vector(2)])
+    cache.close()
+    reopened = EmbeddingCache(path, 'model', DIMENSION)
+    assert (reopened.entries, reopened.size_bytes) == (2, 2 * ROW_BYTES)
+    reopened.close()
+
+
+def test_query_lru_is_bounded_and_falls_back_to_the_store(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / 'cache.sqlite3'), 'model', DIMENSION, query_cache_size=2)
+    for index in range(3):
+        cache.put_query(f"query {index}", vector(index))
+    assert cache.get_stats()['query_lru_entries'] == 2
+    np.testing.assert_array_equal(cache.get_query('query 0'), vector(0))
+    assert cache.get_stats()['query_misses'] == 1
+    np.testing.assert_array_equal(cache.get_query('query 0'), vector(0))
+    assert cache.get_stats()['query_hits'] == 1
+    cache.close()
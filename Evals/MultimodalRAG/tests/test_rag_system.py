@@ -0,0 +1,66 @@
+import json
+from collections import Counter
+
+import pytest
+
+from rag_system import RAGSystem, reciprocal_rank_fusion
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    vector = [{'id': 1, 'content': 'a'}, {'id': 2, 'content': 'b'}, {'id': 3, 'content': 'c'}]
+    text = [{'id': 3, 'content': 'c'}, {'id': 4, 'content': 'd'}]
+    fused = reciprocal_rank_fusion({'vector': vector, 'text': text}, k=60)
+    # 2 and 4 both rank second in one list; ties keep the order documents were first seen
+    assert [row['id'] for row in fused] == [3, 1, 2, 4]
+    assert fused[0]['fusion_score'] == pytest.approx(1 / 63 + 1 / 61)
+    assert (fused[0]['vector_rank'], fused[0]['text_rank']) == (3, 1)
+    assert (fused[1]['vector_rank'], fused[1]['text_rank']) == (1, None)
+    assert fused[3]['content'] == 'd'
+
+
+def test_reciprocal_rank_fusion_merges_row_fields_and_handles_empty_lists():
+    fused = reciprocal_rank_fusion({'vector': [{'id': 1, 'similarity': 0.9}],
+                                    'text': [{'id': 1, 'text_score': 0.2}]}, k=1)
+    assert fused == [{'vector_rank': 1, 'text_rank': 1, 'fusion_score': 1.0,
+                      'id': 1, 'similarity': 0.9, 'text_score': 0.2}]
+    assert reciprocal_rank_fusion({'vector': [], 'text': []}) == []
+
+
+def make_chunk(index, text_hash):
+    return {'content': f"text {text_hash}", 'chunk_index': index, 'text_hash': text_hash, 'file_path': '/docs/a.pdf'}
+
+
+def diff_file(chunks, stored):
+    # _diff_file only reads its arguments, so no database or API connection is needed
+    stats = Counter()
+    fingerprint = {'file_path': '/docs/a.pdf', 'size': 10, 'mtime': 1.0, 'content_hash': 'abc'}
+    new_chunks, update = RAGSystem.__new__(RAGSystem)._diff_file(fingerprint, chunks, stored, stats)
+    return new_chunks, update, stats
+
+
+def test_diff_file_reuses_matching_chunks_and_deletes_stale_ones():
+    chunks = [make_chunk(0, 'h-new'), make_chunk(1, 'h-kept')]
+    stored = [(10, 0, 'h-kept'), (11, 1, 'h-gone')]
+    new_chunks, update, stats = diff_file(chunks, stored)
+    assert [chunk['text_hash'] for chunk in new_chunks] == ['h-new']
+    assert update['delete_ids'] == [11]
+    assert [(document_id, index) for document_id, index, _ in update['reindex']] == [(10, 1)]
+    assert json.loads(update['reindex'][0][2])['chunk_index'] == 1
+    assert update['fingerprint']['chunk_count'] == 2
+    assert (stats['chunks_reused'], stats['chunks_deleted']) == (1, 1)
+
+
+def test_diff_file_matches_repeated_text_once_per_stored_row():
+    chunks = [make_chunk(0, 'h'), make_chunk(1, 'h'), make_chunk(2, 'h')]
+    new_chunks, update, _ = diff_file(chunks, [(10, 0, 'h'), (11, 1, 'h')])
+    assert sorted(document_id for document_id, _, _ in update['reindex']) == [10, 11]
+    assert [chunk['chunk_index'] for chunk in new_chunks] == [2]
+    assert update['delete_ids'] == []
+
+
+def test_diff_file_unchanged_content_only_refreshes_the_registry():
+    new_chunks, update, stats = diff_file(None, [(10, 0, 'h')])
+    assert new_chunks == []
+    assert (update['delete_ids'], update['reindex']) == ([], [])
+    assert update['fingerprint']['content_hash'] == 'abc'
+    assert stats['files_unchanged'] == 1
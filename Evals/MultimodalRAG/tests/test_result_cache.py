@@ -0,0 +1,75 @@
+import time
+
+from result_cache import SearchResultCache
+
+
+def results(*ids):
+    return [{'id': document_id, 'metadata': {'page': document_id}} for document_id in ids]
+
+
+def test_exact_hit_ignores_whitespace_and_depends_on_mode_and_top_k():
+    cache = SearchResultCache()
+    cache.put('summer camp', 'vector', 5, results(1, 2), 0.2)
+    assert cache.get('  summer   camp ', 'vector', 5) == results(1, 2)
+    assert cache.get('summer camp', 'hybrid', 5) is None
+    assert cache.get('summer camp', 'vector', 3) is None
+    assert cache.get_stats()['exact_hits'] == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = SearchResultCache(max_entries=2)
+    cache.put('a', 'vector', 5, results(1), 0.1, [1.0, 0.0])
+    cache.put('b', 'vector', 5, results(2), 0.1, [0.0, 1.0])
+    cache.get('a', 'vector', 5)
+    cache.put('c', 'vector', 5, results(3), 0.1, [0.7, 0.7])
+    assert cache.get('b', 'vector', 5) is None
+    assert cache.get('a', 'vector', 5) == results(1)
+    assert cache.get('c', 'vector', 5) == results(3)
+    # The evicted entry's embedding slot was freed and reused
+    assert cache.get_similar([0.0, 1.0], 'vector', 5) is None
+    assert cache.get_stats()['evictions'] == 1
+
+
+def test_entries_expire_after_ttl():
+    cache = SearchResultCache(ttl=0.05)
+    cache.put('a', 'text', 5, results(1), 0.1)
+    time.sleep(0.1)
+    assert cache.get('a', 'text', 5) is None
+    assert cache.get_stats()['expirations'] == 1
+
+
+def test_similar_query_hits_above_threshold_only():
+    cache = SearchResultCache(similarity_threshold=0.95)
+    cache.put('registration form', 'vector', 5, results(1), 0.1, [1.0, 0.0, 0.0])
+    assert cache.get_similar([0.99, 0.05, 0.0], 'vector', 5) == results(1)
+    assert cache.get_similar([0.5, 0.5, 0.5], 'vector', 5) is None
+    assert cache.get_similar([1.0, 0.0, 0.0], 'vector', 3) is None
+    assert cache.get_stats()['semantic_hits'] == 1
+
+
+def test_entries_without_embedding_only_serve_exact_hits():
+    cache = SearchResultCache()
+    cache.put('registration form', 'hybrid', 5, results(1), 0.1)
+    assert cache.get_similar([1.0, 0.0], 'hybrid', 5) is None
+
+
+def test_invalidate_drops_entries_and_stale_puts():
+    cache = SearchResultCache()
+    generation = cache.generation
+    cache.put('a', 'vector', 5, results(1), 0.1, [1.0, 0.0])
+    cache.invalidate()
+    assert cache.get('a', 'vector', 5) is None
+    assert cache.get_similar([1.0, 0.0], 'vector', 5) is None
+    # A search that started before the invalidation does not repopulate the cache
+    cache.put('b', 'vector', 5, results(2), 0.1, generation=generation)
+    assert cache.get('b', 'vector', 5) is None
+
+
+def test_callers_cannot_modify_cached_results():
+    cache = SearchResultCache()
+    stored = results(1)
+    cache.put('a', 'vector', 5, stored, 0.1, [1.0, 0.0])
+    stored[0]['metadata']['page'] = 99
+    cache.get('a', 'vector', 5)[0]['metadata']['page'] = 98
+    cache.get_similar([1.0, 0.0], 'vector', 5)[0]['metadata']['page'] = 97
+    assert cache.get('a', 'vector', 5) == results(1)
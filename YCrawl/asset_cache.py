@@ -0,0 +1,84 @@
+"""
+On-disk subresource cache for YCrawl PDF rendering
+Stores stylesheets, scripts, images and fonts fetched by the renderer so each asset is downloaded once per crawl
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+
+class AssetCache:
+    """Content store for subresources, keyed by the SHA-256 of their URL"""
+
+    def __init__(self, cache_dir: str, max_asset_bytes: int = 20 * 1024 * 1024):
+        """
+        Initialize the cache
+
+        Args:
+            cache_dir: Directory holding cached asset bodies and their metadata
+            max_asset_bytes: Responses larger than this are served but not cached
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_asset_bytes = max_asset_bytes
+        self._lock = threading.Lock()
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'bytes_served': 0,
+            'bytes_stored': 0
+        }
+
+    def _paths(self, url: str) -> Tuple[Path, Path]:
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return self.cache_dir / key, self.cache_dir / f"{key}.json"
+
+    def get(self, url: str) -> Optional[Tuple[bytes, Dict[str, str]]]:
+        """Return (body, headers) for a cached URL, or None on a miss"""
+        body_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, 'r') as f:
+                headers = json.load(f)
+            with open(body_path, 'rb') as f:
+                body = f.read()
+        except (IOError, ValueError):
+            self._count('misses', 1)
+            return None
+        self._count('hits', 1)
+        self._count('bytes_served', len(body))
+        return body, headers
+
+    def put(self, url: str, body: bytes, headers: Dict[str, str]):
+        """Store an asset body; files are written to a temp name and renamed so readers never see partial data"""
+        if len(body) > self.max_asset_bytes:
+            return
+        body_path, meta_path = self._paths(url)
+        suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            tmp_body = body_path.with_name(body_path.name + suffix)
+            with open(tmp_body, 'wb') as f:
+                f.write(body)
+            os.replace(tmp_body, body_path)
+
+            # Bodies are stored decoded, so only the content type is worth keeping
+            kept = {k: v for k, v in headers.items() if k.lower() == 'content-type'}
+            tmp_meta = meta_path.with_name(meta_path.name + suffix)
+            with open(tmp_meta, 'w') as f:
+                json.dump(kept, f)
+            os.replace(tmp_meta, meta_path)
+            self._count('bytes_stored', len(body))
+        except IOError as e:
+            print(f"  ⚠ Could not cache asset {url}: {e}")
+
+    def _count(self, key: str, amount: int):
+        with self._lock:
+            self.stats[key] += amount
+
+    def get_stats(self) -> Dict:
+        """Snapshot of cache hit/miss counters"""
+        with self._lock:
+            return dict(self.stats)
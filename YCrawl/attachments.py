@@ -0,0 +1,260 @@
+"""
+Background attachment downloader for YCrawl
+Streams linked files (PDF, DOCX, XLSX, ...) over a pooled HTTP session while page crawling continues
+"""
+
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Set
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from politeness import RETRYABLE_STATUSES, parse_retry_after
+from telemetry import status_class
+
+MIN_CHUNK_SIZE = 64 * 1024
+MAX_CHUNK_SIZE = 1024 * 1024
+
+
+def choose_chunk_size(content_length: int = None) -> int:
+    """Pick a read size: about 1/16 of the file, clamped to 64 KB - 1 MB"""
+    if not content_length:
+        return MIN_CHUNK_SIZE * 4
+    return max(MIN_CHUNK_SIZE, min(MAX_CHUNK_SIZE, content_length // 16))
+
+
+def resume_validator(headers) -> str:
+    """Validator for If-Range: a strong ETag, else Last-Modified ('' when the server sent neither)"""
+    etag = headers.get('ETag') or ''
+    if etag and not etag.startswith('W/'):
+        return etag
+    return headers.get('Last-Modified') or ''
+
+
+class AttachmentDownloader:
+    """Bounded pool of parallel file transfers with HTTP Range resume and atomic writes"""
+
+    def __init__(self, output_dir: Path, max_workers: int = 4, timeout: float = 30.0, scheduler=None,
+                 content_store=None, telemetry=None, max_retries: int = 3):
+        """
+        Initialize the downloader
+
+        Args:
+            output_dir: Directory the files are saved to
+            max_workers: Number of transfers running at the same time
+            timeout: Connect/read timeout in seconds for each request
+            scheduler: Optional PolitenessScheduler that paces requests per host
+            content_store: Optional ContentStore; files are then saved under their SHA-256
+                and identical files linked from different URLs are stored once
+            telemetry: Optional Telemetry recording transfer times, file sizes and failures
+            max_retries: Retries of a request answered with 429 or 5xx
+        """
+        self.output_dir = Path(output_dir)
+        self.timeout = timeout
+        self.scheduler = scheduler
+        self.content_store = content_store
+        self.telemetry = telemetry
+        self.max_retries = max_retries
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="attachment")
+        self._lock = threading.Lock()
+        self._claimed: Set[str] = set()
+        self._stopping = False
+        self._started_at = None
+        self._finished_at = None
+        self.stats = {
+            'files_downloaded': 0,
+            'files_skipped': 0,
+            'files_failed': 0,
+            'files_resumed': 0,
+            'retries': 0,
+            'files_deduplicated': 0,
+            'bytes_downloaded': 0,
+            'transfer_time': 0.0
+        }
+
+    def local_filename(self, file_url: str) -> str:
+        """Name a download after the last path segment of its URL"""
+        return file_url.split('/')[-1].split('?')[0]
+
+    def submit(self, file_url: str) -> bool:
+        """
+        Queue a file for background download
+
+        Returns:
+            True if the download was queued, False if the file is already on disk or queued
+        """
+        local_filename = self.local_filename(file_url)
+        if self.content_store is not None:
+            # Files are stored by content, so only the URL identifies a download
+            claim_key = file_url
+            url_hash = hashlib.sha1(file_url.encode('utf-8')).hexdigest()[:16]
+            extension = os.path.splitext(local_filename)[1].lower()
+            local_path = self.output_dir / 'blobs' / 'partial' / f"{url_hash}{extension}"
+        else:
+            claim_key = local_filename
+            local_path = self.output_dir / local_filename
+        with self._lock:
+            if self._stopping or claim_key in self._claimed:
+                return False
+            self._claimed.add(claim_key)
+            if self._started_at is None:
+                self._started_at = time.time()
+        stored_path = self.content_store.find_file(file_url) if self.content_store is not None else None
+        if stored_path or (self.content_store is None and local_path.exists()):
+            print(f"  ✓ File already downloaded: {stored_path or local_filename}")
+            self._count('files_skipped', 1)
+            return False
+        self._executor.submit(self._download, file_url, local_path)
+        return True
+
+    def _request(self, file_url: str, part_path: Path, validator_path: Path):
+        """
+        Send the GET for a download, paced by the scheduler and retried on 429/5xx
+
+        A partial file is resumed with Range plus If-Range carrying the validator saved when it
+        was started, so a server whose file changed answers 200 with the whole new file instead
+        of a tail to be stitched onto the old bytes. Partial files without a validator are
+        downloaded again from the start.
+
+        Returns:
+            (response, offset): offset is the size of the partial file the Range asked to resume from
+        """
+        attempt = 0
+        while True:
+            offset = part_path.stat().st_size if part_path.exists() else 0
+            validator = validator_path.read_text(encoding='utf-8').strip() if offset and validator_path.exists() else ''
+            headers = {'Range': f'bytes={offset}-', 'If-Range': validator} if validator else {}
+            if not validator:
+                offset = 0
+            if self.scheduler is not None:
+                self.scheduler.acquire(file_url)
+            r = self.session.get(file_url, stream=True, timeout=self.timeout, headers=headers)
+            if r.status_code == 416 and headers:
+                # The saved range is no longer valid (file shrank or already complete); start over
+                r.close()
+                validator_path.unlink(missing_ok=True)
+                part_path.unlink(missing_ok=True)
+                continue
+
+            retry_after = parse_retry_after(r.headers.get('Retry-After'))
+            if self.scheduler is not None:
+                delay = self.scheduler.record_response(file_url, r.status_code, retry_after)
+            elif r.status_code in RETRYABLE_STATUSES:
+                delay = retry_after if retry_after is not None else min(60.0, 2.0 ** attempt)
+            else:
+                delay = None
+            if delay is None or attempt >= self.max_retries:
+                return r, offset
+            r.close()
+            attempt += 1
+            self._count('retries', 1)
+            if self.telemetry is not None:
+                self.telemetry.count_retry(status_class(r.status_code))
+            print(f"  ↻ HTTP {r.status_code} for {file_url}, retry {attempt}/{self.max_retries} in {delay:.1f}s")
+            if self.scheduler is None:
+                # With a scheduler, acquire() waits out the host's backoff
+                time.sleep(delay)
+
+    def _download(self, file_url: str, local_path: Path):
+        """Stream one file to <name>.part, resuming a previous partial transfer, then rename into place"""
+        part_path = local_path.with_name(local_path.name + '.part')
+        validator_path = local_path.with_name(local_path.name + '.part.validator')
+        sha256 = hashlib.sha256() if self.content_store is not None else None
+        started = time.perf_counter()
+        received = 0
+        try:
+            if self.scheduler is not None and not self.scheduler.is_allowed(file_url):
+                print(f"  ⊘ Disallowed by robots.txt: {file_url}")
+                return
+            r, offset = self._request(file_url, part_path, validator_path)
+
+            with r:
+                r.raise_for_status()
+                resumed = bool(offset) and r.status_code == 206
+                if resumed:
+                    self._count('files_resumed', 1)
+                content_length = int(r.headers.get('Content-Length') or 0)
+
+                if sha256 is not None and resumed:
+                    with open(part_path, 'rb') as existing:
+                        for chunk in iter(lambda: existing.read(MAX_CHUNK_SIZE), b''):
+                            sha256.update(chunk)
+                part_path.parent.mkdir(parents=True, exist_ok=True)
+                if not resumed:
+                    # Remember what this transfer downloads, so a later resume can ask for the same version
+                    validator = resume_validator(r.headers)
+                    if validator:
+                        validator_path.write_text(validator, encoding='utf-8')
+                    else:
+                        validator_path.unlink(missing_ok=True)
+                with open(part_path, 'ab' if resumed else 'wb') as f:
+                    for chunk in r.iter_content(chunk_size=choose_chunk_size(content_length)):
+                        if self._stopping:
+                            print(f"  ⚠ Download paused, partial file kept: {part_path.name}")
+                            return
+                        f.write(chunk)
+                        if sha256 is not None:
+                            sha256.update(chunk)
+                        received += len(chunk)
+            validator_path.unlink(missing_ok=True)
+            if self.telemetry is not None:
+                self.telemetry.record_stage('download', time.perf_counter() - started)
+                self.telemetry.observe('attachment_size_bytes', part_path.stat().st_size)
+
+            if self.content_store is not None:
+                stored_path, duplicate = self.content_store.commit_file(
+                    file_url, part_path, sha256.hexdigest(), local_path.suffix)
+                self._count('files_downloaded', 1)
+                if duplicate:
+                    self._count('files_deduplicated', 1)
+                    print(f"  = Duplicate file, already stored as {stored_path}: {file_url}")
+                else:
+                    print(f"  ✓ File downloaded: {stored_path}")
+                return
+            os.replace(part_path, local_path)
+            self._count('files_downloaded', 1)
+            print(f"  ✓ File downloaded: {local_path.name}")
+        except Exception as e:
+            self._count('files_failed', 1)
+            if self.telemetry is not None:
+                self.telemetry.count_error('download', e)
+            print(f"  ✗ Failed to download {file_url}: {e}")
+        finally:
+            with self._lock:
+                self.stats['bytes_downloaded'] += received
+                self.stats['transfer_time'] += time.perf_counter() - started
+                self._finished_at = time.time()
+
+    def _count(self, key: str, amount):
+        with self._lock:
+            self.stats[key] += amount
+
+    def get_stats(self) -> Dict:
+        """Snapshot of transfer counters, including aggregate bytes/sec over the download window"""
+        with self._lock:
+            stats = dict(self.stats)
+            window = (self._finished_at or time.time()) - self._started_at if self._started_at else 0.0
+        stats['bytes_per_second'] = stats['bytes_downloaded'] / window if window > 0 else 0.0
+        return stats
+
+    def close(self, cancel_pending: bool = False):
+        """
+        Wait for queued downloads to finish
+
+        Args:
+            cancel_pending: Drop queued downloads and pause running ones (their .part files are resumed next time)
+        """
+        if cancel_pending:
+            with self._lock:
+                self._stopping = True
+        self._executor.shutdown(wait=True, cancel_futures=cancel_pending)
+        self.session.close()
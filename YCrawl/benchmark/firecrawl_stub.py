@@ -0,0 +1,54 @@
+"""
+Offline stand-in for the firecrawl package used by the benchmark
+FirecrawlApp.scrape_url fetches the page directly instead of calling the Firecrawl API
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class ScrapeResponse:
+    """The parts of a Firecrawl scrape response that YCrawl reads"""
+
+    def __init__(self, html: Optional[str], status_code: int, url: str):
+        self.html = html
+        self.metadata = {'statusCode': status_code, 'sourceURL': url}
+
+
+class FirecrawlApp:
+    """
+    Drop-in replacement for firecrawl.FirecrawlApp
+
+    api_latency adds a fixed delay per call to model the Firecrawl service's
+    own overhead on top of the origin server's latency.
+    """
+
+    api_latency = 0.0
+    timeout = 30.0
+
+    def __init__(self, api_key: str = None, **kwargs):
+        self.api_key = api_key
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=64)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def scrape_url(self, url: str, formats=None, **params) -> ScrapeResponse:
+        """Fetch a page and wrap it like Firecrawl would; origin errors are reported in metadata"""
+        with self._lock:
+            self.calls += 1
+        if self.api_latency:
+            time.sleep(self.api_latency)
+        response = self.session.get(url, timeout=self.timeout)
+        html = response.text if response.status_code < 400 else None
+        return ScrapeResponse(html, response.status_code, url)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {'calls': self.calls}
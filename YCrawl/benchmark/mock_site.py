@@ -0,0 +1,193 @@
+"""
+Synthetic website for benchmarking YCrawl offline
+Serves a generated tree of pages with configurable fan-out, depth, page size, latency and error rate
+"""
+
+import hashlib
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+_FILLER = ("Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor "
+           "incididunt ut labore et dolore magna aliqua. ")
+
+
+class MockSite:
+    """
+    A complete tree of pages: page 0 is the root and page n links to pages
+    n * fan_out + 1 ... n * fan_out + fan_out, down to the given depth.
+
+    Every page also links back to its parent and to the root, so the crawler's
+    duplicate detection is exercised as well as its fetching.
+    """
+
+    def __init__(self, fan_out: int = 5, depth: int = 3, page_size: int = 20000,
+                 latency: float = 0.05, jitter: float = 0.0, error_rate: float = 0.0,
+                 seed: int = 0, host: str = '127.0.0.1', port: int = 0):
+        """
+        Configure the site
+
+        Args:
+            fan_out: Child pages linked from every page above the last level
+            depth: Number of link levels below the root page
+            page_size: Approximate size of each page's HTML in bytes
+            latency: Seconds the server waits before answering each request
+            jitter: Extra random latency, up to this many seconds
+            error_rate: Fraction of page requests answered with 503 (retries may succeed)
+            seed: Seed for the latency jitter and error draws
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free port)
+        """
+        self.fan_out = max(1, fan_out)
+        self.depth = max(0, depth)
+        self.page_size = page_size
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.host = host
+        self.port = port
+        self.page_count = sum(self.fan_out ** level for level in range(self.depth + 1))
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {'requests': 0, 'errors_served': 0, 'not_modified': 0}
+        self._stats_lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def page_url(self, page_id: int) -> str:
+        return f"{self.base_url}/" if page_id == 0 else f"{self.base_url}/page/{page_id}"
+
+    def children(self, page_id: int):
+        first = page_id * self.fan_out + 1
+        return [child for child in range(first, first + self.fan_out) if child < self.page_count]
+
+    def render_page(self, page_id: int) -> bytes:
+        """HTML of one page, padded with paragraphs to roughly page_size bytes"""
+        links = [f'<li><a href="/page/{child}">Page {child}</a></li>' for child in self.children(page_id)]
+        if page_id:
+            parent = (page_id - 1) // self.fan_out
+            links.append(f'<li><a href="{"/" if parent == 0 else f"/page/{parent}"}">Up</a></li>')
+            links.append('<li><a href="/">Home</a></li>')
+        head = (f'<!DOCTYPE html><html><head><title>Page {page_id}</title>'
+                f'<style>body {{ font-family: sans-serif; }}</style></head>'
+                f'<body><h1>Page {page_id}</h1><nav><ul>{"".join(links)}</ul></nav>')
+        tail = '</body></html>'
+        paragraph = f'<p>{_FILLER * 4}</p>'
+        count = max(0, (self.page_size - len(head) - len(tail)) // len(paragraph))
+        return (head + paragraph * count + tail).encode('utf-8')
+
+    def _page_id(self, path: str) -> Optional[int]:
+        path = path.split('?', 1)[0].split('#', 1)[0]
+        if path in ('', '/'):
+            return 0
+        if path.startswith('/page/'):
+            try:
+                page_id = int(path[len('/page/'):].strip('/'))
+            except ValueError:
+                return None
+            return page_id if 0 < page_id < self.page_count else None
+        return None
+
+    def _draw(self):
+        """Latency and error decision for one request"""
+        with self._random_lock:
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+            fail = self.error_rate > 0 and self._random.random() < self.error_rate
+        return delay, fail
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _make_handler(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body go out in separate writes; don't let Nagle hold the body back
+            disable_nagle_algorithm = True
+
+            def _respond(self, send_body: bool):
+                site._count('requests')
+                page_id = site._page_id(self.path)
+                if page_id is None:
+                    self._send(404, b'Not found', send_body)
+                    return
+                delay, fail = site._draw()
+                if delay > 0:
+                    time.sleep(delay)
+                if fail:
+                    site._count('errors_served')
+                    self._send(503, b'Service unavailable', send_body, {'Retry-After': '1'})
+                    return
+                body = site.render_page(page_id)
+                etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+                if self.headers.get('If-None-Match') == etag:
+                    site._count('not_modified')
+                    self._send(304, b'', False, {'ETag': etag})
+                    return
+                self._send(200, body, send_body, {'ETag': etag, 'Content-Type': 'text/html; charset=utf-8'})
+
+            def _send(self, status: int, body: bytes, send_body: bool, headers: dict = None):
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                if send_body and body:
+                    self.wfile.write(body)
+
+            def do_GET(self):
+                self._respond(send_body=True)
+
+            def do_HEAD(self):
+                self._respond(send_body=False)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> str:
+        """Start serving in a background thread and return the root URL"""
+        self._server = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-site", daemon=True)
+        self._thread.start()
+        return self.page_url(0)
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve a synthetic website for crawler benchmarks")
+    parser.add_argument('--fan-out', type=int, default=5, help='Links from each page to child pages (default: 5)')
+    parser.add_argument('--depth', type=int, default=3, help='Link levels below the root page (default: 3)')
+    parser.add_argument('--page-size', type=int, default=20000, help='Approximate page size in bytes (default: 20000)')
+    parser.add_argument('--latency', type=float, default=0.05, help='Server latency per request in seconds (default: 0.05)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Extra random latency in seconds (default: 0)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 503 (default: 0)')
+    parser.add_argument('--port', type=int, default=8000, help='Port to listen on (default: 8000)')
+    args = parser.parse_args()
+
+    site = MockSite(fan_out=args.fan_out, depth=args.depth, page_size=args.page_size, latency=args.latency,
+                    jitter=args.jitter, error_rate=args.error_rate, port=args.port)
+    print(f"Serving {site.page_count} pages at {site.start()} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        site.stop()
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+YCrawl benchmark runner
+Crawls a local synthetic site with Firecrawl replaced by a direct-fetch stub and
+reports pages/sec, page latency percentiles, peak memory and PDF render time
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import firecrawl_stub
+from mock_site import MockSite
+
+# The benchmark must never call the real Firecrawl API
+sys.modules['firecrawl'] = firecrawl_stub
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import ycrawl  # noqa: E402
+from visited_store import VISITED_BACKENDS  # noqa: E402
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Linear-interpolated percentile of an unsorted list (0.0 for an empty list)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+class MemorySampler:
+    """
+    Tracks the memory high-water mark of the benchmark
+
+    With psutil, the resident memory of this process and all its children
+    (browser processes included) is sampled periodically. Without it, only
+    this process's peak RSS from getrusage is available.
+    """
+
+    def __init__(self, interval: float = 0.1):
+        self.interval = interval
+        self.peak_tree_bytes = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self):
+        process = psutil.Process()
+        while not self._stop.is_set():
+            total = 0
+            for proc in [process] + process.children(recursive=True):
+                try:
+                    total += proc.memory_info().rss
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    continue
+            self.peak_tree_bytes = max(self.peak_tree_bytes, total)
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if PSUTIL_AVAILABLE:
+            self._thread = threading.Thread(target=self._sample, name="memory-sampler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    @staticmethod
+    def peak_process_bytes() -> Optional[int]:
+        if not RESOURCE_AVAILABLE:
+            return None
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS bytes
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def run_benchmark(args) -> Dict:
+    """Start the mock site, crawl it once and collect the metrics"""
+    site = MockSite(fan_out=args.fan_out, depth=args.depth, page_size=args.page_size, latency=args.latency,
+                    jitter=args.jitter, error_rate=args.error_rate, seed=args.seed)
+    start_url = site.start()
+    firecrawl_stub.FirecrawlApp.api_latency = args.api_latency
+
+    work_dir = Path(args.output_dir) if args.output_dir else Path(tempfile.mkdtemp(prefix="ycrawl_bench_"))
+    work_dir.mkdir(parents=True, exist_ok=True)
+    # Only the overrides are written; every other setting falls back to the crawler's defaults
+    config = {
+        "include_pdf": not args.no_pdf,
+        "pdf_render_mode": args.render_mode,
+        "requests_per_second": args.requests_per_second,
+        "burst": max(8, args.concurrency),
+        "visited_backend": args.visited_backend,
+        "wait_for_network_idle": False
+    }
+    config_path = work_dir / 'benchmark_config.json'
+    with open(config_path, 'w') as f:
+        json.dump(config, f, indent=2)
+
+    log = sys.stdout if args.verbose else open(os.devnull, 'w')
+    sampler = MemorySampler()
+    latencies: List[float] = []
+    try:
+        with redirect_stdout(log):
+            crawler = ycrawl.YCrawl(
+                api_key="benchmark",
+                output_dir=str(work_dir / 'output'),
+                max_depth=args.max_depth if args.max_depth is not None else args.depth,
+                config_file=str(config_path),
+                concurrency=args.concurrency,
+                per_host_concurrency=args.per_host_concurrency
+            )
+
+            download_page = crawler.download_page
+
+            def timed_download_page(url: str, depth: int = 0):
+                started = time.perf_counter()
+                try:
+                    return download_page(url, depth)
+                finally:
+                    latencies.append(time.perf_counter() - started)
+
+            crawler.download_page = timed_download_page
+            sampler.start()
+            started = time.perf_counter()
+            crawler.crawl(start_url)
+            duration = time.perf_counter() - started
+    finally:
+        sampler.stop()
+        site.stop()
+        if log is not sys.stdout:
+            log.close()
+
+    stats = crawler.crawl_stats
+    pool_stats = crawler.browser_pool.get_stats() if crawler.browser_pool else None
+    peak_process = MemorySampler.peak_process_bytes()
+    return {
+        'site': {
+            'pages': site.page_count,
+            'fan_out': args.fan_out,
+            'depth': args.depth,
+            'page_size': args.page_size,
+            'latency': args.latency,
+            'jitter': args.jitter,
+            'error_rate': args.error_rate,
+            'api_latency': args.api_latency
+        },
+        'engine': {
+            'concurrency': crawler.concurrency,
+            'per_host_concurrency': crawler.per_host_concurrency,
+            'visited_backend': crawler.visited_backend,
+            'pdf': not args.no_pdf,
+            'render_mode': args.render_mode,
+            'requests_per_second': args.requests_per_second
+        },
+        'pages_crawled': stats['successful_downloads'],
+        'pages_failed': stats['failed_downloads'],
+        'retries': stats['retries'],
+        'duration': duration,
+        'pages_per_second': stats['successful_downloads'] / duration if duration > 0 else 0.0,
+        'latency_p50': percentile(latencies, 0.50),
+        'latency_p95': percentile(latencies, 0.95),
+        'latency_max': max(latencies) if latencies else 0.0,
+        'peak_rss_bytes': peak_process,
+        'peak_tree_rss_bytes': sampler.peak_tree_bytes if PSUTIL_AVAILABLE else None,
+        'pdf_pages_rendered': pool_stats['pages_rendered'] if pool_stats else 0,
+        'pdf_avg_render_time': pool_stats['avg_render_time'] if pool_stats else None,
+        'pdf_max_render_time': pool_stats['max_render_time'] if pool_stats else None,
+        'pdf_avg_queue_wait': pool_stats['avg_queue_wait'] if pool_stats else None,
+        'server_requests': site.stats['requests'],
+        'server_errors': site.stats['errors_served'],
+        'output_dir': str(work_dir),
+        'timestamp': time.time()
+    }
+
+
+def print_results(results: Dict):
+    """Print benchmark results"""
+    site = results['site']
+    engine = results['engine']
+    mb = 1024 * 1024
+
+    print("\n" + "=" * 50)
+    print("BENCHMARK RESULTS")
+    print("=" * 50)
+    print(f"Site: {site['pages']} pages (fan-out {site['fan_out']}, depth {site['depth']}, "
+          f"{site['page_size'] / 1024:.0f} KB/page, {site['latency'] * 1000:.0f} ms latency, "
+          f"{site['error_rate']:.0%} errors)")
+    print(f"Engine: {engine['concurrency']} workers (max {engine['per_host_concurrency']} per host), "
+          f"visited set: {engine['visited_backend']}, "
+          f"PDF: {engine['render_mode'] if engine['pdf'] else 'off'}")
+    print(f"Pages crawled: {results['pages_crawled']}, failed: {results['pages_failed']}, "
+          f"retries: {results['retries']}")
+    print(f"Duration: {results['duration']:.2f} seconds")
+    print(f"Throughput: {results['pages_per_second']:.2f} pages/sec")
+    print(f"Page latency: p50 {results['latency_p50'] * 1000:.0f} ms, "
+          f"p95 {results['latency_p95'] * 1000:.0f} ms, max {results['latency_max'] * 1000:.0f} ms")
+    if results['peak_rss_bytes'] is not None:
+        print(f"Peak memory (crawler process): {results['peak_rss_bytes'] / mb:.1f} MB")
+    if results['peak_tree_rss_bytes'] is not None:
+        print(f"Peak memory (with browser processes): {results['peak_tree_rss_bytes'] / mb:.1f} MB")
+    if results['pdf_avg_render_time'] is not None:
+        print(f"PDF render time: avg {results['pdf_avg_render_time']:.3f}s, "
+              f"max {results['pdf_max_render_time']:.3f}s over {results['pdf_pages_rendered']} pages "
+              f"(avg queue wait {results['pdf_avg_queue_wait']:.3f}s)")
+    elif engine['pdf']:
+        print("PDF render time: n/a (browser pool not used; is playwright installed?)")
+    print(f"Output: {results['output_dir']}")
+    print("=" * 50)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark YCrawl against a local synthetic site (no Firecrawl API calls)",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python benchmark/run_benchmark.py
+  python benchmark/run_benchmark.py --fan-out 10 --depth 3 --concurrency 32 --no-pdf
+  python benchmark/run_benchmark.py --error-rate 0.05 --latency 0.2 --jitter 0.1
+  python benchmark/run_benchmark.py --visited-backend bloom --results bench.jsonl
+        """
+    )
+
+    parser.add_argument('--fan-out', type=int, default=5, help='Links from each page to child pages (default: 5)')
+    parser.add_argument('--depth', type=int, default=3, help='Link levels below the root page (default: 3)')
+    parser.add_argument('--page-size', type=int, default=20000, help='Approximate page size in bytes (default: 20000)')
+    parser.add_argument('--latency', type=float, default=0.05, help='Server latency per request in seconds (default: 0.05)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Extra random latency in seconds (default: 0)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 503 (default: 0)')
+    parser.add_argument('--api-latency', type=float, default=0.0,
+                        help='Simulated Firecrawl overhead per scrape in seconds (default: 0)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for latency jitter and errors (default: 0)')
+    parser.add_argument('--max-depth', type=int, help='Crawl depth (default: the site depth)')
+    parser.add_argument('--concurrency', type=int, default=8, help='Crawler workers (default: 8)')
+    parser.add_argument('--per-host-concurrency', type=int, default=8,
+                        help='Maximum parallel requests to the mock site (default: 8)')
+    parser.add_argument('--requests-per-second', type=float, default=1000.0,
+                        help='Politeness rate limit for the mock site (default: 1000, effectively off)')
+    parser.add_argument('--visited-backend', choices=VISITED_BACKENDS, default='memory',
+                        help='Visited-URL set to use (default: memory)')
+    parser.add_argument('--render-mode', choices=('content', 'navigate'), default='content',
+                        help='PDF render mode (default: content)')
+    parser.add_argument('--no-pdf', action='store_true', help='Skip PDF rendering')
+    parser.add_argument('--output-dir', help='Directory for crawl output (default: a new temporary directory)')
+    parser.add_argument('--results', help='Append the results as one JSON line to this file')
+    parser.add_argument('--verbose', action='store_true', help='Show the crawler output')
+
+    args = parser.parse_args()
+    results = run_benchmark(args)
+    print_results(results)
+
+    if args.results:
+        with open(args.results, 'a') as f:
+            f.write(json.dumps(results) + '\n')
+        print(f"Results appended to: {args.results}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+"""
+Persistent Playwright browser pool for YCrawl
+Keeps a fixed set of Chromium instances alive and feeds them PDF render jobs from a queue
+"""
+
+import os
+import queue
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Dict, List, Optional
+
+from asset_cache import AssetCache
+
+
+def inject_base_href(html: str, base_url: str) -> str:
+    """Add a <base href> so relative links resolve against the original page when rendered via set_content"""
+    if re.search(r'<base\s[^>]*href', html, re.IGNORECASE):
+        return html
+    base_tag = f'<base href="{base_url}">'
+    # <head> itself, not <header>; without one, right after <html> still lands in the implied head
+    # (before any doctype it would switch the page to quirks mode)
+    opening = (re.search(r'<head(\s[^>]*)?>', html, re.IGNORECASE)
+               or re.search(r'<html(\s[^>]*)?>', html, re.IGNORECASE))
+    if opening:
+        return html[:opening.end()] + base_tag + html[opening.end():]
+    return base_tag + html
+
+
+class BrowserPool:
+    """Pool of long-lived Chromium browser contexts that render pages to PDF"""
+
+    def __init__(self, size: int = 4, recycle_after: int = 50, render_timeout: float = 120.0,
+                 asset_cache: Optional[AssetCache] = None):
+        """
+        Initialize the pool (browsers are launched lazily by the worker threads)
+
+        Args:
+            size: Number of browser contexts rendering in parallel
+            recycle_after: Pages rendered by a context before it is closed and replaced
+            render_timeout: Seconds a caller waits for its render job before giving up
+            asset_cache: Optional on-disk cache serving subresources for pages rendered from HTML
+        """
+        self.size = max(1, size)
+        self.recycle_after = max(1, recycle_after)
+        self.render_timeout = render_timeout
+        self.asset_cache = asset_cache
+        self._jobs: queue.Queue = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._started_at: Optional[float] = None
+        self._stopped_at: Optional[float] = None
+        self._closed = False
+        self.stats = {
+            'pages_rendered': 0,
+            'render_failures': 0,
+            'browser_launches': 0,
+            'context_recycles': 0,
+            'abandoned_renders': 0,
+            'total_render_time': 0.0,
+            'max_render_time': 0.0,
+            'total_queue_wait': 0.0
+        }
+
+    def start(self):
+        """Start the worker threads (each owns one browser, Playwright objects are thread-bound)"""
+        with self._lock:
+            if self._threads or self._closed:
+                return
+            self._started_at = time.time()
+            for index in range(self.size):
+                thread = threading.Thread(target=self._worker, name=f"pdf-render-{index}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def render_pdf(self, url: str, pdf_path: str, html: Optional[str] = None) -> str:
+        """
+        Render a page to PDF on one of the pooled browsers
+
+        Blocks until the job finishes and re-raises any render error so the
+        caller can fall back to another PDF library for this page. The browser
+        writes to a temporary file that is renamed onto pdf_path; after a timeout
+        the job is abandoned, so a late render never replaces the fallback's PDF.
+
+        Args:
+            url: Page URL to render (also the base URL when html is given)
+            pdf_path: Destination PDF path
+            html: Already-fetched page HTML; when given the page is loaded with
+                set_content instead of navigating to url again
+
+        Returns:
+            The path of the written PDF
+        """
+        if self._closed:
+            raise RuntimeError("Browser pool is closed")
+        self.start()
+        future: Future = Future()
+        # Held while a finished render is moved into place, so abandoning and finishing cannot interleave
+        handoff = threading.Lock()
+        abandoned = threading.Event()
+        self._jobs.put((url, pdf_path, html, future, time.perf_counter(), handoff, abandoned))
+        try:
+            return future.result(timeout=self.render_timeout)
+        except FutureTimeoutError:
+            with handoff:
+                if future.done() and not future.cancelled() and future.exception() is None:
+                    return future.result()
+                abandoned.set()
+                future.cancel()
+            raise
+
+    def _worker(self):
+        """Render loop for a single browser; relaunches it after failures and recycles contexts"""
+        from playwright.sync_api import sync_playwright
+
+        playwright = None
+        browser = None
+        context = None
+        pages_in_context = 0
+
+        try:
+            while True:
+                job = self._jobs.get()
+                if job is None:
+                    break
+                url, pdf_path, html, future, queued_at, handoff, abandoned = job
+                if not future.set_running_or_notify_cancel():
+                    continue
+
+                started = time.perf_counter()
+                # Each attempt renders to its own file next to the destination
+                fd, part_path = tempfile.mkstemp(suffix='.part', dir=os.path.dirname(os.path.abspath(pdf_path)))
+                os.close(fd)
+                try:
+                    if playwright is None:
+                        playwright = sync_playwright().start()
+                    if browser is None or not browser.is_connected():
+                        browser = playwright.chromium.launch()
+                        context = None
+                        self._record('browser_launches', 1)
+                    if context is None:
+                        context = browser.new_context()
+                        pages_in_context = 0
+
+                    page = context.new_page()
+                    try:
+                        if html is not None:
+                            if self.asset_cache is not None:
+                                page.route("**/*", self._serve_from_cache)
+                            page.set_content(inject_base_href(html, url), wait_until="load")
+                        else:
+                            page.goto(url)
+                        page.pdf(path=part_path)
+                    finally:
+                        page.close()
+
+                    pages_in_context += 1
+                    if pages_in_context >= self.recycle_after:
+                        context.close()
+                        context = None
+                        self._record('context_recycles', 1)
+
+                    self._record_render(time.perf_counter() - started, started - queued_at)
+                    with handoff:
+                        if abandoned.is_set():
+                            # The caller timed out and may already be writing pdf_path with another library
+                            self._record('abandoned_renders', 1)
+                        else:
+                            os.replace(part_path, pdf_path)
+                            future.set_result(pdf_path)
+                except Exception as e:
+                    self._record('render_failures', 1)
+                    # Drop the browser so the next job starts from a clean instance
+                    context = None
+                    browser = self._close_quietly(browser)
+                    with handoff:
+                        if not abandoned.is_set():
+                            future.set_exception(e)
+                finally:
+                    if os.path.exists(part_path):
+                        os.remove(part_path)
+        finally:
+            self._close_quietly(context)
+            self._close_quietly(browser)
+            if playwright is not None:
+                try:
+                    playwright.stop()
+                except Exception:
+                    pass
+
+    def _serve_from_cache(self, route):
+        """Playwright route handler: answer subresource requests from the asset cache, fetching and storing misses"""
+        request = route.request
+        if request.method != "GET" or not request.url.startswith(('http://', 'https://')):
+            route.continue_()
+            return
+
+        cached = self.asset_cache.get(request.url)
+        if cached is not None:
+            body, headers = cached
+            route.fulfill(status=200, headers=headers, body=body)
+            return
+
+        try:
+            response = route.fetch()
+            body = response.body()
+        except Exception:
+            # DNS failure, refused connection, timeout: an unanswered route would stall the
+            # page's load event until the render timeout, so fail just this resource
+            self._abort_quietly(route)
+            return
+        if response.status == 200:
+            try:
+                self.asset_cache.put(request.url, body, response.headers)
+            except Exception:
+                pass  # A cache write error (e.g. a full disk) must not fail the render
+        route.fulfill(response=response, body=body)
+
+    @staticmethod
+    def _abort_quietly(route):
+        """Abort a route, ignoring errors when its page has already been closed"""
+        try:
+            route.abort()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _close_quietly(resource):
+        """Close a Playwright browser or context, ignoring errors from dead processes"""
+        if resource is not None:
+            try:
+                resource.close()
+            except Exception:
+                pass
+        return None
+
+    def _record(self, key: str, amount):
+        with self._lock:
+            self.stats[key] += amount
+
+    def _record_render(self, render_time: float, queue_wait: float):
+        with self._lock:
+            self.stats['pages_rendered'] += 1
+            self.stats['total_render_time'] += render_time
+            self.stats['total_queue_wait'] += queue_wait
+            self.stats['max_render_time'] = max(self.stats['max_render_time'], render_time)
+
+    def get_stats(self) -> Dict:
+        """Snapshot of pool throughput and latency counters"""
+        with self._lock:
+            stats = dict(self.stats)
+        rendered = stats['pages_rendered']
+        elapsed = (self._stopped_at or time.time()) - self._started_at if self._started_at else 0.0
+        stats['pool_size'] = self.size
+        stats['queue_depth'] = self._jobs.qsize()
+        stats['avg_render_time'] = stats['total_render_time'] / rendered if rendered else 0.0
+        stats['avg_queue_wait'] = stats['total_queue_wait'] / rendered if rendered else 0.0
+        stats['pages_per_second'] = rendered / elapsed if elapsed > 0 else 0.0
+        if self.asset_cache is not None:
+            stats['asset_cache'] = self.asset_cache.get_stats()
+        return stats
+
+    def close(self):
+        """Stop all workers and shut their browsers down"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            threads = list(self._threads)
+        for _ in threads:
+            self._jobs.put(None)
+        for thread in threads:
+            thread.join(timeout=30)
+        self._stopped_at = time.time()
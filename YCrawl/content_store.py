@@ -0,0 +1,280 @@
+"""
+Content-addressed output store for YCrawl
+Saves rendered PDFs and attachments under their content hash, keeps a URL -> blob manifest in SQLite,
+and spots exact and near-duplicate pages (SimHash) before they are rendered
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from text_extractor import extract_main_content
+
+_WORDS = re.compile(r'\w+', re.UNICODE)
+
+SHINGLE_SIZE = 3
+# Pages whose main content has fewer distinct words than this are only deduplicated when identical:
+# short texts leave too few shingles for a 64-bit SimHash to tell different pages apart
+MIN_SIMHASH_UNIQUE_WORDS = 100
+
+
+def content_words(html: str) -> List[str]:
+    """
+    Lower-cased words of the page's main content (see text_extractor.extract_main_content)
+
+    Navigation, headers, footers and sidebars are left out, so pages that share a site
+    template are compared only on the text that differs between them.
+    """
+    return _WORDS.findall(extract_main_content(html)['text'].lower())
+
+
+def simhash(words: List[str], shingle_size: int = SHINGLE_SIZE) -> int:
+    """64-bit SimHash over overlapping word shingles"""
+    if len(words) < shingle_size:
+        shingles = [' '.join(words)]
+    else:
+        shingles = [' '.join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1)]
+    digests = [hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest() for shingle in shingles]
+    # Count set bits byte by byte: one Counter pass per byte position instead of 64 tests per shingle
+    ones = [0] * 64
+    for position in range(8):
+        for byte_value, count in Counter(digest[position] for digest in digests).items():
+            for bit in range(8):
+                if byte_value >> bit & 1:
+                    ones[position * 8 + bit] += count
+    return sum(1 << bit for bit in range(64) if ones[bit] * 2 > len(digests))
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+class ContentStore:
+    """
+    Blobs named by content hash under <output_dir>/blobs, plus manifest.db
+    recording which blob every URL resolved to
+
+    Page PDFs are keyed by the normalized-HTML hash of the page they were
+    rendered from, attachments by the SHA-256 of their bytes. A page is
+    claimed before rendering, so identical pages crawled at the same time
+    wait for one render instead of each rendering their own copy.
+    """
+
+    def __init__(self, output_dir: Path, near_duplicate_distance: int = 3, detect_near_duplicates: bool = True):
+        """
+        Open (or create) the store
+
+        Args:
+            output_dir: Crawl output directory; blobs and manifest.db are created inside it
+            near_duplicate_distance: Largest SimHash Hamming distance treated as the same page
+            detect_near_duplicates: Reuse PDFs of near-identical pages, not only identical ones
+        """
+        self.output_dir = Path(output_dir)
+        self.blob_dir = self.output_dir / 'blobs'
+        self.blob_dir.mkdir(exist_ok=True)
+        self.near_duplicate_distance = max(0, near_duplicate_distance)
+        self.detect_near_duplicates = detect_near_duplicates
+        # SimHash bands: with distance d split into d + 1 bands, any match shares at least one band exactly
+        self._bands = self.near_duplicate_distance + 1
+        self._band_bits = 64 // self._bands
+
+        self._lock = threading.Lock()
+        self._pages: Dict[str, str] = {}
+        self._band_index: Dict[Tuple[int, int], List[Tuple[int, str]]] = {}
+        self._inflight: Dict[str, threading.Event] = {}
+        self.stats = {
+            'blobs_stored': 0,
+            'bytes_stored': 0,
+            'exact_duplicates': 0,
+            'near_duplicates': 0,
+            'duplicate_files': 0,
+            'bytes_saved': 0
+        }
+
+        self.connection = sqlite3.connect(str(self.output_dir / 'manifest.db'), check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS blobs (
+                hash TEXT PRIMARY KEY,
+                path TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                size INTEGER,
+                simhash INTEGER,
+                created_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS urls (
+                url TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                blob_hash TEXT NOT NULL,
+                duplicate TEXT,
+                updated_at REAL
+            );
+        """)
+        self.connection.commit()
+
+        # Blobs from earlier runs stay valid: reload the page index so they are reused too
+        for blob_hash, path, fingerprint in self.connection.execute(
+                "SELECT hash, path, simhash FROM blobs WHERE kind = 'page'"):
+            if (self.output_dir / path).exists():
+                self._index_page_locked(blob_hash, path, fingerprint)
+
+    def blob_path(self, blob_hash: str, extension: str) -> str:
+        """Relative path of a blob: blobs/<first two hex digits>/<hash><extension>"""
+        return f"blobs/{blob_hash[:2]}/{blob_hash}{extension}"
+
+    def _signed(self, fingerprint: int) -> int:
+        # SQLite integers are signed 64-bit
+        return fingerprint - (1 << 64) if fingerprint >= 1 << 63 else fingerprint
+
+    def _band_keys(self, fingerprint: int):
+        mask = (1 << self._band_bits) - 1
+        return [(band, fingerprint >> (band * self._band_bits) & mask) for band in range(self._bands)]
+
+    def _index_page_locked(self, content_hash: str, path: str, fingerprint: Optional[int]):
+        self._pages[content_hash] = path
+        if fingerprint is not None:
+            fingerprint &= (1 << 64) - 1
+            for key in self._band_keys(fingerprint):
+                self._band_index.setdefault(key, []).append((fingerprint, content_hash))
+
+    def _near_match_locked(self, fingerprint: int) -> Optional[str]:
+        for key in self._band_keys(fingerprint):
+            for candidate, content_hash in self._band_index.get(key, ()):
+                if hamming_distance(candidate, fingerprint) <= self.near_duplicate_distance:
+                    return content_hash
+        return None
+
+    def claim_page(self, content_hash: str, html: str) -> Tuple[Optional[str], Optional[str], Optional[int]]:
+        """
+        Look a page up before rendering it
+
+        Returns:
+            (path, duplicate, fingerprint): path and 'exact' or 'near' when an
+            existing PDF can be reused; otherwise (None, None, fingerprint) and the
+            caller owns the render and must call commit_page or release_page
+        """
+        fingerprint = None
+        if self.detect_near_duplicates:
+            words = content_words(html)
+            if len(set(words)) >= MIN_SIMHASH_UNIQUE_WORDS:
+                fingerprint = simhash(words)
+
+        while True:
+            with self._lock:
+                if content_hash in self._pages:
+                    return self._pages[content_hash], 'exact', fingerprint
+                match = self._near_match_locked(fingerprint) if fingerprint is not None else None
+                if match is not None and match in self._pages:
+                    return self._pages[match], 'near', fingerprint
+                waiting_on = self._inflight.get(match or content_hash)
+                if waiting_on is None:
+                    # Nothing to reuse yet: claim the render; the fingerprint is indexed now so
+                    # near-identical pages arriving meanwhile wait for this render
+                    self._inflight[content_hash] = threading.Event()
+                    if fingerprint is not None:
+                        for key in self._band_keys(fingerprint):
+                            self._band_index.setdefault(key, []).append((fingerprint, content_hash))
+                    return None, None, fingerprint
+            waiting_on.wait()
+
+    def commit_page(self, url: str, content_hash: str, path: str, fingerprint: Optional[int]):
+        """Register a freshly rendered page PDF and wake pages waiting on it"""
+        full_path = self.output_dir / path
+        size = full_path.stat().st_size if full_path.exists() else 0
+        with self._lock:
+            self._pages[content_hash] = path
+            self.stats['blobs_stored'] += 1
+            self.stats['bytes_stored'] += size
+            self.connection.execute(
+                "INSERT OR REPLACE INTO blobs (hash, path, kind, size, simhash, created_at) VALUES (?, ?, 'page', ?, ?, ?)",
+                (content_hash, path, size, self._signed(fingerprint) if fingerprint is not None else None, time.time())
+            )
+            self._record_url_locked(url, 'page', content_hash, None)
+            event = self._inflight.pop(content_hash, None)
+        if event is not None:
+            event.set()
+
+    def release_page(self, content_hash: str, fingerprint: Optional[int]):
+        """Give up a claimed render (it failed) so a waiting page can try instead"""
+        with self._lock:
+            if fingerprint is not None:
+                for key in self._band_keys(fingerprint):
+                    entries = self._band_index.get(key, [])
+                    entries[:] = [entry for entry in entries if entry[1] != content_hash]
+            event = self._inflight.pop(content_hash, None)
+        if event is not None:
+            event.set()
+
+    def record_duplicate_page(self, url: str, path: str, duplicate: str):
+        """Point a URL at the PDF of an identical or near-identical page"""
+        full_path = self.output_dir / path
+        with self._lock:
+            self.stats['exact_duplicates' if duplicate == 'exact' else 'near_duplicates'] += 1
+            self.stats['bytes_saved'] += full_path.stat().st_size if full_path.exists() else 0
+            # Blob file names are their hash
+            self._record_url_locked(url, 'page', Path(path).stem, duplicate)
+
+    def find_file(self, url: str) -> Optional[str]:
+        """Path of the blob an attachment URL was stored as, if it is still on disk"""
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT b.path FROM urls u JOIN blobs b ON b.hash = u.blob_hash WHERE u.url = ? AND u.kind = 'file'",
+                (url,)
+            ).fetchone()
+        if row and (self.output_dir / row[0]).exists():
+            return row[0]
+        return None
+
+    def commit_file(self, url: str, part_path: Path, sha256: str, extension: str) -> Tuple[str, bool]:
+        """
+        Move a finished download into the store
+
+        Returns:
+            (path, duplicate): duplicate is True when identical bytes were already
+            stored, in which case the downloaded copy is discarded
+        """
+        path = self.blob_path(sha256, extension)
+        full_path = self.output_dir / path
+        size = part_path.stat().st_size
+        with self._lock:
+            duplicate = full_path.exists()
+            if duplicate:
+                part_path.unlink()
+                self.stats['duplicate_files'] += 1
+                self.stats['bytes_saved'] += size
+            else:
+                full_path.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(part_path, full_path)
+                self.stats['blobs_stored'] += 1
+                self.stats['bytes_stored'] += size
+            self.connection.execute(
+                "INSERT OR IGNORE INTO blobs (hash, path, kind, size, created_at) VALUES (?, ?, 'file', ?, ?)",
+                (sha256, path, size, time.time())
+            )
+            self._record_url_locked(url, 'file', sha256, 'exact' if duplicate else None)
+        return path, duplicate
+
+    def _record_url_locked(self, url: str, kind: str, blob_hash: str, duplicate: Optional[str]):
+        self.connection.execute(
+            "INSERT OR REPLACE INTO urls (url, kind, blob_hash, duplicate, updated_at) VALUES (?, ?, ?, ?, ?)",
+            (url, kind, blob_hash, duplicate, time.time())
+        )
+        self.connection.commit()
+
+    def get_stats(self) -> Dict:
+        """Snapshot of deduplication counters"""
+        with self._lock:
+            return dict(self.stats)
+
+    def close(self):
+        with self._lock:
+            self.connection.commit()
+            self.connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self.connection.close()
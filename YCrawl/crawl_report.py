@@ -0,0 +1,67 @@
+"""
+Streaming crawl report for YCrawl
+Page records are appended to a JSONL file as pages finish instead of being held in memory until the end
+"""
+
+import json
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, Tuple
+
+
+class CrawlReportWriter:
+    """Appends one JSON line per finished page, plus a summary line when the crawl ends"""
+
+    def __init__(self, report_path: Path, append: bool = False, flush_every: int = 100):
+        """
+        Open the report
+
+        Args:
+            report_path: Path of the JSONL report
+            append: Keep existing records (used when resuming a crawl)
+            flush_every: Records buffered before the file is flushed
+        """
+        self.report_path = Path(report_path)
+        self.flush_every = max(1, flush_every)
+        self._lock = threading.Lock()
+        self._unflushed = 0
+        self.pages_written = 0
+        self._file = open(self.report_path, 'a' if append else 'w', encoding='utf-8')
+
+    def _write(self, record: Dict):
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + '\n')
+            self._unflushed += 1
+            if self._unflushed >= self.flush_every:
+                self._file.flush()
+                self._unflushed = 0
+
+    def write_page(self, url: str, record: Dict):
+        """Record a finished page"""
+        self._write({'record': 'page', 'url': url, **record})
+        with self._lock:
+            self.pages_written += 1
+
+    def write_summary(self, summary: Dict):
+        """Record end-of-crawl statistics; a resumed crawl adds another summary line"""
+        self._write({'record': 'summary', **summary})
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def iter_report_pages(report_path: Path) -> Iterator[Tuple[str, Dict]]:
+    """
+    Stream (url, record) pairs from a JSONL report, skipping a torn last line
+    left by an interrupted crawl; a URL recorded twice yields its latest record last
+    """
+    with open(report_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.pop('record', None) == 'page':
+                yield record.pop('url'), record
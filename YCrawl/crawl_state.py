@@ -0,0 +1,176 @@
+"""
+Durable crawl state for YCrawl
+Keeps the frontier, visited set and per-URL results in SQLite (WAL mode) so an interrupted crawl can be resumed
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+
+class CrawlStateStore:
+    """SQLite-backed record of every URL the crawl has queued, finished or failed"""
+
+    STATUS_QUEUED = 'queued'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+
+    def __init__(self, db_path: str, checkpoint_interval: float = 5.0, checkpoint_every: int = 200):
+        """
+        Open (or create) the state database
+
+        Args:
+            db_path: Path of the SQLite database file
+            checkpoint_interval: Maximum seconds between commits
+            checkpoint_every: Maximum uncommitted writes before a commit is forced
+        """
+        self.db_path = Path(db_path)
+        self.checkpoint_interval = checkpoint_interval
+        self.checkpoint_every = max(1, checkpoint_every)
+        self._lock = threading.Lock()
+        self._pending_writes = 0
+        self._last_checkpoint = time.time()
+
+        # Pages finish on worker threads; every access goes through self._lock
+        self.connection = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS urls (
+                url TEXT PRIMARY KEY,
+                depth INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                filename TEXT,
+                content_hash TEXT,
+                error TEXT,
+                updated_at REAL,
+                priority REAL,
+                lastmod REAL
+            );
+            CREATE INDEX IF NOT EXISTS idx_urls_status ON urls(status);
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+        """)
+        # Databases written before frontier priorities existed lack these columns
+        columns = {row[1] for row in self.connection.execute("PRAGMA table_info(urls)")}
+        for column in ('priority', 'lastmod'):
+            if column not in columns:
+                self.connection.execute(f"ALTER TABLE urls ADD COLUMN {column} REAL")
+        self.connection.commit()
+
+    def reset(self, start_url: str):
+        """Forget any previous crawl and start a new one from start_url"""
+        with self._lock:
+            self.connection.execute("DELETE FROM urls")
+            self.connection.execute("DELETE FROM meta")
+            self.connection.execute("INSERT INTO meta (key, value) VALUES ('start_url', ?)", (start_url,))
+            self.connection.commit()
+            self._pending_writes = 0
+            self._last_checkpoint = time.time()
+
+    def get_meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self.connection.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def enqueue(self, entries: Iterable[tuple]):
+        """
+        Record newly discovered (url, depth) or (url, depth, priority, lastmod)
+        entries; URLs already known keep their current state
+        """
+        with self._lock:
+            self._enqueue_locked(entries)
+            self._after_write_locked()
+
+    def _enqueue_locked(self, entries: Iterable[tuple]):
+        now = time.time()
+        rows = []
+        for entry in entries:
+            url, depth = entry[0], entry[1]
+            priority, lastmod = (entry[2], entry[3]) if len(entry) > 2 else (None, None)
+            rows.append((url, depth, self.STATUS_QUEUED, now, priority, lastmod))
+        self.connection.executemany(
+            "INSERT OR IGNORE INTO urls (url, depth, status, updated_at, priority, lastmod) VALUES (?, ?, ?, ?, ?, ?)",
+            rows
+        )
+
+    def mark_done(self, url: str, depth: int, filename: str, content_hash: str,
+                  links: List[str] = None, link_depth: int = None):
+        """
+        Mark a page finished and queue the links it produced in the same write,
+        so a crash can never lose children of a completed page
+        """
+        with self._lock:
+            if links:
+                self._enqueue_locked((link, link_depth) for link in links)
+            self.connection.execute("""
+                INSERT INTO urls (url, depth, status, filename, content_hash, error, updated_at)
+                VALUES (?, ?, ?, ?, ?, NULL, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    status = excluded.status,
+                    filename = excluded.filename,
+                    content_hash = excluded.content_hash,
+                    error = NULL,
+                    updated_at = excluded.updated_at
+            """, (url, depth, self.STATUS_DONE, filename, content_hash, time.time()))
+            self._after_write_locked()
+
+    def mark_failed(self, url: str, depth: int, error: str):
+        """Mark a page failed; failed pages are retried when the crawl is resumed"""
+        with self._lock:
+            self.connection.execute("""
+                INSERT INTO urls (url, depth, status, error, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    status = excluded.status,
+                    error = excluded.error,
+                    updated_at = excluded.updated_at
+            """, (url, depth, self.STATUS_FAILED, error, time.time()))
+            self._after_write_locked()
+
+    def iter_urls(self) -> Iterator[Tuple[str, int, str, Optional[float], Optional[float]]]:
+        """
+        Stream every saved (url, depth, status, priority, lastmod) in breadth-first order
+
+        Rows are fetched in batches so very large crawls are never loaded into memory at once.
+        """
+        with self._lock:
+            self._checkpoint_locked()
+        cursor = sqlite3.connect(str(self.db_path)).execute(
+            "SELECT url, depth, status, priority, lastmod FROM urls ORDER BY depth, rowid"
+        )
+        try:
+            while True:
+                rows = cursor.fetchmany(10000)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            cursor.connection.close()
+
+    def _after_write_locked(self):
+        self._pending_writes += 1
+        if (self._pending_writes >= self.checkpoint_every
+                or time.time() - self._last_checkpoint >= self.checkpoint_interval):
+            self._checkpoint_locked()
+
+    def _checkpoint_locked(self):
+        self.connection.commit()
+        self._pending_writes = 0
+        self._last_checkpoint = time.time()
+
+    def checkpoint(self):
+        """Commit all pending writes"""
+        with self._lock:
+            self._checkpoint_locked()
+
+    def close(self):
+        """Commit, fold the WAL back into the database file and close"""
+        with self._lock:
+            self._checkpoint_locked()
+            self.connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self.connection.close()
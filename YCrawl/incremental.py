@@ -0,0 +1,89 @@
+"""
+Incremental re-crawl support for YCrawl
+Remembers ETag, Last-Modified and a normalized-HTML hash per URL so unchanged pages can be skipped on the next run
+"""
+
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from crawl_report import iter_report_pages
+
+# Markup that changes on every request without changing the page (scripts, styles, comments)
+VOLATILE_BLOCKS = re.compile(r'<(script|style|noscript)\b[^>]*>.*?</\1\s*>|<!--.*?-->', re.IGNORECASE | re.DOTALL)
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalized_html_hash(html: str) -> str:
+    """SHA-256 of the HTML with scripts, styles, comments and whitespace differences removed"""
+    normalized = VOLATILE_BLOCKS.sub('', html)
+    normalized = _WHITESPACE.sub(' ', normalized).strip()
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+class IncrementalIndex:
+    """Page records from the previous crawl report, used to detect unchanged pages"""
+
+    def __init__(self, report_path: Path, session, timeout: float = 15.0, legacy_report_path: Path = None):
+        """
+        Load the previous crawl's page records
+
+        Args:
+            report_path: Path of the previous crawl_report.jsonl
+            session: requests.Session used for conditional requests
+            timeout: Timeout in seconds for conditional requests
+            legacy_report_path: crawl_report.json written by older versions, read when no JSONL report exists
+        """
+        self.session = session
+        self.timeout = timeout
+        self.previous: Dict[str, Dict] = {}
+        try:
+            if report_path.exists():
+                for url, record in iter_report_pages(report_path):
+                    self.previous[url] = record
+            elif legacy_report_path is not None and legacy_report_path.exists():
+                with open(legacy_report_path, 'r') as f:
+                    self.previous = json.load(f).get('pages') or {}
+        except (json.JSONDecodeError, IOError) as e:
+            print(f"Warning: Could not read previous crawl report: {e}")
+        print(f"Incremental mode: {len(self.previous)} pages known from the previous crawl")
+
+    def get(self, url: str) -> Optional[Dict]:
+        """Return the previous record for a URL, if any"""
+        return self.previous.get(url)
+
+    def check_not_modified(self, url: str) -> Tuple[bool, Dict[str, Optional[str]]]:
+        """
+        Send a conditional HEAD request for a URL
+
+        Returns:
+            (not_modified, validators): not_modified is True only when the server
+            answered 304 to the stored validators; validators holds the ETag and
+            Last-Modified values to record for this run
+        """
+        previous = self.previous.get(url) or {}
+        headers = {}
+        if previous.get('etag'):
+            headers['If-None-Match'] = previous['etag']
+        if previous.get('last_modified'):
+            headers['If-Modified-Since'] = previous['last_modified']
+
+        try:
+            response = self.session.head(url, headers=headers, timeout=self.timeout, allow_redirects=True)
+        except Exception:
+            return False, {}
+
+        validators = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified')
+        }
+        if response.status_code == 304 and headers:
+            # A 304 may omit the validators; keep the ones that matched
+            validators = {
+                'etag': validators['etag'] or previous.get('etag'),
+                'last_modified': validators['last_modified'] or previous.get('last_modified')
+            }
+            return previous.get('links') is not None, validators
+        return False, validators
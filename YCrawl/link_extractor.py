@@ -0,0 +1,249 @@
+"""
+Link extraction and URL canonicalization for YCrawl
+A single-pass tag tokenizer that finds crawlable references and reduces each URL to one canonical form
+Canonical forms are deduplication keys only: they drop trailing slashes and index files, so pages are
+fetched, and their relative links resolved, under the URL as written
+"""
+
+import fnmatch
+import html as html_lib
+import re
+from typing import Iterable, Iterator, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urldefrag, urlencode, urljoin, urlparse, urlunparse
+
+# Query parameters that only identify a campaign or click, never the page itself
+DEFAULT_TRACKING_PARAMS = (
+    'utm_*', 'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid',
+    'mc_cid', 'mc_eid', '_ga', '_gl', '_hsenc', '_hsmi', 'mkt_tok'
+)
+
+# Directory index documents that are aliases of the directory URL
+DEFAULT_INDEX_FILES = ('index.html', 'index.htm', 'index.php', 'default.aspx', 'default.htm')
+
+# Resources that are never worth sending to Firecrawl as pages
+STATIC_ASSET_EXTENSIONS = (
+    '.css', '.js', '.mjs', '.json', '.xml', '.rss', '.ico', '.png', '.jpg', '.jpeg', '.gif', '.svg',
+    '.webp', '.avif', '.bmp', '.woff', '.woff2', '.ttf', '.otf', '.eot', '.mp3', '.mp4', '.webm',
+    '.mov', '.avi', '.zip', '.gz'
+)
+
+# <link rel> values that point at other pages rather than page resources
+NAVIGATIONAL_RELS = {'alternate', 'canonical', 'next', 'prev', 'previous', 'first', 'last', 'index', 'help'}
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# Comments and script/style bodies are consumed whole so URLs inside them are never reported.
+# As in the HTML tokenizer, a quote only opens a quoted value right after '='; anywhere else
+# (title=Joe's) it is an ordinary character. Every position of a tag can be consumed by just one
+# alternative, so a tag that never closes fails in linear time instead of backtracking.
+_TOKEN_RE = re.compile(
+    r'<!--.*?-->'
+    r'|<(script|style)\b[^>]*>.*?</\1\s*>'
+    r'|<(a|area|link|iframe|frame|base|img|source)\b('
+    r'(?:=\s*"[^"]*"|=\s*\'[^\']*\'|=(?!\s*"[^"]*"|\s*\'[^\']*\')|[^>=])*'
+    r')>',
+    re.IGNORECASE | re.DOTALL
+)
+_ATTR_RE = re.compile(r'([^\s=/>"\']+)(?:\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>"\'][^\s>]*)))?')
+_SKIP_SCHEMES = ('javascript:', 'mailto:', 'tel:', 'data:', 'sms:', 'ftp:', 'file:', 'about:', 'blob:')
+
+
+def _parse_attributes(raw: str) -> dict:
+    attrs = {}
+    for match in _ATTR_RE.finditer(raw):
+        name = match.group(1).lower()
+        if name in attrs:
+            continue
+        value = match.group(2)
+        if value is None:
+            value = match.group(3) if match.group(3) is not None else match.group(4)
+        attrs[name] = html_lib.unescape(value) if value else ''
+    return attrs
+
+
+def _srcset_urls(srcset: str) -> Iterator[str]:
+    """URLs of a srcset attribute ("a.jpg 1x, b.jpg 2x")"""
+    for candidate in srcset.split(','):
+        parts = candidate.strip().split()
+        if parts:
+            yield parts[0]
+
+
+class UrlCanonicalizer:
+    """Reduces equivalent spellings of a URL to a single canonical string"""
+
+    def __init__(self, strip_params: Iterable[str] = DEFAULT_TRACKING_PARAMS,
+                 index_files: Iterable[str] = DEFAULT_INDEX_FILES,
+                 strip_trailing_slash: bool = True, sort_query: bool = True):
+        """
+        Initialize the canonicalizer
+
+        Args:
+            strip_params: Query parameter names (fnmatch patterns such as 'utm_*') to drop
+            index_files: File names treated as aliases of their directory
+            strip_trailing_slash: Remove the trailing slash from non-root paths
+            sort_query: Sort the remaining query parameters by name
+        """
+        self.strip_params = [p.lower() for p in strip_params]
+        self.index_files = {name.lower() for name in index_files}
+        self.strip_trailing_slash = strip_trailing_slash
+        self.sort_query = sort_query
+
+    def _is_stripped_param(self, name: str) -> bool:
+        name = name.lower()
+        return any(fnmatch.fnmatchcase(name, pattern) for pattern in self.strip_params)
+
+    def canonicalize(self, url: str) -> str:
+        """
+        Canonical form of an absolute URL: lowercase scheme and host, no default
+        port, no fragment, no index-file alias, normalized trailing slash and a
+        sorted query without tracking parameters
+
+        Raises:
+            ValueError: The URL is malformed (a port such as :99999 or :abc, a broken IPv6 host)
+        """
+        parsed = urlparse(url.strip())
+        scheme = parsed.scheme.lower()
+        host = (parsed.hostname or '').lower()
+        if parsed.port and DEFAULT_PORTS.get(scheme) != parsed.port:
+            host = f"{host}:{parsed.port}"
+        if parsed.username:
+            credentials = parsed.username + (f":{parsed.password}" if parsed.password else '')
+            host = f"{credentials}@{host}"
+
+        path = parsed.path or '/'
+        head, _, last = path.rpartition('/')
+        if last.lower() in self.index_files:
+            path = head + '/'
+        if self.strip_trailing_slash and len(path) > 1:
+            path = path.rstrip('/') or '/'
+
+        query = ''
+        if parsed.query:
+            params = [(k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True)
+                      if not self._is_stripped_param(k)]
+            if self.sort_query:
+                params.sort()
+            query = urlencode(params)
+
+        return urlunparse((scheme, host, path, parsed.params, query, ''))
+
+    def host(self, url: str) -> str:
+        """Canonical host[:port] of a URL, for same-site comparisons"""
+        return urlparse(self.canonicalize(url)).netloc
+
+
+class LinkExtractor:
+    """Finds references in HTML with one regex pass and resolves them to canonical URLs"""
+
+    def __init__(self, canonicalizer: Optional[UrlCanonicalizer] = None):
+        self.canonicalizer = canonicalizer or UrlCanonicalizer()
+
+    def iter_references(self, html: str, page_url: str,
+                        kinds: Optional[Iterable[str]] = None) -> Iterator[Tuple[str, str]]:
+        """
+        Yield (absolute_url, kind) for every reference in document order
+
+        absolute_url is the reference resolved against the page URL (or <base href>)
+        without its fragment, i.e. the URL to fetch. kind is 'link' (a, area, navigational link rel), 'frame' (iframe, frame),
+        'image' (img/source src and srcset) or 'asset' (other link rel values).
+        A <base href> changes how later relative references are resolved.
+
+        Args:
+            html: Page HTML
+            page_url: URL the HTML was fetched from
+            kinds: Only resolve references of these kinds (default: all)
+        """
+        for url, _, kind in self._iter_resolved(html, page_url, kinds):
+            yield url, kind
+
+    def _iter_resolved(self, html: str, page_url: str,
+                       kinds: Optional[Iterable[str]]) -> Iterator[Tuple[str, str, str]]:
+        """Yield (absolute_url, canonical_url, kind) for every reference (see iter_references)"""
+        kinds = set(kinds) if kinds is not None else None
+        base_url = page_url
+        # Pages repeat the same hrefs many times; resolve and canonicalize each one once
+        resolved = {}
+        for match in _TOKEN_RE.finditer(html):
+            tag = match.group(2)
+            if tag is None:
+                continue
+            tag = tag.lower()
+            attrs = _parse_attributes(match.group(3) or '')
+
+            if tag == 'base':
+                if attrs.get('href'):
+                    try:
+                        base_url = urljoin(page_url, attrs['href'])
+                    except ValueError:
+                        pass
+                continue
+
+            if tag in ('a', 'area'):
+                refs, kind = [attrs.get('href')], 'link'
+            elif tag == 'link':
+                rels = set(attrs.get('rel', '').lower().split())
+                refs, kind = [attrs.get('href')], 'link' if rels & NAVIGATIONAL_RELS else 'asset'
+            elif tag in ('iframe', 'frame'):
+                refs, kind = [attrs.get('src')], 'frame'
+            else:
+                refs, kind = [attrs.get('src')], 'image'
+                if attrs.get('srcset'):
+                    refs.extend(_srcset_urls(attrs['srcset']))
+
+            if kinds is not None and kind not in kinds:
+                continue
+
+            for ref in refs:
+                if not ref:
+                    continue
+                key = (base_url, ref)
+                if key not in resolved:
+                    resolved[key] = self._resolve(base_url, ref)
+                if resolved[key] is not None:
+                    yield resolved[key] + (kind,)
+
+    def _resolve(self, base_url: str, ref: str) -> Optional[Tuple[str, str]]:
+        """(absolute URL, canonical URL) of a reference, or None for fragments, non-HTTP schemes and malformed URLs"""
+        ref = ref.strip()
+        if not ref or ref.startswith('#') or ref.lower().startswith(_SKIP_SCHEMES):
+            return None
+        try:
+            absolute = urldefrag(urljoin(base_url, ref))[0]
+            if not absolute.startswith(('http://', 'https://')):
+                return None
+            return absolute, self.canonicalizer.canonicalize(absolute)
+        except ValueError:
+            # One bad href (http://host:99999/, http://[::1/) must not fail the whole page
+            return None
+
+    def extract(self, html: str, page_url: str, kinds: Iterable[str] = ('link', 'frame'),
+                same_host: bool = True, skip_static_assets: bool = True) -> List[str]:
+        """
+        URLs worth crawling, in document order, one per canonical URL
+
+        Each is the first spelling found on the page, made absolute and without
+        its fragment; compare them with UrlCanonicalizer.canonicalize.
+
+        Args:
+            html: Page HTML
+            page_url: URL the HTML was fetched from
+            kinds: Reference kinds to keep
+            same_host: Only keep URLs on the page's own host
+            skip_static_assets: Drop stylesheets, scripts, images, fonts and media
+        """
+        kinds = set(kinds)
+        page_host = self.canonicalizer.host(page_url)
+        seen: Set[str] = set()
+        links: List[str] = []
+        for url, canonical, kind in self._iter_resolved(html, page_url, kinds):
+            if canonical in seen:
+                continue
+            seen.add(canonical)
+            parsed = urlparse(canonical)
+            if same_host and parsed.netloc != page_host:
+                continue
+            if skip_static_assets and parsed.path.lower().endswith(STATIC_ASSET_EXTENSIONS):
+                continue
+            links.append(url)
+        return links
@@ -0,0 +1,257 @@
+"""
+Per-host politeness scheduling for YCrawl
+Token-bucket rate limits, cached robots.txt rules and exponential backoff on 429/5xx responses
+"""
+
+import random
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+_STATUS_IN_MESSAGE = re.compile(r'status(?:\s*code)?\D{0,3}(\d{3})', re.IGNORECASE)
+
+
+def response_status(response) -> Optional[int]:
+    """HTTP status of the origin page as reported in a Firecrawl scrape response's metadata"""
+    metadata = getattr(response, 'metadata', None)
+    if metadata is None:
+        return None
+    if isinstance(metadata, dict):
+        status = metadata.get('statusCode', metadata.get('status_code'))
+    else:
+        status = getattr(metadata, 'statusCode', None) or getattr(metadata, 'status_code', None)
+    try:
+        return int(status) if status is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def response_url(response, default: str) -> str:
+    """URL the page was finally served from (after redirects) per a Firecrawl scrape response, else default"""
+    metadata = getattr(response, 'metadata', None)
+    if isinstance(metadata, dict):
+        url = metadata.get('url')
+    else:
+        url = getattr(metadata, 'url', None)
+    return url if isinstance(url, str) and url.startswith(('http://', 'https://')) else default
+
+
+def error_status(error: Exception) -> Optional[int]:
+    """HTTP status carried by an exception, from its response object or its message"""
+    response = getattr(error, 'response', None)
+    status = getattr(response, 'status_code', None) or getattr(error, 'status_code', None)
+    if status:
+        return int(status)
+    match = _STATUS_IN_MESSAGE.search(str(error))
+    return int(match.group(1)) if match else None
+
+
+def error_retry_after(error: Exception) -> Optional[float]:
+    """Retry-After of the response attached to an exception, in seconds"""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    return parse_retry_after(headers.get('Retry-After'))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given either as seconds or as an HTTP date"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class HostState:
+    """Token bucket, backoff and robots.txt rules for one host"""
+
+    def __init__(self, rate: float, burst: int):
+        self.lock = threading.Lock()
+        self.target_rate = rate
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.last_refill = time.monotonic()
+        self.backoff_until = 0.0
+        self.failures = 0
+        self.robots: Optional[RobotFileParser] = None
+        self.robots_lock = threading.Lock()
+        self.robots_loaded = False
+
+    def refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+
+class PolitenessScheduler:
+    """Decides when (and whether) each request may be sent to its host"""
+
+    def __init__(self, session, user_agent: str = "YCrawl", requests_per_second: float = 4.0, burst: int = 8,
+                 respect_robots: bool = True, max_backoff: float = 120.0, robots_timeout: float = 10.0):
+        """
+        Initialize the scheduler
+
+        Args:
+            session: requests.Session used to fetch robots.txt
+            user_agent: Agent name matched against robots.txt groups
+            requests_per_second: Sustained request rate allowed per host
+            burst: Requests a host may receive back-to-back before the rate applies
+            respect_robots: Honour robots.txt Disallow and Crawl-delay rules
+            max_backoff: Upper bound in seconds for a single backoff
+            robots_timeout: Timeout in seconds for fetching robots.txt
+        """
+        self.session = session
+        self.user_agent = user_agent
+        self.requests_per_second = max(0.01, requests_per_second)
+        self.burst = burst
+        self.respect_robots = respect_robots
+        self.max_backoff = max_backoff
+        self.robots_timeout = robots_timeout
+        self._hosts: Dict[str, HostState] = {}
+        self._lock = threading.Lock()
+        self.stats = {
+            'throttle_wait_time': 0.0,
+            'backoffs': 0,
+            'robots_blocked': 0
+        }
+
+    def _host_state(self, url: str) -> HostState:
+        parsed = urlparse(url)
+        host = f"{parsed.scheme}://{parsed.netloc}"
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = HostState(self.requests_per_second, self.burst)
+            return self._hosts[host]
+
+    def _load_robots(self, url: str, state: HostState):
+        """Fetch and parse robots.txt once per host; unreachable files allow everything"""
+        with state.robots_lock:
+            if state.robots_loaded:
+                return
+            parsed = urlparse(url)
+            robots_url = f"{parsed.scheme}://{parsed.netloc}/robots.txt"
+            parser = RobotFileParser(robots_url)
+            try:
+                response = self.session.get(robots_url, timeout=self.robots_timeout)
+                if response.status_code in (401, 403):
+                    parser.disallow_all = True
+                elif response.status_code < 400:
+                    parser.parse(response.text.splitlines())
+                else:
+                    parser.allow_all = True
+            except Exception as e:
+                print(f"  ⚠ Could not fetch {robots_url}: {e}")
+                parser.allow_all = True
+
+            delay = parser.crawl_delay(self.user_agent)
+            request_rate = parser.request_rate(self.user_agent)
+            with state.lock:
+                if delay:
+                    state.target_rate = state.rate = min(state.target_rate, 1.0 / float(delay))
+                    state.capacity = 1
+                    state.tokens = min(state.tokens, 1.0)
+                if request_rate and request_rate.requests and request_rate.seconds:
+                    state.target_rate = state.rate = min(state.target_rate,
+                                                         request_rate.requests / request_rate.seconds)
+            state.robots = parser
+            state.robots_loaded = True
+
+    def is_allowed(self, url: str) -> bool:
+        """Check robots.txt for a URL (the file is fetched the first time a host is seen)"""
+        if not self.respect_robots:
+            return True
+        state = self._host_state(url)
+        if not state.robots_loaded:
+            self._load_robots(url, state)
+        allowed = state.robots.can_fetch(self.user_agent, url)
+        if not allowed:
+            self._count('robots_blocked', 1)
+        return allowed
+
+    def sitemaps(self, url: str) -> List[str]:
+        """Sitemap URLs listed in the host's robots.txt (empty when robots.txt is not respected)"""
+        if not self.respect_robots:
+            return []
+        state = self._host_state(url)
+        if not state.robots_loaded:
+            self._load_robots(url, state)
+        return state.robots.site_maps() or []
+
+    def acquire(self, url: str) -> float:
+        """
+        Block until the URL's host may receive another request
+
+        Returns:
+            Seconds spent waiting
+        """
+        state = self._host_state(url)
+        if self.respect_robots and not state.robots_loaded:
+            self._load_robots(url, state)
+
+        waited = 0.0
+        while True:
+            with state.lock:
+                now = time.monotonic()
+                wait = state.backoff_until - now
+                if wait <= 0:
+                    state.refill(now)
+                    if state.tokens >= 1:
+                        state.tokens -= 1
+                        break
+                    wait = (1 - state.tokens) / state.rate
+            time.sleep(wait)
+            waited += wait
+
+        if waited:
+            self._count('throttle_wait_time', waited)
+        return waited
+
+    def record_response(self, url: str, status: Optional[int], retry_after: Optional[float] = None) -> Optional[float]:
+        """
+        Feed a response status back into the host's rate and backoff state
+
+        Successes slowly restore the host's rate; 429 halves it. A 429 or 5xx
+        pauses the host for Retry-After seconds, or an exponentially growing
+        jittered delay when the server gave none.
+
+        Returns:
+            Seconds until the host may be retried if the status is retryable, else None
+        """
+        state = self._host_state(url)
+        with state.lock:
+            if status not in RETRYABLE_STATUSES:
+                state.failures = 0
+                state.rate = min(state.target_rate, state.rate + state.target_rate * 0.1)
+                return None
+
+            state.failures += 1
+            if status == 429:
+                state.rate = max(state.target_rate / 16, state.rate / 2)
+            if retry_after is not None:
+                delay = min(self.max_backoff, retry_after)
+            else:
+                delay = min(self.max_backoff, 2 ** (state.failures - 1)) * random.uniform(0.75, 1.25)
+            state.backoff_until = max(state.backoff_until, time.monotonic() + delay)
+        self._count('backoffs', 1)
+        return delay
+
+    def _count(self, key: str, amount):
+        with self._lock:
+            self.stats[key] += amount
+
+    def get_stats(self) -> Dict:
+        """Snapshot of throttling counters"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['hosts'] = len(self._hosts)
+        return stats
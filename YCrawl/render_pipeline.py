@@ -0,0 +1,203 @@
+"""
+Render stage for YCrawl's fetch -> render pipeline
+Fetch workers hand finished pages to a bounded queue; render workers drain it, running
+CPU-bound PDF libraries in a process pool so rendering uses every core while fetching continues
+"""
+
+import os
+import queue
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+
+
+def render_html_pdf(library: str, html: str, base_url: str, pdf_path: str) -> Tuple[bool, Optional[str]]:
+    """
+    Render HTML to PDF with pdfkit or WeasyPrint (runs in a render process)
+
+    The PDF is written to a temporary file and renamed onto pdf_path, so a reader
+    (or an abandoned browser render of the same page) never sees a partial file.
+
+    Returns:
+        (saved, error): error is 'unavailable' when the library cannot be imported
+    """
+    fd, part_path = tempfile.mkstemp(suffix='.part', dir=os.path.dirname(os.path.abspath(pdf_path)))
+    os.close(fd)
+    try:
+        if library == 'pdfkit':
+            import pdfkit
+            pdfkit.from_string(html, part_path)
+        else:
+            from weasyprint import HTML
+            HTML(string=html, base_url=base_url).write_pdf(part_path)
+        os.replace(part_path, pdf_path)
+        return True, None
+    except ImportError:
+        return False, 'unavailable'
+    except Exception as e:
+        # Library exceptions are not always picklable; send the message back instead
+        return False, str(e)
+    finally:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+
+
+class StageMeter:
+    """Busy time and queue depth of one pipeline stage"""
+
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._started_at: Optional[float] = None
+        self._stopped_at: Optional[float] = None
+        self.stats = {
+            'jobs': 0,
+            'busy_time': 0.0,
+            'queue_depth': 0,
+            'max_queue_depth': 0
+        }
+
+    def start(self):
+        with self._lock:
+            if self._started_at is None:
+                self._started_at = time.time()
+
+    def stop(self):
+        with self._lock:
+            self._stopped_at = time.time()
+
+    def record_job(self, busy_time: float):
+        with self._lock:
+            self.stats['jobs'] += 1
+            self.stats['busy_time'] += busy_time
+
+    def observe_depth(self, depth: int):
+        with self._lock:
+            self.stats['queue_depth'] = depth
+            self.stats['max_queue_depth'] = max(self.stats['max_queue_depth'], depth)
+
+    def get_stats(self) -> Dict:
+        """Snapshot including utilization: busy time over worker-seconds available"""
+        with self._lock:
+            stats = dict(self.stats)
+            elapsed = (self._stopped_at or time.time()) - self._started_at if self._started_at else 0.0
+        stats['workers'] = self.workers
+        stats['elapsed'] = elapsed
+        stats['utilization'] = stats['busy_time'] / (self.workers * elapsed) if elapsed > 0 else 0.0
+        return stats
+
+
+class RenderStage:
+    """
+    Bounded queue of render jobs drained by a fixed set of render workers
+
+    submit() blocks while the queue is full, so fetching slows down to the
+    rate rendering can sustain instead of piling up page HTML in memory.
+    """
+
+    def __init__(self, render_job: Callable, workers: int = 4, queue_size: int = 32):
+        """
+        Initialize the stage (workers start on the first submitted job)
+
+        Args:
+            render_job: Called with each submitted job on a render worker thread
+            workers: Render workers, and processes in the pool used by process_pool()
+            queue_size: Jobs that may wait for a worker before submit() blocks
+        """
+        self.render_job = render_job
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+        self._jobs: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        self._threads = []
+        self._lock = threading.Lock()
+        self._processes: Optional[ProcessPoolExecutor] = None
+        self._closed = False
+        self.meter = StageMeter('render', self.workers)
+        self.backpressure_time = 0.0
+
+    def start(self):
+        with self._lock:
+            if self._threads or self._closed:
+                return
+            self.meter.start()
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._worker, name=f"render-{index}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def process_pool(self) -> ProcessPoolExecutor:
+        """Process pool for CPU-bound PDF libraries, created on first use"""
+        with self._lock:
+            if self._processes is None:
+                self._processes = ProcessPoolExecutor(max_workers=self.workers)
+            return self._processes
+
+    def submit(self, job) -> float:
+        """
+        Queue a job, waiting while the queue is full
+
+        Returns:
+            Seconds spent waiting for room in the queue
+        """
+        if self._closed:
+            raise RuntimeError("Render stage is closed")
+        self.start()
+        started = time.perf_counter()
+        self._jobs.put(job)
+        waited = time.perf_counter() - started
+        with self._lock:
+            self.backpressure_time += waited
+        self.meter.observe_depth(self._jobs.qsize())
+        return waited
+
+    def _worker(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            self.meter.observe_depth(self._jobs.qsize())
+            started = time.perf_counter()
+            try:
+                self.render_job(job)
+            except Exception as e:
+                print(f"  ✗ Render worker error: {e}")
+            finally:
+                self.meter.record_job(time.perf_counter() - started)
+
+    def get_stats(self) -> Dict:
+        stats = self.meter.get_stats()
+        stats['queue_size'] = self.queue_size
+        with self._lock:
+            stats['backpressure_time'] = self.backpressure_time
+        return stats
+
+    def close(self, cancel_pending: bool = False):
+        """
+        Wait for queued jobs to finish and stop the workers
+
+        Args:
+            cancel_pending: Drop jobs still waiting in the queue (their pages are re-fetched on resume)
+        """
+        with self._lock:
+            self._closed = True
+            threads = list(self._threads)
+        if cancel_pending:
+            dropped = 0
+            while True:
+                try:
+                    if self._jobs.get_nowait() is not None:
+                        dropped += 1
+                except queue.Empty:
+                    break
+            if dropped:
+                print(f"Dropped {dropped} queued render jobs")
+        for _ in threads:
+            self._jobs.put(None)
+        for thread in threads:
+            thread.join()
+        self.meter.stop()
+        if self._processes is not None:
+            self._processes.shutdown(wait=True, cancel_futures=cancel_pending)
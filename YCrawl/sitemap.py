@@ -0,0 +1,206 @@
+"""
+Sitemap discovery for YCrawl
+Stream-parses sitemap.xml files (plain or gzipped, including sitemap indexes) into crawl seeds with priority and lastmod
+"""
+
+import gzip
+import threading
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional
+from urllib.parse import urlparse
+
+from politeness import parse_retry_after
+
+# Priority the sitemap protocol assigns to URLs that do not state one
+DEFAULT_PRIORITY = 0.5
+# Sitemap files followed per crawl, across all indexes
+MAX_SITEMAPS = 1000
+
+_GZIP_MAGIC = b'\x1f\x8b'
+
+
+class _PrefixedStream:
+    """read() over bytes already taken from a stream, followed by the rest of that stream"""
+
+    def __init__(self, prefix: bytes, stream):
+        self.prefix = prefix
+        self.stream = stream
+
+    def read(self, size: int = -1) -> bytes:
+        if not self.prefix:
+            return self.stream.read(size) if size >= 0 else self.stream.read()
+        if size < 0:
+            data, self.prefix = self.prefix + self.stream.read(), b''
+            return data
+        data, self.prefix = self.prefix[:size], self.prefix[size:]
+        if len(data) < size:
+            data += self.stream.read(size - len(data)) or b''
+        return data
+
+
+class SitemapEntry(NamedTuple):
+    url: str
+    priority: float
+    lastmod: Optional[float]
+
+
+def parse_lastmod(value: Optional[str]) -> Optional[float]:
+    """Unix time of a W3C datetime (2024, 2024-05, 2024-05-01, 2024-05-01T10:00:00Z, ...), or None"""
+    if not value:
+        return None
+    value = value.strip()
+    if len(value) == 4:
+        value += '-01-01'
+    elif len(value) == 7:
+        value += '-01'
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def parse_priority(value: Optional[str]) -> float:
+    """Sitemap <priority> clamped to 0.0 - 1.0, or the protocol default"""
+    try:
+        return min(1.0, max(0.0, float(value)))
+    except (TypeError, ValueError):
+        return DEFAULT_PRIORITY
+
+
+def iter_sitemap(stream) -> Iterator[tuple]:
+    """
+    Stream ('url' | 'sitemap', loc, priority, lastmod) tuples out of a sitemap
+    or sitemap index without building the whole document in memory
+
+    Only direct children of <url>/<sitemap> in the entry's own namespace are read,
+    so extension elements such as <image:loc> or <video:content_loc> never replace
+    the page's <loc>.
+    """
+    fields: Dict[str, str] = {}
+    depth = 0
+    entry = None  # (depth, namespace) of the open <url>/<sitemap> element
+    for event, element in ET.iterparse(stream, events=('start', 'end')):
+        namespace, _, tag = element.tag.rpartition('}')
+        if event == 'start':
+            depth += 1
+            if entry is None and tag in ('url', 'sitemap'):
+                entry = (depth, namespace)
+                fields = {}
+            continue
+        if entry is not None and depth == entry[0] + 1 and namespace == entry[1] and tag in ('loc', 'priority', 'lastmod'):
+            fields[tag] = (element.text or '').strip()
+        elif entry is not None and depth == entry[0]:
+            if fields.get('loc'):
+                yield tag, fields['loc'], fields.get('priority'), fields.get('lastmod')
+            entry = None
+            # Finished entries are dropped from the tree so memory stays flat on 50,000-URL files
+            element.clear()
+        depth -= 1
+
+
+class SitemapReader:
+    """Finds a site's sitemaps and walks them (indexes included) into SitemapEntry seeds"""
+
+    def __init__(self, session, scheduler=None, timeout: float = 30.0, max_urls: int = 100000,
+                 url_filter: Optional[Callable[[str], Optional[str]]] = None):
+        """
+        Initialize the reader
+
+        Args:
+            session: requests.Session used to download sitemaps
+            scheduler: Optional PolitenessScheduler that paces requests per host
+            timeout: Connect/read timeout in seconds for each sitemap
+            max_urls: Stop after this many page URLs
+            url_filter: Maps a sitemap <loc> to the URL to crawl, or None to skip it
+        """
+        self.session = session
+        self.scheduler = scheduler
+        self.timeout = timeout
+        self.max_urls = max_urls
+        self.url_filter = url_filter
+        self._lock = threading.Lock()
+        self.stats = {
+            'sitemaps_read': 0,
+            'sitemaps_failed': 0,
+            'urls_found': 0,
+            'urls_skipped': 0
+        }
+
+    def discover(self, start_url: str, extra_sitemaps: Iterable[str] = ()) -> List[str]:
+        """Sitemap URLs for a site: configured ones, robots.txt Sitemap: lines, else /sitemap.xml"""
+        parsed = urlparse(start_url)
+        candidates = list(extra_sitemaps)
+        if self.scheduler is not None:
+            candidates.extend(self.scheduler.sitemaps(start_url))
+        if not candidates:
+            candidates.append(f"{parsed.scheme}://{parsed.netloc}/sitemap.xml")
+        return list(dict.fromkeys(candidates))
+
+    def _open(self, sitemap_url: str):
+        """Start downloading a sitemap; returns a binary stream, gunzipped when needed"""
+        if self.scheduler is not None:
+            self.scheduler.acquire(sitemap_url)
+        response = self.session.get(sitemap_url, stream=True, timeout=self.timeout)
+        if self.scheduler is not None:
+            self.scheduler.record_response(sitemap_url, response.status_code,
+                                           parse_retry_after(response.headers.get('Retry-After')))
+        if response.status_code >= 400:
+            response.close()
+            raise IOError(f"HTTP {response.status_code}")
+        # Undo Content-Encoding: gzip transparently; a .xml.gz body is then still gzip data
+        response.raw.decode_content = True
+        prefix = response.raw.read(2) or b''
+        stream = _PrefixedStream(prefix, response.raw)
+        if prefix == _GZIP_MAGIC:
+            return response, gzip.GzipFile(fileobj=stream)
+        return response, stream
+
+    def iter_entries(self, sitemap_urls: Iterable[str]) -> Iterator[SitemapEntry]:
+        """Walk the given sitemaps and every sitemap they index, yielding page entries"""
+        pending = list(sitemap_urls)
+        seen = set(pending)
+        found = 0
+        while pending and found < self.max_urls:
+            sitemap_url = pending.pop(0)
+            try:
+                response, stream = self._open(sitemap_url)
+            except Exception as e:
+                self._count('sitemaps_failed')
+                print(f"  ⚠ Could not fetch sitemap {sitemap_url}: {e}")
+                continue
+            try:
+                with response:
+                    for kind, loc, priority, lastmod in iter_sitemap(stream):
+                        if kind == 'sitemap':
+                            if loc not in seen and len(seen) < MAX_SITEMAPS:
+                                seen.add(loc)
+                                pending.append(loc)
+                            continue
+                        url = self.url_filter(loc) if self.url_filter else loc
+                        if url is None:
+                            self._count('urls_skipped')
+                            continue
+                        self._count('urls_found')
+                        yield SitemapEntry(url, parse_priority(priority), parse_lastmod(lastmod))
+                        found += 1
+                        if found >= self.max_urls:
+                            print(f"  ⚠ Sitemap URL limit reached ({self.max_urls}), remaining entries ignored")
+                            break
+                self._count('sitemaps_read')
+                print(f"  ✓ Sitemap read: {sitemap_url}")
+            except (ET.ParseError, OSError, EOFError) as e:
+                self._count('sitemaps_failed')
+                print(f"  ⚠ Could not parse sitemap {sitemap_url}: {e}")
+
+    def _count(self, key: str, amount: int = 1):
+        with self._lock:
+            self.stats[key] += amount
+
+    def get_stats(self) -> Dict:
+        """Snapshot of sitemap counters"""
+        with self._lock:
+            return dict(self.stats)
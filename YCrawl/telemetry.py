@@ -0,0 +1,349 @@
+"""
+Crawl telemetry for YCrawl
+Per-stage timers, latency and size histograms, error counts by class, a periodic progress
+line with ETA, and Prometheus-format metrics written to a file or served over local HTTP
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from politeness import error_status
+
+STAGES = ('scrape', 'extract', 'render', 'download')
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (1024, 10 * 1024, 50 * 1024, 100 * 1024, 250 * 1024, 500 * 1024,
+                1024 * 1024, 5 * 1024 * 1024, 25 * 1024 * 1024)
+# Seconds of history behind the pages/sec figure used for the ETA
+RATE_WINDOW = 60.0
+
+
+def status_class(status: int) -> str:
+    """Error class of an HTTP status: http_429 (rate limited) or http_4xx / http_5xx"""
+    return 'http_429' if status == 429 else f"http_{status // 100}xx"
+
+
+def error_class(error) -> str:
+    """Coarse class of a failure for error counts: http_429, http_5xx, http_4xx, timeout, connection, ..."""
+    if isinstance(error, str):
+        return error
+    status = error_status(error)
+    if status is not None and 400 <= status < 600:
+        return status_class(status)
+    name = type(error).__name__
+    message = str(error).lower()
+    if 'timeout' in name.lower() or 'timed out' in message:
+        return 'timeout'
+    if 'connection' in name.lower() or 'connection' in message:
+        return 'connection'
+    return name
+
+
+def format_duration(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return '?'
+    seconds = int(seconds)
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style, plus the exact maximum"""
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        index = 0
+        while index < len(self.buckets) and value > self.buckets[index]:
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def quantile(self, fraction: float) -> float:
+        """Estimate of a quantile, interpolated inside the bucket that holds it"""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else self.max
+                return min(self.max, lower + (upper - lower) * (rank - seen) / bucket_count)
+            seen += bucket_count
+        return self.max
+
+    def snapshot(self) -> Dict:
+        return {
+            'count': self.count,
+            'sum': self.total,
+            'avg': self.total / self.count if self.count else 0.0,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'max': self.max,
+            'buckets': dict(zip([str(b) for b in self.buckets] + ['+Inf'], self.counts))
+        }
+
+
+class Telemetry:
+    """
+    Thread-safe metrics registry for one crawl
+
+    Stage timings and histograms are recorded by the crawl threads; progress
+    figures (pages done, queued, ...) are pulled from progress_source when a
+    progress line or metrics export is produced.
+    """
+
+    def __init__(self, progress_source: Optional[Callable[[], Dict]] = None):
+        """
+        Args:
+            progress_source: Returns the current 'done', 'failed', 'queued' and 'remaining' page counts
+        """
+        self.progress_source = progress_source
+        self._lock = threading.Lock()
+        self.stages = {stage: Histogram(LATENCY_BUCKETS) for stage in STAGES}
+        self.histograms = {
+            'page_latency_seconds': Histogram(LATENCY_BUCKETS),
+            'page_size_bytes': Histogram(SIZE_BUCKETS),
+            'attachment_size_bytes': Histogram(SIZE_BUCKETS)
+        }
+        self.errors: Dict[Tuple[str, str], int] = {}
+        self.retries: Dict[str, int] = {}
+        self.started_at = time.time()
+        # (time, pages done) samples for the recent throughput behind the ETA
+        self._samples: deque = deque()
+
+    @contextmanager
+    def timer(self, stage: str):
+        """Time a block of work under a stage (recorded even if the block raises)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_stage(stage, time.perf_counter() - started)
+
+    def record_stage(self, stage: str, seconds: float):
+        with self._lock:
+            self.stages[stage].observe(seconds)
+
+    def observe(self, name: str, value: float):
+        with self._lock:
+            self.histograms[name].observe(value)
+
+    def count_error(self, stage: str, error):
+        """Count a failure under its stage and error_class()"""
+        key = (stage, error_class(error))
+        with self._lock:
+            self.errors[key] = self.errors.get(key, 0) + 1
+
+    def count_retry(self, error):
+        """Count a failed attempt that is being retried, by error_class()"""
+        cls = error_class(error)
+        with self._lock:
+            self.retries[cls] = self.retries.get(cls, 0) + 1
+
+    def start(self):
+        """Restart the elapsed-time clock and throughput history at the start of a crawl"""
+        with self._lock:
+            self.started_at = time.time()
+            self._samples.clear()
+
+    def progress(self) -> Dict:
+        """Pages done/failed/queued, recent pages per second and the estimated time left"""
+        source = self.progress_source() if self.progress_source else {}
+        now = time.time()
+        done = source.get('done', 0) + source.get('failed', 0)
+        with self._lock:
+            if not self._samples or now - self._samples[-1][0] >= 1.0:
+                self._samples.append((now, done))
+            while len(self._samples) > 1 and now - self._samples[0][0] > RATE_WINDOW:
+                self._samples.popleft()
+            first_time, first_done = self._samples[0]
+        if now - first_time > 0 and done > first_done:
+            rate = (done - first_done) / (now - first_time)
+        else:
+            elapsed = now - self.started_at
+            rate = done / elapsed if elapsed > 0 else 0.0
+        remaining = source.get('remaining', source.get('queued', 0))
+        return {
+            'done': source.get('done', 0),
+            'failed': source.get('failed', 0),
+            'queued': source.get('queued', 0),
+            'remaining': remaining,
+            'elapsed': now - self.started_at,
+            'pages_per_second': rate,
+            'eta_seconds': remaining / rate if rate > 0 else None
+        }
+
+    def progress_line(self) -> str:
+        p = self.progress()
+        return (f"⏱ {p['done']} done, {p['failed']} failed, {p['queued']} queued | "
+                f"{p['pages_per_second']:.2f} pages/s | elapsed {format_duration(p['elapsed'])}, "
+                f"ETA {format_duration(p['eta_seconds'])}")
+
+    def get_stats(self) -> Dict:
+        """Snapshot of every timer, histogram and error count"""
+        with self._lock:
+            stats = {
+                'stages': {stage: histogram.snapshot() for stage, histogram in self.stages.items()},
+                'histograms': {name: histogram.snapshot() for name, histogram in self.histograms.items()},
+                'errors': [{'stage': stage, 'class': cls, 'count': count}
+                           for (stage, cls), count in sorted(self.errors.items())],
+                'retries': dict(sorted(self.retries.items()))
+            }
+        return stats
+
+    def prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        progress = self.progress()
+        lines: List[str] = []
+
+        def histogram_lines(name: str, histogram: Histogram, labels: str = ''):
+            cumulative = 0
+            for bucket, count in zip(list(histogram.buckets) + ['+Inf'], histogram.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels}{"," if labels else ""}le="{bucket}"}} {cumulative}')
+            suffix = f'{{{labels}}}' if labels else ''
+            lines.append(f'{name}_sum{suffix} {histogram.total}')
+            lines.append(f'{name}_count{suffix} {histogram.count}')
+
+        lines += ['# HELP ycrawl_pages_total Pages finished, by outcome', '# TYPE ycrawl_pages_total counter',
+                  f'ycrawl_pages_total{{outcome="success"}} {progress["done"]}',
+                  f'ycrawl_pages_total{{outcome="failed"}} {progress["failed"]}']
+        lines += ['# HELP ycrawl_frontier_pages Pages queued and not yet crawled', '# TYPE ycrawl_frontier_pages gauge',
+                  f'ycrawl_frontier_pages {progress["queued"]}']
+        lines += ['# HELP ycrawl_pages_per_second Recent crawl throughput', '# TYPE ycrawl_pages_per_second gauge',
+                  f'ycrawl_pages_per_second {progress["pages_per_second"]:.4f}']
+        if progress['eta_seconds'] is not None:
+            lines += ['# HELP ycrawl_eta_seconds Estimated time until the queued pages are crawled',
+                      '# TYPE ycrawl_eta_seconds gauge', f'ycrawl_eta_seconds {progress["eta_seconds"]:.1f}']
+
+        with self._lock:
+            lines += ['# HELP ycrawl_stage_seconds Time spent per unit of work in each pipeline stage',
+                      '# TYPE ycrawl_stage_seconds histogram']
+            for stage, histogram in self.stages.items():
+                histogram_lines('ycrawl_stage_seconds', histogram, f'stage="{stage}"')
+            for name, histogram in self.histograms.items():
+                lines += [f'# TYPE ycrawl_{name} histogram']
+                histogram_lines(f'ycrawl_{name}', histogram)
+            lines += ['# HELP ycrawl_errors_total Failures by stage and error class', '# TYPE ycrawl_errors_total counter']
+            for (stage, cls), count in sorted(self.errors.items()):
+                lines.append(f'ycrawl_errors_total{{stage="{stage}",class="{cls}"}} {count}')
+            lines += ['# HELP ycrawl_retries_total Failed attempts that were retried, by error class',
+                      '# TYPE ycrawl_retries_total counter']
+            for cls, count in sorted(self.retries.items()):
+                lines.append(f'ycrawl_retries_total{{class="{cls}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+    def write_metrics_file(self, path: Path):
+        """Write the Prometheus metrics atomically (for node_exporter's textfile collector and the like)"""
+        path = Path(path)
+        temp_path = path.with_name(path.name + '.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(self.prometheus())
+        os.replace(temp_path, path)
+
+
+class ProgressReporter:
+    """Background thread printing the progress line and refreshing the metrics file every few seconds"""
+
+    def __init__(self, telemetry: Telemetry, interval: float = 10.0, metrics_file: Optional[Path] = None):
+        self.telemetry = telemetry
+        self.interval = interval
+        self.metrics_file = Path(metrics_file) if metrics_file else None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self.interval <= 0 and self.metrics_file is None:
+            return
+        self._thread = threading.Thread(target=self._run, name="progress", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        interval = self.interval if self.interval > 0 else 10.0
+        while not self._stop.wait(interval):
+            self._report()
+
+    def _report(self):
+        if self.interval > 0:
+            print(self.telemetry.progress_line())
+        if self.metrics_file is not None:
+            try:
+                self.telemetry.write_metrics_file(self.metrics_file)
+            except OSError as e:
+                print(f"  ⚠ Could not write metrics file {self.metrics_file}: {e}")
+
+    def stop(self):
+        """Stop the thread and write the final metrics file"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self.metrics_file is not None:
+            try:
+                self.telemetry.write_metrics_file(self.metrics_file)
+            except OSError as e:
+                print(f"  ⚠ Could not write metrics file {self.metrics_file}: {e}")
+
+
+class MetricsServer:
+    """Local HTTP endpoint: /metrics (Prometheus text format) and /progress (JSON)"""
+
+    def __init__(self, telemetry: Telemetry, port: int, host: str = '127.0.0.1'):
+        self.telemetry = telemetry
+        self.host = host
+        self.port = port
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def _make_handler(self):
+        telemetry = self.telemetry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split('?', 1)[0]
+                if path == '/metrics':
+                    body = telemetry.prometheus().encode('utf-8')
+                    content_type = 'text/plain; version=0.0.4; charset=utf-8'
+                elif path == '/progress':
+                    body = json.dumps(telemetry.progress()).encode('utf-8')
+                    content_type = 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> str:
+        """Start serving in a background thread and return the metrics URL"""
+        self._server = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, name="metrics", daemon=True).start()
+        return f"http://{self.host}:{self.port}/metrics"
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
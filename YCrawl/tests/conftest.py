@@ -0,0 +1,5 @@
+import os
+import sys
+
+# YCrawl's modules are flat scripts next to ycrawl.py, not an installed package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
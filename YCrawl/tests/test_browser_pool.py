@@ -0,0 +1,70 @@
+from types import SimpleNamespace
+
+from asset_cache import AssetCache
+from browser_pool import BrowserPool, inject_base_href
+
+
+class FakeRoute:
+    """Records how the route handler answered a Playwright route"""
+
+    def __init__(self, url, fetch):
+        self.request = SimpleNamespace(method="GET", url=url)
+        self._fetch = fetch
+        self.outcome = None
+
+    def fetch(self):
+        return self._fetch()
+
+    def fulfill(self, **kwargs):
+        self.outcome = ('fulfill', kwargs)
+
+    def continue_(self):
+        self.outcome = ('continue', None)
+
+    def abort(self):
+        self.outcome = ('abort', None)
+
+
+def make_pool(tmp_path):
+    return BrowserPool(size=1, asset_cache=AssetCache(str(tmp_path / 'assets')))
+
+
+def test_failed_subresource_fetch_aborts_the_route(tmp_path):
+    def refused():
+        raise ConnectionRefusedError("net::ERR_CONNECTION_REFUSED")
+    route = FakeRoute("https://cdn.example.com/app.css", refused)
+    make_pool(tmp_path)._serve_from_cache(route)
+    assert route.outcome == ('abort', None)
+
+
+def test_fetched_subresource_is_cached_and_served(tmp_path):
+    response = SimpleNamespace(status=200, headers={'content-type': 'text/css'}, body=lambda: b'body{}')
+    pool = make_pool(tmp_path)
+    route = FakeRoute("https://cdn.example.com/app.css", lambda: response)
+    pool._serve_from_cache(route)
+    assert route.outcome == ('fulfill', {'response': response, 'body': b'body{}'})
+
+    def offline():
+        raise TimeoutError("fetch should not run on a cache hit")
+    cached = FakeRoute("https://cdn.example.com/app.css", offline)
+    pool._serve_from_cache(cached)
+    assert cached.outcome[0] == 'fulfill'
+    assert cached.outcome[1]['body'] == b'body{}'
+
+
+def test_base_href_goes_into_head_not_a_header_element():
+    html = '<html><head><title>T</title></head><body><header class="top">Logo</header></body></html>'
+    assert inject_base_href(html, "https://ex.com/a/") == (
+        '<html><head><base href="https://ex.com/a/"><title>T</title></head>'
+        '<body><header class="top">Logo</header></body></html>'
+    )
+    assert inject_base_href('<HEAD lang="en"></HEAD>', "https://ex.com/") == '<HEAD lang="en"><base href="https://ex.com/"></HEAD>'
+
+
+def test_base_href_without_head_element():
+    # Regression: <head[^>]*> also matched <header>, putting <base> inside the body where it is ignored
+    assert inject_base_href('<!DOCTYPE html><html lang="en"><header>Logo</header></html>', "https://ex.com/") == (
+        '<!DOCTYPE html><html lang="en"><base href="https://ex.com/"><header>Logo</header></html>'
+    )
+    assert inject_base_href('<header>Logo</header>', "https://ex.com/") == '<base href="https://ex.com/"><header>Logo</header>'
+    assert inject_base_href('<head><base href="/x/"></head>', "https://ex.com/") == '<head><base href="/x/"></head>'
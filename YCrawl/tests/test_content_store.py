@@ -0,0 +1,97 @@
+import random
+
+from content_store import MIN_SIMHASH_UNIQUE_WORDS, ContentStore, content_words, hamming_distance, simhash
+
+VOCABULARY = [f"word{i}" for i in range(5000)]
+
+
+def make_page(body_words, nav_words=('Home', 'About', 'Contact')):
+    links = ' '.join(f'<a href="/{word}">{word}</a>' for word in nav_words)
+    return (
+        f'<html><body><header>Camp site header</header><nav>{links}</nav>'
+        f'<main><p>{" ".join(body_words)}</p></main><footer>Copyright camp</footer></body></html>'
+    )
+
+
+def test_hamming_distance_counts_differing_bits():
+    assert hamming_distance(0, 0) == 0
+    assert hamming_distance(0b1011, 0b0001) == 2
+    assert hamming_distance(0, (1 << 64) - 1) == 64
+
+
+def test_simhash_is_stable_and_close_for_small_edits():
+    words = random.Random(1).sample(VOCABULARY, 300)
+    edited = list(words)
+    edited[150] = 'changed'
+    assert simhash(words) == simhash(list(words))
+    assert 0 <= simhash(words) < 1 << 64
+    assert hamming_distance(simhash(words), simhash(edited)) <= 3
+
+
+def test_simhash_separates_unrelated_texts():
+    rng = random.Random(2)
+    first, second = rng.sample(VOCABULARY, 300), rng.sample(VOCABULARY, 300)
+    assert hamming_distance(simhash(first), simhash(second)) > 3
+
+
+def test_content_words_ignore_site_furniture():
+    assert content_words(make_page(['Registration', 'opens'])) == ['registration', 'opens']
+
+
+def test_shared_navigation_does_not_make_different_pages_near_duplicates(tmp_path):
+    # Regression: fingerprints used to cover nav and footer text, so template-heavy pages collided
+    rng = random.Random(3)
+    nav_words = rng.sample(VOCABULARY, 300)
+    store = ContentStore(tmp_path)
+    for index in range(20):
+        html = make_page(rng.sample(VOCABULARY, 120), nav_words)
+        path, duplicate, fingerprint = store.claim_page(f"hash{index}", html)
+        assert (path, duplicate) == (None, None)
+        assert fingerprint is not None
+        store.commit_page(f"https://example.com/{index}", f"hash{index}", f"blobs/{index}.pdf", fingerprint)
+    store.close()
+
+
+def test_near_duplicate_page_reuses_the_rendered_pdf(tmp_path):
+    words = random.Random(4).sample(VOCABULARY, 300)
+    edited = list(words)
+    edited[10] = 'changed'
+    store = ContentStore(tmp_path)
+    path, duplicate, fingerprint = store.claim_page('original', make_page(words))
+    assert path is None
+    store.commit_page('https://example.com/a', 'original', 'blobs/original.pdf', fingerprint)
+
+    assert store.claim_page('original', make_page(words))[:2] == ('blobs/original.pdf', 'exact')
+    assert store.claim_page('edited', make_page(edited))[:2] == ('blobs/original.pdf', 'near')
+    store.close()
+
+
+def test_short_pages_are_only_deduplicated_when_identical(tmp_path):
+    words = VOCABULARY[:MIN_SIMHASH_UNIQUE_WORDS - 1]
+    store = ContentStore(tmp_path)
+    path, duplicate, fingerprint = store.claim_page('short', make_page(words))
+    assert fingerprint is None
+    store.commit_page('https://example.com/short', 'short', 'blobs/short.pdf', fingerprint)
+    assert store.claim_page('short-edited', make_page(words[:-1] + ['changed']))[:2] == (None, None)
+    store.close()
+
+
+def test_near_duplicate_detection_can_be_disabled(tmp_path):
+    store = ContentStore(tmp_path, detect_near_duplicates=False)
+    assert store.claim_page('page', make_page(VOCABULARY[:300])) == (None, None, None)
+    store.close()
+
+
+def test_page_index_is_reloaded_from_the_manifest(tmp_path):
+    words = random.Random(5).sample(VOCABULARY, 300)
+    store = ContentStore(tmp_path)
+    fingerprint = store.claim_page('original', make_page(words))[2]
+    (tmp_path / 'blobs' / 'original.pdf').write_bytes(b'%PDF-1.4')
+    store.commit_page('https://example.com/a', 'original', 'blobs/original.pdf', fingerprint)
+    store.close()
+
+    edited = list(words)
+    edited[0] = 'changed'
+    reopened = ContentStore(tmp_path)
+    assert reopened.claim_page('edited', make_page(edited))[:2] == ('blobs/original.pdf', 'near')
+    reopened.close()
@@ -0,0 +1,94 @@
+import time
+
+import pytest
+
+from link_extractor import LinkExtractor, UrlCanonicalizer
+
+
+@pytest.fixture
+def extractor():
+    return LinkExtractor()
+
+
+def test_canonicalize_normalizes_equivalent_spellings():
+    canonicalizer = UrlCanonicalizer()
+    assert canonicalizer.canonicalize("HTTP://Example.COM:80/a/index.html#top") == "http://example.com/a"
+    assert canonicalizer.canonicalize("https://example.com:8443/b/") == "https://example.com:8443/b"
+    assert canonicalizer.canonicalize("https://example.com") == "https://example.com/"
+
+
+def test_canonicalize_sorts_query_and_strips_tracking_params():
+    canonicalizer = UrlCanonicalizer()
+    url = "https://example.com/p?utm_source=x&b=2&fbclid=y&a=1"
+    assert canonicalizer.canonicalize(url) == "https://example.com/p?a=1&b=2"
+
+
+@pytest.mark.parametrize("url", ["http://host:99999/", "http://h:abc/", "http://[::1/x"])
+def test_canonicalize_rejects_malformed_urls(url):
+    with pytest.raises(ValueError):
+        UrlCanonicalizer().canonicalize(url)
+
+
+def test_extract_resolves_relative_links_against_base_href(extractor):
+    html = '<base href="/docs/"><a href="guide.html">g</a><a href="#frag">f</a><a href="mailto:x@y">m</a>'
+    assert extractor.extract(html, "https://example.com/start") == ["https://example.com/docs/guide.html"]
+
+
+def test_extract_skips_comments_scripts_assets_and_other_hosts(extractor):
+    html = (
+        '<!-- <a href="/commented">c</a> -->'
+        '<script>var s = "<a href=/scripted>";</script>'
+        '<link rel="stylesheet" href="/site.css"><link rel="next" href="/page2">'
+        '<a href="https://other.example.org/x">o</a><a href="/logo.png">i</a><a href="/kept">k</a>'
+    )
+    assert extractor.extract(html, "https://example.com/") == [
+        "https://example.com/page2", "https://example.com/kept"
+    ]
+
+
+def test_extract_deduplicates_in_document_order(extractor):
+    html = '<a href="/b">1</a><a href="/a">2</a><a href="/b/">3</a><a href="/b?utm_medium=x">4</a>'
+    assert extractor.extract(html, "https://example.com/") == ["https://example.com/b", "https://example.com/a"]
+
+
+def test_extract_quoted_values_may_contain_angle_brackets(extractor):
+    html = '<a title="a > b" href="/q">q</a>'
+    assert extractor.extract(html, "https://example.com/") == ["https://example.com/q"]
+
+
+def test_extract_stray_apostrophe_in_unquoted_attribute(extractor):
+    # Regression: the apostrophe used to make the tag pattern backtrack exponentially and drop the link
+    html = "<a href=/camp title=Joe's>Camp</a> <p>Don't miss it</p> <a href='/next'>next</a>"
+    assert extractor.extract(html, "https://example.com/") == [
+        "https://example.com/camp", "https://example.com/next"
+    ]
+
+
+def test_extract_unclosed_tag_with_stray_quotes_fails_fast(extractor):
+    html = "<a title=Joe's " + "x='y " * 200 + "href=/long"
+    start = time.perf_counter()
+    assert extractor.extract(html, "https://example.com/") == []
+    assert time.perf_counter() - start < 1.0
+
+
+def test_extract_skips_malformed_hrefs_but_keeps_the_rest_of_the_page(extractor):
+    html = '<a href="http://host:99999/">a</a><a href="http://h:abc/">b</a><a href="/ok">ok</a>'
+    assert extractor.extract(html, "https://example.com/") == ["https://example.com/ok"]
+
+
+@pytest.mark.parametrize("page_url", ["https://ex.com/programs/", "https://ex.com/programs/index.html"])
+def test_extract_resolves_relative_links_of_directory_pages(extractor, page_url):
+    # Regression: the crawler fetched and resolved links against canonical URLs, and
+    # https://ex.com/programs (no slash) moves every relative link one directory up
+    html = '<a href="swim.html">Swim</a><a href="../about/">About</a><a href="./">Self</a>'
+    assert extractor.extract(html, page_url) == [
+        "https://ex.com/programs/swim.html", "https://ex.com/about/", "https://ex.com/programs/"
+    ]
+
+
+def test_extract_returns_fetchable_spellings_deduplicated_by_canonical_form(extractor):
+    html = '<a href="/camp/#top">1</a><a href="/camp/index.html">2</a><a href="/camp">3</a>'
+    canonicalizer = extractor.canonicalizer
+    links = extractor.extract(html, "https://ex.com/")
+    assert links == ["https://ex.com/camp/"]
+    assert canonicalizer.canonicalize(links[0]) == "https://ex.com/camp"
@@ -0,0 +1,53 @@
+import io
+
+from sitemap import DEFAULT_PRIORITY, iter_sitemap, parse_lastmod, parse_priority
+
+
+def parse(xml):
+    return list(iter_sitemap(io.BytesIO(xml.encode('utf-8'))))
+
+
+def test_image_and_video_extensions_do_not_replace_the_page_loc():
+    # Regression: Yoast/WordPress image sitemaps seeded the frontier with the image URL
+    xml = (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+        ' xmlns:image="http://www.google.com/schemas/sitemap-image/1.1"'
+        ' xmlns:video="http://www.google.com/schemas/sitemap-video/1.1">'
+        '<url><loc>https://ex.com/camp/</loc><lastmod>2024-01-01</lastmod>'
+        '<image:image><image:loc>https://ex.com/wp-content/uploads/pic.jpg</image:loc></image:image></url>'
+        '<url><loc>https://ex.com/tour/</loc><priority>0.8</priority>'
+        '<video:video><video:content_loc>https://ex.com/tour.mp4</video:content_loc>'
+        '<video:loc>https://ex.com/tour-video</video:loc></video:video></url>'
+        '</urlset>'
+    )
+    assert parse(xml) == [
+        ('url', 'https://ex.com/camp/', None, '2024-01-01'),
+        ('url', 'https://ex.com/tour/', '0.8', None)
+    ]
+
+
+def test_extension_loc_directly_under_url_is_ignored():
+    xml = (
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9" xmlns:x="urn:example">'
+        '<url><loc>https://ex.com/page</loc><x:loc>https://ex.com/other</x:loc></url></urlset>'
+    )
+    assert parse(xml) == [('url', 'https://ex.com/page', None, None)]
+
+
+def test_sitemap_index_and_unnamespaced_sitemaps():
+    index = (
+        '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+        '<sitemap><loc>https://ex.com/post-sitemap.xml</loc><lastmod>2024-05</lastmod></sitemap>'
+        '<sitemap><loc> </loc></sitemap></sitemapindex>'
+    )
+    assert parse(index) == [('sitemap', 'https://ex.com/post-sitemap.xml', None, '2024-05')]
+    assert parse('<urlset><url><loc>https://ex.com/a</loc></url></urlset>') == [('url', 'https://ex.com/a', None, None)]
+
+
+def test_priority_and_lastmod_parsing():
+    assert parse_priority('0.9') == 0.9
+    assert parse_priority('7') == 1.0
+    assert parse_priority('high') == DEFAULT_PRIORITY
+    assert parse_lastmod('2024') == parse_lastmod('2024-01-01T00:00:00Z')
+    assert parse_lastmod('yesterday') is None
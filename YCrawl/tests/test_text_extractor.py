@@ -0,0 +1,61 @@
+from text_extractor import build_text_record, extract_main_content
+
+
+def test_prefers_main_content_and_drops_furniture_inside_it():
+    html = (
+        '<html lang="en"><head><title>Camp Page</title><meta name="description" content="Summer camp"></head>'
+        '<body><nav><a href="/">Home</a></nav><main><h1>Camp</h1><p>Registration opens in May.</p>'
+        '<div class="share">Share this</div></main><footer>Copyright</footer></body></html>'
+    )
+    content = extract_main_content(html)
+    assert content['title'] == 'Camp Page'
+    assert content['description'] == 'Summer camp'
+    assert content['lang'] == 'en'
+    assert content['text'] == '# Camp\n\nRegistration opens in May.'
+    assert content['headings'] == [{'level': 1, 'text': 'Camp'}]
+
+
+def test_body_without_main_drops_navigation_sidebars_and_scripts():
+    html = (
+        '<body><header>Site logo</header><div id="sidebar">Archive</div><script>var x = 1;</script>'
+        '<p>First paragraph.</p><p>Second paragraph.</p><div class="cookie-banner">Accept cookies</div></body>'
+    )
+    assert extract_main_content(html)['text'] == 'First paragraph.\n\nSecond paragraph.'
+
+
+def test_page_state_classes_on_body_are_not_boilerplate():
+    # Regression: WordPress puts no-sidebar on <body>, which used to empty the whole page
+    html = '<html class="menu-open"><body class="home page no-sidebar has-sidebar"><p>Welcome to camp.</p></body></html>'
+    assert extract_main_content(html)['text'] == 'Welcome to camp.'
+
+
+def test_class_tokens_match_whole_words_only():
+    html = '<body><div class="nav">Menu</div><div class="navigation-wrapper-custom">Kept text.</div></body>'
+    assert extract_main_content(html)['text'] == 'Kept text.'
+
+
+def test_furniture_wrapping_main_content_is_not_removed():
+    html = (
+        '<body><form id="aspnetForm"><div class="layout sidebar"><main><p>Inside main.</p>'
+        '<aside>Related</aside></main></div></form></body>'
+    )
+    assert extract_main_content(html)['text'] == 'Inside main.'
+
+
+def test_hidden_subtrees_stay_hidden_around_main():
+    html = '<body><noscript><main><p>Enable JavaScript</p></main></noscript><main><p>Visible.</p></main></body>'
+    assert extract_main_content(html)['text'] == 'Visible.'
+
+
+def test_link_heavy_blocks_and_their_headings_are_dropped():
+    html = (
+        '<body><p>Intro text for the page.</p><h2>See also</h2>'
+        '<ul><li><a href="/a">Link one</a> <a href="/b">Link two</a></li></ul></body>'
+    )
+    assert extract_main_content(html)['text'] == 'Intro text for the page.'
+
+
+def test_build_text_record_counts_words():
+    record = build_text_record('https://example.com/', 0, '<body><p>one two three</p></body>', 'abc')
+    assert record['word_count'] == 3
+    assert record['content_hash'] == 'abc'
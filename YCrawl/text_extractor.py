@@ -0,0 +1,302 @@
+"""
+Main-content text extraction for YCrawl
+Turns page HTML into clean text plus title and headings, and writes it as JSONL shards
+ready for RAG ingestion without an HTML -> PDF -> text round trip
+"""
+
+import json
+import re
+import threading
+import time
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+# Elements whose text is never page content
+SKIP_TAGS = {'script', 'style', 'noscript', 'template', 'svg', 'canvas', 'iframe', 'object', 'select', 'button'}
+
+# Page furniture: skipped wherever it appears, except around the main content
+BOILERPLATE_TAGS = {'nav', 'header', 'footer', 'aside', 'form', 'dialog'}
+BOILERPLATE_ROLES = {'navigation', 'banner', 'contentinfo', 'complementary', 'search', 'dialog', 'alert'}
+# Whole class/id tokens only: 'sidebar' is furniture, but 'no-sidebar' / 'has-sidebar' on <body>
+# (WordPress) or 'menu-open' are state classes of the whole page
+BOILERPLATE_NAMES = {
+    'nav', 'navbar', 'navigation', 'menu', 'breadcrumb', 'breadcrumbs', 'footer', 'masthead', 'sidebar',
+    'cookie', 'cookies', 'consent', 'gdpr', 'banner', 'social', 'share', 'sharing', 'newsletter', 'subscribe',
+    'popup', 'modal', 'related', 'advert', 'ad', 'ads', 'promo',
+    'site-header', 'site-footer', 'site-nav', 'site-navigation', 'main-nav', 'main-navigation', 'main-menu',
+    'nav-menu', 'top-nav', 'sub-nav', 'skip-link', 'skip-links', 'cookie-banner', 'cookie-notice',
+    'cookie-consent', 'social-links', 'share-buttons', 'related-posts'
+}
+
+# The page itself is never furniture, whatever classes it carries
+NEVER_BOILERPLATE_TAGS = {'html', 'body', 'main', 'article'}
+
+# Elements that end a block of text
+BLOCK_TAGS = {
+    'p', 'div', 'section', 'article', 'main', 'li', 'ul', 'ol', 'dl', 'dt', 'dd', 'table', 'tr', 'td', 'th',
+    'blockquote', 'pre', 'figure', 'figcaption', 'br', 'hr', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+    'address', 'details', 'summary', 'caption'
+}
+HEADING_TAGS = {'h1': 1, 'h2': 2, 'h3': 3, 'h4': 4, 'h5': 5, 'h6': 6}
+VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'track', 'wbr'}
+
+_MAIN_CONTENT = re.compile(r'<main\b|<article\b|role\s*=\s*["\']?main', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+
+# Blocks mostly made of link text (menus, tag clouds, "see also" lists) are dropped
+MAX_LINK_DENSITY = 0.5
+
+
+class _ContentParser(HTMLParser):
+    """Collects text blocks, headings and metadata while skipping boilerplate subtrees"""
+
+    def __init__(self, main_only: bool):
+        super().__init__(convert_charrefs=True)
+        self.main_only = main_only
+        self.stack: List[tuple] = []
+        # Open elements skipped as furniture (suspended inside main content) / whose text is never content
+        self.skip_depth = 0
+        self.hard_skip_depth = 0
+        self.main_depth = 0
+        self.link_depth = 0
+        self.title_parts: List[str] = []
+        self.in_title = False
+        self.meta: Dict[str, str] = {}
+        self.lang: Optional[str] = None
+        self.blocks: List[Dict] = []
+        self._text: List[str] = []
+        self._link_chars = 0
+        self._heading_level: Optional[int] = None
+
+    def _skip_kind(self, tag: str, attrs: Dict[str, str]) -> Optional[str]:
+        """'hard' for elements whose text is never content, 'furniture' for page furniture, else None"""
+        if tag in SKIP_TAGS or 'hidden' in attrs or attrs.get('aria-hidden') == 'true':
+            return 'hard'
+        if tag in NEVER_BOILERPLATE_TAGS:
+            return None
+        # An <article>'s own <header> holds its title, not site furniture
+        if tag in BOILERPLATE_TAGS and not (tag == 'header' and self.main_depth):
+            return 'furniture'
+        if attrs.get('role', '').lower() in BOILERPLATE_ROLES:
+            return 'furniture'
+        names = f"{attrs.get('id', '')} {attrs.get('class', '')}".lower().split()
+        return 'furniture' if any(name in BOILERPLATE_NAMES for name in names) else None
+
+    def _flush(self):
+        text = _WHITESPACE.sub(' ', ''.join(self._text)).strip()
+        if text:
+            self.blocks.append({'text': text, 'heading': self._heading_level, 'link_chars': self._link_chars})
+        self._text = []
+        self._link_chars = 0
+
+    def handle_starttag(self, tag, attrs):
+        attrs = {name: value or '' for name, value in attrs}
+        if tag == 'html' and attrs.get('lang'):
+            self.lang = attrs['lang']
+        elif tag == 'title':
+            self.in_title = True
+        elif tag == 'meta':
+            key = (attrs.get('name') or attrs.get('property') or '').lower()
+            if key in ('description', 'og:title', 'og:description', 'keywords'):
+                self.meta[key] = attrs.get('content', '')
+
+        if tag in VOID_TAGS:
+            if tag == 'br' and not self.skip_depth and not self.hard_skip_depth:
+                self._text.append(' ')
+            return
+
+        is_main = tag in ('main', 'article') or attrs.get('role', '').lower() == 'main'
+        skip = None
+        if not is_main and not self.hard_skip_depth:
+            skip = self._skip_kind(tag, attrs)
+            if skip == 'furniture' and self.skip_depth:
+                skip = None
+        # Main content inside a wrapper that looked like furniture (an ASP.NET <form>, a
+        # <div class="sidebar-layout">) is still content: its ancestors' skipping is suspended
+        self.stack.append((tag, skip, is_main, self.skip_depth if is_main else 0))
+        if skip == 'hard':
+            self.hard_skip_depth += 1
+        elif skip:
+            self.skip_depth += 1
+        if is_main:
+            self.main_depth += 1
+            self.skip_depth = 0
+        if tag in BLOCK_TAGS:
+            self._flush()
+            if tag in HEADING_TAGS:
+                self._heading_level = HEADING_TAGS[tag]
+        if tag == 'a':
+            self.link_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag == 'title':
+            self.in_title = False
+        if tag in VOID_TAGS or not any(entry[0] == tag for entry in self.stack):
+            return
+        # Close everything up to the matching tag (browsers tolerate unclosed <p>, <li>, ...)
+        while self.stack:
+            open_tag, skip, is_main, outer_skip_depth = self.stack.pop()
+            if open_tag in BLOCK_TAGS:
+                self._flush()
+                if open_tag in HEADING_TAGS:
+                    self._heading_level = None
+            if open_tag == 'a':
+                self.link_depth = max(0, self.link_depth - 1)
+            if skip == 'hard':
+                self.hard_skip_depth -= 1
+            elif skip:
+                self.skip_depth -= 1
+            if is_main:
+                self.main_depth -= 1
+                self.skip_depth = outer_skip_depth
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        if self.in_title:
+            self.title_parts.append(data)
+            return
+        if self.skip_depth or self.hard_skip_depth or (self.main_only and not self.main_depth):
+            return
+        self._text.append(data)
+        if self.link_depth:
+            self._link_chars += len(data.strip())
+
+    def close(self):
+        super().close()
+        self._flush()
+
+
+def extract_main_content(html: str) -> Dict:
+    """
+    Extract the readable content of a page
+
+    Text inside <main>/<article> (or role="main") is used when the page has it;
+    otherwise the whole body minus navigation, headers, footers, sidebars,
+    cookie banners and link-heavy blocks.
+
+    Returns:
+        Dict with title, description, lang, headings ([{'level', 'text'}]) and text
+        (blocks separated by blank lines; headings as markdown-style '#' lines)
+    """
+    parser = _ContentParser(main_only=_MAIN_CONTENT.search(html) is not None)
+    parser.feed(html)
+    parser.close()
+
+    blocks = parser.blocks
+    removed = [block['heading'] is None and block['link_chars'] / len(block['text']) > MAX_LINK_DENSITY
+               for block in blocks]
+
+    # A heading needs content right under it (text or a deeper heading); headings of removed link lists go too
+    kept = []
+    for index, block in enumerate(blocks):
+        if removed[index]:
+            continue
+        level = block['heading']
+        if level is not None:
+            following = blocks[index + 1] if index + 1 < len(blocks) else None
+            if (following is None or removed[index + 1]
+                    or (following['heading'] is not None and following['heading'] <= level)):
+                continue
+        kept.append(block)
+
+    title = _WHITESPACE.sub(' ', ''.join(parser.title_parts)).strip() or parser.meta.get('og:title', '')
+    if not title:
+        title = next((block['text'] for block in parser.blocks if block['heading'] == 1), '')
+    return {
+        'title': title,
+        'description': parser.meta.get('description') or parser.meta.get('og:description', ''),
+        'lang': parser.lang,
+        'headings': [{'level': block['heading'], 'text': block['text']} for block in kept if block['heading']],
+        'text': '\n\n'.join(('#' * block['heading'] + ' ' if block['heading'] else '') + block['text']
+                            for block in kept)
+    }
+
+
+class TextShardWriter:
+    """Writes one JSON line per page into numbered shard files (pages-00000.jsonl, ...)"""
+
+    def __init__(self, text_dir: Path, shard_size: int = 1000, append: bool = False):
+        """
+        Open the shard directory
+
+        Args:
+            text_dir: Directory holding the shards
+            shard_size: Records per shard before a new shard is started
+            append: Keep existing shards and continue numbering after them; otherwise they are removed
+        """
+        self.text_dir = Path(text_dir)
+        self.text_dir.mkdir(parents=True, exist_ok=True)
+        self.shard_size = max(1, shard_size)
+        self._lock = threading.Lock()
+        existing = sorted(self.text_dir.glob('pages-*.jsonl'))
+        if not append:
+            for shard in existing:
+                shard.unlink()
+            existing = []
+        # Never append to an old shard: it may end in a line torn by a crash
+        self._next_index = int(existing[-1].stem.split('-')[1]) + 1 if existing else 0
+        self._file = None
+        self._records_in_shard = 0
+        self.current_shard: Optional[Path] = None
+        self.records_written = 0
+
+    def _open_next_locked(self):
+        if self._file is not None:
+            self._file.close()
+        self.current_shard = self.text_dir / f"pages-{self._next_index:05d}.jsonl"
+        self._next_index += 1
+        self._file = open(self.current_shard, 'w', encoding='utf-8')
+        self._records_in_shard = 0
+
+    def write(self, record: Dict) -> str:
+        """
+        Append a page record
+
+        Returns:
+            Name of the shard the record went to, relative to the output directory
+        """
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            if self._file is None or self._records_in_shard >= self.shard_size:
+                self._open_next_locked()
+            self._file.write(line + '\n')
+            self._file.flush()
+            self._records_in_shard += 1
+            self.records_written += 1
+            return f"{self.text_dir.name}/{self.current_shard.name}"
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def build_text_record(url: str, depth: int, html: str, content_hash: str) -> Dict:
+    """JSONL record for one page: extracted content plus crawl metadata"""
+    content = extract_main_content(html)
+    return {
+        'url': url,
+        'title': content['title'],
+        'description': content['description'],
+        'lang': content['lang'],
+        'depth': depth,
+        'headings': content['headings'],
+        'text': content['text'],
+        'word_count': len(content['text'].split()),
+        'content_hash': content_hash,
+        'crawled_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+    }
+
+
+def iter_text_records(text_dir: Path) -> Iterator[Dict]:
+    """Stream page records from every shard in order, skipping torn lines"""
+    for shard in sorted(Path(text_dir).glob('pages-*.jsonl')):
+        with open(shard, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
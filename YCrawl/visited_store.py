@@ -0,0 +1,189 @@
+"""
+Visited-URL set backends for YCrawl
+Exact in-memory set, scalable Bloom filter, or an on-disk hash index for crawls of millions of URLs
+"""
+
+import hashlib
+import math
+import sqlite3
+import threading
+from pathlib import Path
+from typing import List
+
+VISITED_BACKENDS = ('memory', 'bloom', 'disk')
+
+
+class MemoryVisitedSet:
+    """Exact set of full URL strings (fast, but memory grows with URL length)"""
+
+    def __init__(self):
+        self._urls = set()
+
+    def add(self, url: str) -> bool:
+        """Add a URL; returns False if it was already present"""
+        if url in self._urls:
+            return False
+        self._urls.add(url)
+        return True
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._urls
+
+    def __len__(self) -> int:
+        return len(self._urls)
+
+    def close(self):
+        pass
+
+
+class _BloomFilter:
+    """Fixed-size Bloom filter using double hashing over a 128-bit BLAKE2b digest"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, h1: int, h2: int) -> List[int]:
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def contains(self, h1: int, h2: int) -> bool:
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(h1, h2))
+
+    def add(self, h1: int, h2: int):
+        for p in self._positions(h1, h2):
+            self.bits[p >> 3] |= 1 << (p & 7)
+        self.count += 1
+
+
+class BloomVisitedSet:
+    """
+    Scalable Bloom filter: a chain of filters, each twice as large and with a
+    tighter error rate than the last, so the overall false-positive rate stays
+    under error_rate however many URLs are added
+
+    A false positive makes the crawler treat an unseen URL as visited and skip
+    it; URLs are never reported unseen once added.
+    """
+
+    GROWTH = 2
+    TIGHTENING = 0.5
+
+    def __init__(self, error_rate: float = 0.001, initial_capacity: int = 100000):
+        self.error_rate = error_rate
+        self.initial_capacity = max(1000, initial_capacity)
+        self._filters: List[_BloomFilter] = []
+        self._count = 0
+        self._lock = threading.Lock()
+        self._add_filter()
+
+    def _add_filter(self):
+        index = len(self._filters)
+        capacity = self.initial_capacity * (self.GROWTH ** index)
+        # Error budget per filter: e * (1 - r) * r^i sums to at most e
+        error = self.error_rate * (1 - self.TIGHTENING) * (self.TIGHTENING ** index)
+        self._filters.append(_BloomFilter(capacity, error))
+
+    @staticmethod
+    def _hashes(url: str):
+        digest = hashlib.blake2b(url.encode('utf-8'), digest_size=16).digest()
+        return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+
+    def add(self, url: str) -> bool:
+        """Add a URL; returns False if it was (probably) already present"""
+        h1, h2 = self._hashes(url)
+        with self._lock:
+            if any(f.contains(h1, h2) for f in self._filters):
+                return False
+            current = self._filters[-1]
+            if current.count >= current.capacity:
+                self._add_filter()
+                current = self._filters[-1]
+            current.add(h1, h2)
+            self._count += 1
+            return True
+
+    def __contains__(self, url: str) -> bool:
+        h1, h2 = self._hashes(url)
+        return any(f.contains(h1, h2) for f in self._filters)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def memory_bytes(self) -> int:
+        return sum(len(f.bits) for f in self._filters)
+
+    def close(self):
+        pass
+
+
+class DiskVisitedSet:
+    """Exact set of 64-bit URL hashes kept in an SQLite table on disk"""
+
+    def __init__(self, db_path: Path, table: str = 'visited', commit_every: int = 1000):
+        self.table = table
+        self.commit_every = commit_every
+        self._pending = 0
+        self._count = 0
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(str(db_path), check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=OFF")
+        # The index is rebuilt from the crawl state on every run, never reused
+        self.connection.execute(f"DROP TABLE IF EXISTS {table}")
+        self.connection.execute(f"CREATE TABLE {table} (h INTEGER PRIMARY KEY) WITHOUT ROWID")
+        self.connection.commit()
+
+    @staticmethod
+    def _hash(url: str) -> int:
+        digest = hashlib.blake2b(url.encode('utf-8'), digest_size=8).digest()
+        return int.from_bytes(digest, 'little', signed=True)
+
+    def add(self, url: str) -> bool:
+        """Add a URL; returns False if it was already present"""
+        with self._lock:
+            cursor = self.connection.execute(f"INSERT OR IGNORE INTO {self.table} (h) VALUES (?)", (self._hash(url),))
+            if cursor.rowcount == 0:
+                return False
+            self._count += 1
+            self._pending += 1
+            if self._pending >= self.commit_every:
+                self.connection.commit()
+                self._pending = 0
+            return True
+
+    def __contains__(self, url: str) -> bool:
+        with self._lock:
+            row = self.connection.execute(f"SELECT 1 FROM {self.table} WHERE h = ?", (self._hash(url),)).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def close(self):
+        with self._lock:
+            self.connection.commit()
+            self.connection.close()
+
+
+def create_visited_set(backend: str, db_path: Path = None, table: str = 'visited',
+                       error_rate: float = 0.001, initial_capacity: int = 100000):
+    """
+    Build a visited-URL set
+
+    Args:
+        backend: 'memory', 'bloom' or 'disk'
+        db_path: SQLite file for the disk backend
+        table: Table name for the disk backend (lets several sets share one file)
+        error_rate: Target false-positive rate for the bloom backend
+        initial_capacity: URLs the first bloom filter is sized for
+    """
+    if backend == 'memory':
+        return MemoryVisitedSet()
+    if backend == 'bloom':
+        return BloomVisitedSet(error_rate=error_rate, initial_capacity=initial_capacity)
+    if backend == 'disk':
+        return DiskVisitedSet(db_path, table=table)
+    raise ValueError(f"Unknown visited backend '{backend}', expected one of {', '.join(VISITED_BACKENDS)}")
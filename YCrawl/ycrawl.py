@@ -5,40 +5,60 @@ Downloads all pages from a given URL as HTML files and PDFs
 """
 
 import os
+import hashlib
 import sys
 import argparse
 import asyncio
-import aiofiles
-from urllib.parse import urljoin, urlparse
+import importlib.util
+from urllib.parse import urldefrag, urlparse
 from pathlib import Path
 import time
-from typing import Set, Dict, List
+import threading
+import heapq
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Tuple, Optional
 import json
 import requests
 
+from asset_cache import AssetCache
+from attachments import AttachmentDownloader
+from browser_pool import BrowserPool
+from content_store import ContentStore
+from crawl_report import CrawlReportWriter
+from crawl_state import CrawlStateStore
+from incremental import IncrementalIndex, normalized_html_hash
+from link_extractor import DEFAULT_TRACKING_PARAMS, LinkExtractor, UrlCanonicalizer
+from politeness import PolitenessScheduler, error_retry_after, error_status, response_status, response_url
+from render_pipeline import RenderStage, StageMeter, render_html_pdf
+from sitemap import DEFAULT_PRIORITY, SitemapReader
+from telemetry import MetricsServer, ProgressReporter, Telemetry, status_class
+from text_extractor import TextShardWriter, build_text_record
+from visited_store import VISITED_BACKENDS, MemoryVisitedSet, create_visited_set
+
 try:
     from firecrawl import FirecrawlApp
 except ImportError:
     print("Error: firecrawl package not found. Please install it with: pip install firecrawl")
     sys.exit(1)
 
-# Try to import PDF libraries, but don't fail if they're not available
+# Check for PDF libraries, but don't fail if they're not available
 PDFKIT_AVAILABLE = False
 WEASYPRINT_AVAILABLE = False
 PLAYWRIGHT_AVAILABLE = False
 
-try:
-    import pdfkit
+# render_pipeline imports pdfkit and browser_pool imports playwright when they render;
+# here we only check that they are installed
+if importlib.util.find_spec("pdfkit") is not None:
     PDFKIT_AVAILABLE = True
     print("✓ pdfkit available for PDF generation")
-except ImportError:
+else:
     print("⚠ pdfkit not available. Install with: pip install pdfkit")
 
-try:
-    from playwright.sync_api import sync_playwright
+if importlib.util.find_spec("playwright") is not None:
     PLAYWRIGHT_AVAILABLE = True
     print("✓ playwright available for PDF generation")
-except ImportError:
+else:
     print("⚠ playwright not available. Install with: pip install playwright && playwright install")
 
 # Don't import WeasyPrint at module level to avoid crashes
@@ -82,7 +102,41 @@ class ConfigManager:
             "wait_for_network_idle": True,
             "include_screenshots": False,
             "include_pdf": False,
-            "include_metadata": True
+            "include_metadata": True,
+            "concurrency": 8,
+            "per_host_concurrency": 4,
+            "pdf_browser_pool_size": 4,
+            "pdf_browser_recycle_after": 50,
+            "pdf_render_mode": "content",
+            "asset_cache_dir": None,
+            "checkpoint_interval": 5,
+            "incremental": False,
+            "attachment_workers": 4,
+            "strip_query_params": None,
+            "strip_trailing_slash": True,
+            "requests_per_second": 4.0,
+            "burst": 8,
+            "respect_robots_txt": True,
+            "user_agent": "YCrawl",
+            "max_retries": 3,
+            "max_backoff": 120,
+            "visited_backend": "memory",
+            "bloom_error_rate": 0.001,
+            "bloom_initial_capacity": 100000,
+            "content_addressed_output": True,
+            "detect_near_duplicates": True,
+            "near_duplicate_distance": 3,
+            "render_workers": None,
+            "render_queue_size": 32,
+            "output_format": "pdf",
+            "text_shard_size": 1000,
+            "use_sitemaps": True,
+            "sitemap_urls": [],
+            "sitemap_max_urls": 100000,
+            "max_pages": None,
+            "progress_interval": 10,
+            "metrics_file": None,
+            "metrics_port": None
         }
     
     def save_config(self, config: Dict = None):
@@ -111,8 +165,58 @@ class ConfigManager:
         print(f"API key updated in {self.config_file}")
 
 
+class CrawlFrontier:
+    """
+    URL frontier that hands out each URL at most once, most valuable first
+    
+    URLs are ordered by sitemap priority, then sitemap lastmod (newest first),
+    then link depth. Links found on pages carry the default priority and no
+    lastmod, so without a sitemap the order is plain breadth-first.
+    """
+    
+    def __init__(self, seen=None, key: Callable[[str], str] = None):
+        """
+        Args:
+            seen: Visited-set backend recording every URL ever queued (default: in-memory set)
+            key: Maps a URL to the form recorded in seen (default: the URL itself), e.g. its canonical form
+        """
+        self.heap: List[tuple] = []
+        self._order = itertools.count()
+        self.seen = seen if seen is not None else MemoryVisitedSet()
+        self.key = key or (lambda url: url)
+    
+    def push(self, url: str, depth: int, priority: float = None, lastmod: float = None) -> bool:
+        """Queue a URL unless it (or another spelling with the same key) has already been queued"""
+        if not self.seen.add(self.key(url)):
+            return False
+        self.requeue(url, depth, priority, lastmod)
+        return True
+    
+    def requeue(self, url: str, depth: int, priority: float = None, lastmod: float = None):
+        """Queue a URL without consulting the seen set (used when restoring a saved crawl)"""
+        priority = DEFAULT_PRIORITY if priority is None else priority
+        heapq.heappush(self.heap, (-priority, -(lastmod or 0.0), depth, next(self._order), url))
+    
+    def pop(self) -> Tuple[str, int]:
+        """Take the next (url, depth) pair in priority order"""
+        _, _, depth, _, url = heapq.heappop(self.heap)
+        return url, depth
+    
+    def __len__(self) -> int:
+        return len(self.heap)
+
+
+OUTPUT_FORMATS = ('pdf', 'text', 'both')
+# Linked files with these extensions are downloaded as attachments instead of crawled
+FILE_EXTENSIONS = ('.txt', '.doc', '.docx', '.xls', '.xlsx', '.pdf')
+
+
 class YCrawl:
-    def __init__(self, api_key: str = None, output_dir: str = None, max_depth: int = None, config_file: str = "config.json"):
+    def __init__(self, api_key: str = None, output_dir: str = None, max_depth: int = None, config_file: str = "config.json",
+                 concurrency: int = None, per_host_concurrency: int = None, incremental: bool = None,
+                 visited_backend: str = None, render_workers: int = None, output_format: str = None,
+                 use_sitemaps: bool = None, max_pages: int = None, progress_interval: float = None,
+                 metrics_file: str = None, metrics_port: int = None):
         """
         Initialize YCrawl with Firecrawl configuration
         
@@ -121,6 +225,17 @@ class YCrawl:
             output_dir: Directory to save downloaded HTML files
             max_depth: Maximum depth for recursive crawling
             config_file: Path to configuration file
+            concurrency: Number of pages fetched in parallel
+            per_host_concurrency: Maximum parallel requests against a single host
+            incremental: Skip pages unchanged since the previous crawl report
+            visited_backend: How visited URLs are tracked: 'memory', 'bloom' or 'disk'
+            render_workers: Number of pages rendered to PDF in parallel (default: CPU count)
+            output_format: 'pdf', 'text' (JSONL shards of extracted main content) or 'both'
+            use_sitemaps: Seed the frontier from the site's sitemaps
+            max_pages: Page budget; the crawl stops after this many pages, taking the most valuable first
+            progress_interval: Seconds between progress lines (0 to disable)
+            metrics_file: File rewritten with Prometheus-format metrics while the crawl runs
+            metrics_port: Local port serving /metrics (Prometheus) and /progress (JSON)
         """
         # Load configuration
         self.config_manager = ConfigManager(config_file)
@@ -135,15 +250,92 @@ class YCrawl:
         self.output_dir.mkdir(exist_ok=True)
         
         self.max_depth = max_depth or self.config_manager.get("default_max_depth")
-        self.visited_urls: Set[str] = set()
-        self.url_to_filename: Dict[str, str] = {}
+        self.concurrency = max(1, concurrency or self.config_manager.get("concurrency", 8))
+        self.per_host_concurrency = max(1, per_host_concurrency or self.config_manager.get("per_host_concurrency", 4))
+        # URL sets are pluggable so million-page crawls need not keep every URL string in memory
+        self.visited_backend = visited_backend or self.config_manager.get("visited_backend", "memory")
+        self.visited_urls = self._create_visited_set('visited')
+        self.frontier_seen = self._create_visited_set('frontier')
+        # Per-URL records (validators, content hash, links) are streamed to the JSONL report
+        self.report_writer: Optional[CrawlReportWriter] = None
         self.crawl_stats = {
             'total_pages': 0,
             'successful_downloads': 0,
             'failed_downloads': 0,
+            'unchanged_pages': 0,
+            'robots_blocked': 0,
+            'retries': 0,
             'start_time': None,
             'end_time': None
         }
+        # download_page runs on worker threads, so counters are updated under a lock
+        self._stats_lock = threading.Lock()
+        # Stage timers, histograms and error classes behind the progress line and metrics export
+        self.telemetry = Telemetry(progress_source=self._progress_snapshot)
+        self.progress_reporter: Optional[ProgressReporter] = None
+        self.metrics_server: Optional[MetricsServer] = None
+        self.browser_pool: Optional[BrowserPool] = None
+        # Fetching and rendering are separate pipeline stages joined by a bounded queue
+        self.render_workers = max(1, render_workers or self.config_manager.get("render_workers")
+                                  or os.cpu_count() or 4)
+        self.render_stage: Optional[RenderStage] = None
+        self.fetch_meter = StageMeter('fetch', self.concurrency)
+        self._fetch_local = threading.local()
+        self.state_store: Optional[CrawlStateStore] = None
+        # "text" writes extracted page text straight to JSONL shards, skipping the PDF round trip
+        self.output_format = output_format or self.config_manager.get("output_format", "pdf")
+        if self.output_format not in OUTPUT_FORMATS:
+            print(f"Warning: Unknown output format '{self.output_format}', using 'pdf'")
+            self.output_format = "pdf"
+        self.text_writer: Optional[TextShardWriter] = None
+        # Sitemaps seed the frontier so deep pages are found early; a page budget then takes the best ones first
+        self.use_sitemaps = (self.config_manager.get("use_sitemaps", True)
+                             if use_sitemaps is None else use_sitemaps)
+        self.max_pages = max_pages or self.config_manager.get("max_pages")
+        self.sitemap_reader: Optional[SitemapReader] = None
+        self.progress_interval = (self.config_manager.get("progress_interval", 10)
+                                  if progress_interval is None else progress_interval)
+        self.metrics_file = metrics_file or self.config_manager.get("metrics_file")
+        self.metrics_port = metrics_port or self.config_manager.get("metrics_port")
+        self.link_extractor = LinkExtractor(UrlCanonicalizer(
+            strip_params=self.config_manager.get("strip_query_params") or DEFAULT_TRACKING_PARAMS,
+            strip_trailing_slash=self.config_manager.get("strip_trailing_slash", True)
+        ))
+        self.http = requests.Session()
+        self.http.headers['User-Agent'] = self.config_manager.get("user_agent", "YCrawl")
+        self.scheduler = PolitenessScheduler(
+            self.http,
+            user_agent=self.config_manager.get("user_agent", "YCrawl"),
+            requests_per_second=self.config_manager.get("requests_per_second", 4.0),
+            burst=self.config_manager.get("burst", 8),
+            respect_robots=self.config_manager.get("respect_robots_txt", True),
+            max_backoff=self.config_manager.get("max_backoff", 120)
+        )
+        self.max_retries = self.config_manager.get("max_retries", 3)
+        # PDFs and attachments are stored once per distinct content, named by hash
+        self.content_store: Optional[ContentStore] = None
+        if self.config_manager.get("content_addressed_output", True):
+            self.content_store = ContentStore(
+                self.output_dir,
+                near_duplicate_distance=self.config_manager.get("near_duplicate_distance", 3),
+                detect_near_duplicates=self.config_manager.get("detect_near_duplicates", True)
+            )
+        self.attachments = AttachmentDownloader(
+            self.output_dir,
+            max_workers=self.config_manager.get("attachment_workers", 4),
+            scheduler=self.scheduler,
+            content_store=self.content_store,
+            telemetry=self.telemetry,
+            max_retries=self.max_retries
+        )
+        if incremental is None:
+            incremental = self.config_manager.get("incremental", False)
+        self.incremental: Optional[IncrementalIndex] = (
+            IncrementalIndex(self.output_dir / 'crawl_report.jsonl', self.http,
+                             legacy_report_path=self.output_dir / 'crawl_report.json') if incremental else None
+        )
+        # "content" renders PDFs from the HTML Firecrawl already returned; "navigate" re-fetches the page
+        self.render_from_html = self.config_manager.get("pdf_render_mode", "content") == "content"
         
         # Initialize Firecrawl client
         try:
@@ -164,9 +356,12 @@ class YCrawl:
         filename = path.replace('/', '_').replace('?', '_').replace('&', '_').replace('=', '_')
         filename = ''.join(c for c in filename if c.isalnum() or c in '._-')
         
-        # Ensure it's not too long
-        if len(filename) > 100:
-            filename = filename[:100]
+        # Ensure it's not too long; truncated names and query strings get a URL hash so distinct URLs never share a file
+        if len(filename) > 100 or parsed.query:
+            if filename.endswith('.html'):
+                filename = filename[:-len('.html')]
+            url_hash = hashlib.sha1(url.encode('utf-8')).hexdigest()[:10]
+            filename = f"{filename[:89]}-{url_hash}"
         
         # Add .html extension if not present
         if not filename.endswith('.html'):
@@ -174,22 +369,151 @@ class YCrawl:
         
         return filename
     
+    def _increment_stat(self, key: str, amount: int = 1):
+        """Thread-safe increment of a crawl_stats counter"""
+        with self._stats_lock:
+            self.crawl_stats[key] = self.crawl_stats.get(key, 0) + amount
+    
+    def _progress_snapshot(self) -> Dict:
+        """Page counts for the progress line and metrics: done, failed, queued and still to crawl"""
+        with self._stats_lock:
+            done = self.crawl_stats['successful_downloads']
+            failed = self.crawl_stats['failed_downloads']
+            started = self.crawl_stats['total_pages']
+        queued = self.fetch_meter.get_stats()['queue_depth']
+        remaining = queued
+        if self.max_pages is not None:
+            remaining = max(0, min(queued, self.max_pages - started))
+        return {'done': done, 'failed': failed, 'queued': queued, 'remaining': remaining}
+    
+    def get_browser_pool(self) -> BrowserPool:
+        """Return the shared PDF rendering pool, creating it on first use"""
+        with self._stats_lock:
+            if self.browser_pool is None:
+                asset_cache = None
+                if self.render_from_html:
+                    cache_dir = self.config_manager.get("asset_cache_dir") or self.output_dir / '.asset_cache'
+                    asset_cache = AssetCache(cache_dir)
+                self.browser_pool = BrowserPool(
+                    size=self.config_manager.get("pdf_browser_pool_size", 4),
+                    recycle_after=self.config_manager.get("pdf_browser_recycle_after", 50),
+                    asset_cache=asset_cache
+                )
+            return self.browser_pool
+    
+    def get_render_stage(self) -> RenderStage:
+        """Return the render stage of the pipeline, creating it on first use"""
+        with self._stats_lock:
+            if self.render_stage is None:
+                self.render_stage = RenderStage(
+                    self._render_page_job,
+                    workers=self.render_workers,
+                    queue_size=self.config_manager.get("render_queue_size", 32)
+                )
+            return self.render_stage
+    
+    def _create_visited_set(self, name: str):
+        """Build one URL set using the configured visited backend"""
+        return create_visited_set(
+            self.visited_backend,
+            db_path=self.output_dir / f'{name}_urls.db',
+            table=name,
+            error_rate=self.config_manager.get("bloom_error_rate", 0.001),
+            initial_capacity=self.config_manager.get("bloom_initial_capacity", 100000)
+        )
+    
+    def _record_page(self, url: str, depth: int, filename: str, content_hash: str,
+                     validators: Dict[str, Optional[str]], links: List[str]):
+        """Store the outcome of a finished page in the report and in the crawl state"""
+        if self.report_writer is not None:
+            self.report_writer.write_page(url, {
+                'filename': filename,
+                'depth': depth,
+                'etag': validators.get('etag'),
+                'last_modified': validators.get('last_modified'),
+                'content_hash': content_hash,
+                'links': links
+            })
+        self._increment_stat('successful_downloads')
+        if self.state_store is not None:
+            self.state_store.mark_done(
+                url, depth, filename, content_hash,
+                links=links if depth + 1 <= self.max_depth else None,
+                link_depth=depth + 1
+            )
+    
+    def _reuse_unchanged_page(self, url: str, depth: int, previous: Dict,
+                              validators: Dict[str, Optional[str]]) -> List[str]:
+        """Carry an unchanged page over from the previous crawl without rendering or re-extracting it"""
+        self._increment_stat('unchanged_pages')
+        self._record_page(url, depth, previous['filename'], previous.get('content_hash'),
+                          validators, previous['links'])
+        print(f"  = Unchanged, skipped: {url}")
+        return previous['links']
+    
+    def _previous_output_exists(self, previous: Dict) -> bool:
+        """Check that the file produced for a page on the previous run is still on disk"""
+        filename = previous.get('filename')
+        return bool(filename) and (filename == "no_file" or (self.output_dir / filename).exists())
+    
+    def _record_failure(self, url: str, depth: int, error, stage: str = 'scrape', error_kind: str = None):
+        """Count a failed page (by stage and error class) and checkpoint it so a resumed crawl retries it"""
+        self._increment_stat('failed_downloads')
+        self.telemetry.count_error(stage, error_kind or error)
+        if self.state_store is not None:
+            self.state_store.mark_failed(url, depth, str(error))
+    
     def download_file(self, file_url: str):
-        """Download a file and save it to the output directory"""
-        local_filename = file_url.split('/')[-1].split('?')[0]
-        local_path = self.output_dir / local_filename
-        if local_path.exists():
-            print(f"  ✓ File already downloaded: {local_filename}")
-            return
+        """Queue a linked file for download in the background; the crawl does not wait for it"""
+        self.attachments.submit(file_url)
+    
+    def scrape_with_backoff(self, url: str, params: Dict):
+        """
+        Scrape a page through Firecrawl, paced by the politeness scheduler
+        
+        429 and 5xx answers (from Firecrawl or reported for the origin page)
+        pause the host and are retried up to max_retries times.
+        """
+        attempt = 0
+        while True:
+            self.scheduler.acquire(url)
+            error = None
+            retry_after = None
+            try:
+                response = self.firecrawl.scrape_url(url=url, **params)
+                status = response_status(response)
+            except Exception as e:
+                error = e
+                response = None
+                status = error_status(e)
+                retry_after = error_retry_after(e)
+            
+            delay = self.scheduler.record_response(url, status, retry_after)
+            if delay is None:
+                break
+            if attempt >= self.max_retries:
+                if error is None:
+                    error = Exception(f"HTTP {status} after {attempt} retries")
+                break
+            attempt += 1
+            self._increment_stat('retries')
+            self.telemetry.count_retry(error if error is not None else status_class(status))
+            print(f"  ↻ HTTP {status} for {url}, retry {attempt}/{self.max_retries} in {delay:.1f}s")
+        
+        if error is not None:
+            raise error
+        return response
+    
+    def _fetch_page(self, url: str, depth: int) -> List[str]:
+        """Fetch stage: download_page, timed for the pipeline summary (waits on a full render queue excluded)"""
+        self._fetch_local.render_wait = 0.0
+        started = time.perf_counter()
         try:
-            with requests.get(file_url, stream=True, timeout=30) as r:
-                r.raise_for_status()
-                with open(local_path, 'wb') as f:
-                    for chunk in r.iter_content(chunk_size=8192):
-                        f.write(chunk)
-            print(f"  ✓ File downloaded: {local_filename}")
-        except Exception as e:
-            print(f"  ✗ Failed to download {file_url}: {e}")
+            return self.download_page(url, depth)
+        finally:
+            elapsed = time.perf_counter() - started - self._fetch_local.render_wait
+            self.fetch_meter.record_job(elapsed)
+            self.telemetry.observe('page_latency_seconds', elapsed)
     
     def download_page(self, url: str, depth: int = 0) -> List[str]:
         """
@@ -202,14 +526,28 @@ class YCrawl:
         Returns:
             List of URLs found on the page
         """
-        if depth > self.max_depth or url in self.visited_urls:
-            return []
+        with self._stats_lock:
+            if depth > self.max_depth or not self.visited_urls.add(self.url_key(url)):
+                return []
+            
+            self.crawl_stats['total_pages'] += 1
         
-        self.visited_urls.add(url)
-        self.crawl_stats['total_pages'] += 1
+        if not self.scheduler.is_allowed(url):
+            print(f"  ⊘ Disallowed by robots.txt: {url}")
+            self._increment_stat('robots_blocked')
+            return []
         
         print(f"[{depth}] Crawling: {url}")
         
+        # Incremental mode: ask the origin whether the page changed before scraping it
+        validators: Dict[str, Optional[str]] = {}
+        previous = self.incremental.get(url) if self.incremental else None
+        if self.incremental is not None:
+            self.scheduler.acquire(url)
+            not_modified, validators = self.incremental.check_not_modified(url)
+            if not_modified and self._previous_output_exists(previous):
+                return self._reuse_unchanged_page(url, depth, previous, validators)
+        
         try:
             # Use Firecrawl to get the page content
             # Set up parameters according to Firecrawl API
@@ -222,12 +560,18 @@ class YCrawl:
             # Remove None values
             params = {k: v for k, v in params.items() if v is not None}
             
-            response = self.firecrawl.scrape_url(
-                url=url,
-                **params
-            )
+            with self.telemetry.timer('scrape'):
+                response = self.scrape_with_backoff(url, params)
             
             if response and hasattr(response, 'html') and response.html:
+                self.telemetry.observe('page_size_bytes', len(response.html.encode('utf-8')))
+                content_hash = normalized_html_hash(response.html)
+                # No validators (or the server ignores them): fall back to comparing content
+                if (previous and previous.get('links') is not None
+                        and previous.get('content_hash') == content_hash
+                        and self._previous_output_exists(previous)):
+                    return self._reuse_unchanged_page(url, depth, previous, validators)
+                
                 # Save HTML content (skip this part)
                 # filename = self.sanitize_filename(url)
                 # filepath = self.output_dir / filename
@@ -235,137 +579,374 @@ class YCrawl:
                 # with open(filepath, 'w', encoding='utf-8') as f:
                 #     f.write(response.html)
                 
-                # Save as PDF if enabled
-                if self.config_manager.get("include_pdf", True):
-                    pdf_filename = self.sanitize_filename(url).rsplit('.', 1)[0] + '.pdf'
-                    pdf_filepath = self.output_dir / pdf_filename
-                    pdf_saved = False
-                    
-                    # Try playwright first (more reliable on macOS)
-                    if PLAYWRIGHT_AVAILABLE and not pdf_saved:
-                        try:
-                            with sync_playwright() as playwright:
-                                browser = playwright.chromium.launch()
-                                page = browser.new_page()
-                                page.goto(url)
-                                page.pdf(path=str(pdf_filepath))
-                                browser.close()
-                            print(f"  ✓ PDF saved: {pdf_filename}")
-                            pdf_saved = True
-                        except Exception as e:
-                            print(f"  ⚠ playwright failed: {e}")
-                    
-                    # Try pdfkit as fallback
-                    if PDFKIT_AVAILABLE and not pdf_saved:
-                        try:
-                            pdfkit.from_string(response.html, str(pdf_filepath))
-                            print(f"  ✓ PDF saved: {pdf_filename}")
-                            pdf_saved = True
-                        except Exception as e:
-                            print(f"  ⚠ pdfkit failed: {e}")
+                with self.telemetry.timer('extract'):
+                    # Extract links for further crawling, relative to where the page was actually served from
+                    links = self.extract_links(response.html, response_url(response, url))
+                    # Download files if they match certain extensions
+                    for link in links:
+                        if link.lower().endswith(FILE_EXTENSIONS):
+                            self.download_file(link)
+                    # Return only non-file links for further crawling
+                    crawl_links = [l for l in links if not l.lower().endswith(FILE_EXTENSIONS)]
                     
-                    # Try WeasyPrint as fallback (import only when needed)
-                    if not pdf_saved:
-                        try:
-                            from weasyprint import HTML
-                            HTML(string=response.html, base_url=url).write_pdf(str(pdf_filepath))
-                            print(f"  ✓ PDF saved: {pdf_filename}")
-                            pdf_saved = True
-                        except ImportError:
-                            print("  ⚠ WeasyPrint not available")
-                        except Exception as e:
-                            print(f"  ⚠ WeasyPrint failed: {e}")
-                    
-                    if not pdf_saved:
-                        print("  ✗ PDF not saved: All PDF libraries failed or unavailable")
-                        print("    Install playwright: pip install playwright && playwright install")
-                        print("    Or install wkhtmltopdf for pdfkit: download from wkhtmltopdf.org")
-                        print("    Or install WeasyPrint dependencies: brew install cairo pango gdk-pixbuf libffi")
+                    # Text output is extracted here in the fetch stage; it is cheap next to a PDF render
+                    text_shard = None
+                    if self.text_writer is not None:
+                        text_shard = self.text_writer.write(
+                            build_text_record(url, depth, response.html, content_hash))
                 
-                # Track the page as successfully processed (even without HTML file)
-                self.url_to_filename[url] = pdf_filename if self.config_manager.get("include_pdf", True) else "no_file"
-                self.crawl_stats['successful_downloads'] += 1
+                # Save as PDF if enabled: rendering happens in the render stage so this
+                # worker can move on to the next fetch; the page is recorded once its PDF is written
+                if self.output_format != "text" and self.config_manager.get("include_pdf", True):
+                    self._fetch_local.render_wait = self.get_render_stage().submit(
+                        (url, depth, response.html, content_hash, validators, crawl_links)
+                    )
+                else:
+                    # Track the page as successfully processed (under its text shard, or without a file)
+                    self._record_page(url, depth, text_shard or "no_file", content_hash, validators, crawl_links)
                 print(f"  ✓ Processed: {url}")
-                
-                # Extract links for further crawling
-                links = self.extract_links(response.html, url)
-                # Download files if they match certain extensions
-                file_exts = ('.txt', '.doc', '.docx', '.xls', '.xlsx', '.pdf')
-                for link in links:
-                    if link.lower().endswith(file_exts):
-                        self.download_file(link)
-                # Return only non-file links for further crawling
-                crawl_links = [l for l in links if not l.lower().endswith(file_exts)]
                 return crawl_links
             else:
                 print(f"  ✗ No HTML content received for {url}")
-                self.crawl_stats['failed_downloads'] += 1
+                self._record_failure(url, depth, "No HTML content received", error_kind='empty_response')
                 return []
                 
         except Exception as e:
             print(f"  ✗ Error downloading {url}: {e}")
-            self.crawl_stats['failed_downloads'] += 1
+            self._record_failure(url, depth, e)
             return []
     
+    def _render_page_job(self, job: Tuple):
+        """Render stage: write a fetched page's PDF, then record the page"""
+        url, depth, html, content_hash, validators, links = job
+        try:
+            with self.telemetry.timer('render'):
+                if self.content_store is not None:
+                    pdf_filename = self._save_pdf_deduplicated(url, html, content_hash)
+                else:
+                    pdf_filename = self.sanitize_filename(url).rsplit('.', 1)[0] + '.pdf'
+                    self._render_pdf(url, html, self.output_dir / pdf_filename)
+        except Exception as e:
+            print(f"  ✗ Error rendering {url}: {e}")
+            self._record_failure(url, depth, e, stage='render')
+            return
+        self._record_page(url, depth, pdf_filename, content_hash, validators, links)
+    
+    def _render_with_library(self, library: str, url: str, html: str,
+                             pdf_filepath: Path) -> Tuple[bool, Optional[str]]:
+        """Run pdfkit or WeasyPrint in the render process pool, keeping CPU-bound work off this process's GIL"""
+        future = self.get_render_stage().process_pool().submit(
+            render_html_pdf, library, html, url, str(pdf_filepath)
+        )
+        return future.result()
+    
+    def _render_pdf(self, url: str, html: str, pdf_filepath: Path) -> bool:
+        """Render a page to PDF with the browser pool, falling back to pdfkit and WeasyPrint"""
+        pdf_filename = pdf_filepath.name
+        pdf_saved = False
+        
+        # Try playwright first (more reliable on macOS), using the shared browser pool
+        if PLAYWRIGHT_AVAILABLE and not pdf_saved:
+            try:
+                self.get_browser_pool().render_pdf(
+                    url, str(pdf_filepath),
+                    html=html if self.render_from_html else None
+                )
+                print(f"  ✓ PDF saved: {pdf_filename}")
+                pdf_saved = True
+            except Exception as e:
+                print(f"  ⚠ playwright failed: {e}")
+        
+        # Try pdfkit as fallback
+        if PDFKIT_AVAILABLE and not pdf_saved:
+            try:
+                pdf_saved, error = self._render_with_library('pdfkit', url, html, pdf_filepath)
+                if pdf_saved:
+                    print(f"  ✓ PDF saved: {pdf_filename}")
+                else:
+                    print(f"  ⚠ pdfkit failed: {error}")
+            except Exception as e:
+                print(f"  ⚠ pdfkit failed: {e}")
+        
+        # Try WeasyPrint as fallback (imported only in the render process that needs it)
+        if not pdf_saved:
+            try:
+                pdf_saved, error = self._render_with_library('weasyprint', url, html, pdf_filepath)
+                if pdf_saved:
+                    print(f"  ✓ PDF saved: {pdf_filename}")
+                elif error == 'unavailable':
+                    print("  ⚠ WeasyPrint not available")
+                else:
+                    print(f"  ⚠ WeasyPrint failed: {error}")
+            except Exception as e:
+                print(f"  ⚠ WeasyPrint failed: {e}")
+        
+        if not pdf_saved:
+            self.telemetry.count_error('render', 'no_renderer')
+            print("  ✗ PDF not saved: All PDF libraries failed or unavailable")
+            print("    Install playwright: pip install playwright && playwright install")
+            print("    Or install wkhtmltopdf for pdfkit: download from wkhtmltopdf.org")
+            print("    Or install WeasyPrint dependencies: brew install cairo pango gdk-pixbuf libffi")
+        return pdf_saved
+    
+    def _save_pdf_deduplicated(self, url: str, html: str, content_hash: str) -> str:
+        """
+        Save a page PDF in the content store, reusing the PDF of an identical or
+        near-identical page instead of rendering when there is one
+        
+        Returns:
+            Output path of the PDF, relative to the output directory
+        """
+        path, duplicate, fingerprint = self.content_store.claim_page(content_hash, html)
+        if path is not None:
+            self.content_store.record_duplicate_page(url, path, duplicate)
+            print(f"  = {'Duplicate' if duplicate == 'exact' else 'Near-duplicate'} page, PDF reused: {path}")
+            return path
+        
+        path = self.content_store.blob_path(content_hash, '.pdf')
+        pdf_filepath = self.output_dir / path
+        pdf_filepath.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            saved = self._render_pdf(url, html, pdf_filepath)
+        except BaseException:
+            self.content_store.release_page(content_hash, fingerprint)
+            raise
+        if saved:
+            self.content_store.commit_page(url, content_hash, path, fingerprint)
+        else:
+            self.content_store.release_page(content_hash, fingerprint)
+        return path
+    
+    def url_key(self, url: str) -> str:
+        """Canonical form of a URL, the key the frontier, visited set and resume deduplicate on"""
+        try:
+            return self.link_extractor.canonicalizer.canonicalize(url)
+        except ValueError:
+            return url
+    
     def extract_links(self, html: str, base_url: str) -> List[str]:
-        """Extract all links from HTML content"""
-        import re
+        """
+        Extract same-domain links from HTML content
         
-        # Simple regex to extract href attributes
-        href_pattern = r'href=["\']([^"\']+)["\']'
-        links = re.findall(href_pattern, html)
+        Follows <a>, <area>, navigational <link> and <iframe>/<frame> references
+        and honours <base href>. base_url must be the URL the page was served from:
+        its canonical form may have lost a trailing slash or index file, which would
+        resolve relative links one directory too high. Returns one URL per canonical
+        form, so one page is never queued under several spellings.
+        """
+        return self.link_extractor.extract(html, base_url)
+    
+    def seed_from_sitemaps(self, frontier: CrawlFrontier, start_url: str):
+        """
+        Queue the pages listed in the site's sitemaps, one link away from the start URL
         
-        # Filter and normalize links
-        valid_links = []
-        base_domain = urlparse(base_url).netloc
+        Entries are streamed into the frontier with their sitemap priority and
+        lastmod; only URLs on the start URL's (canonical) host are kept.
+        """
+        canonicalizer = self.link_extractor.canonicalizer
+        start_host = canonicalizer.host(start_url)
         
-        for link in links:
-            # Skip anchors, javascript, mailto, etc.
-            if link.startswith(('#', 'javascript:', 'mailto:', 'tel:')):
-                continue
-            
-            # Make relative URLs absolute
-            absolute_url = urljoin(base_url, link)
-            
-            # Only include links from the same domain
-            if urlparse(absolute_url).netloc == base_domain:
-                valid_links.append(absolute_url)
+        def same_site(loc: str) -> Optional[str]:
+            try:
+                parsed = urlparse(canonicalizer.canonicalize(loc))
+            except ValueError:
+                return None
+            # Fetched as listed: the canonical form is only the frontier's deduplication key
+            return urldefrag(loc.strip())[0] if parsed.scheme in ('http', 'https') and parsed.netloc == start_host else None
         
-        return list(set(valid_links))  # Remove duplicates
+        self.sitemap_reader = SitemapReader(
+            self.http,
+            scheduler=self.scheduler,
+            max_urls=self.config_manager.get("sitemap_max_urls", 100000),
+            url_filter=same_site
+        )
+        sitemap_urls = self.sitemap_reader.discover(start_url, self.config_manager.get("sitemap_urls") or [])
+        seeded = 0
+        batch = []
+        for entry in self.sitemap_reader.iter_entries(sitemap_urls):
+            if entry.url.lower().endswith(FILE_EXTENSIONS):
+                self.download_file(entry.url)
+                continue
+            if not frontier.push(entry.url, 1, entry.priority, entry.lastmod):
+                continue
+            seeded += 1
+            batch.append((entry.url, 1, entry.priority, entry.lastmod))
+            if len(batch) >= 1000 and self.state_store is not None:
+                self.state_store.enqueue(batch)
+                batch = []
+        if batch and self.state_store is not None:
+            self.state_store.enqueue(batch)
+        self.crawl_stats['sitemap_urls'] = seeded
+        print(f"Sitemap: {seeded} URLs queued from {self.sitemap_reader.get_stats()['sitemaps_read']} sitemaps")
     
-    def crawl_recursive(self, start_url: str, depth: int = 0):
+    def restore_state(self, frontier: CrawlFrontier):
+        """Stream a previous crawl from the state store into the visited set and the frontier"""
+        done = 0
+        for url, depth, status, priority, lastmod in self.state_store.iter_urls():
+            frontier.seen.add(self.url_key(url))
+            if status == CrawlStateStore.STATUS_DONE:
+                self.visited_urls.add(self.url_key(url))
+                done += 1
+            else:
+                frontier.requeue(url, depth, priority, lastmod)
+        self.crawl_stats['total_pages'] = done
+        self.crawl_stats['successful_downloads'] = done
+        print(f"Resuming: {done} pages already done, {len(frontier)} pages pending")
+    
+    async def crawl_async(self, start_url: str, resume: bool = False):
         """
-        Recursively crawl URLs starting from start_url
+        Breadth-first crawl driven by a pool of concurrent workers
+        
+        Each worker takes the next URL from the frontier and runs the blocking
+        download_page call on a thread, bounded by a per-host semaphore so a
+        single site never sees more than per_host_concurrency requests at once.
         
         Args:
             start_url: The URL to start crawling from
-            depth: Current crawl depth
+            resume: Continue the crawl saved in the state store instead of starting over
         """
-        if depth > self.max_depth:
-            return
+        # Workers block in download_page (throttling, Firecrawl, a full render queue); give each its own thread
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="crawl")
+        )
+        
+        frontier = CrawlFrontier(self.frontier_seen, key=self.url_key)
+        if resume and self.state_store is not None:
+            self.restore_state(frontier)
+        else:
+            # The start URL outranks every sitemap entry so its links are discovered early
+            frontier.push(start_url, 0, 1.0)
+            if self.state_store is not None:
+                self.state_store.reset(start_url)
+                self.state_store.enqueue([(start_url, 0, 1.0, None)])
+            if self.use_sitemaps and self.max_depth >= 1:
+                await asyncio.to_thread(self.seed_from_sitemaps, frontier, start_url)
+        host_limits: Dict[str, asyncio.Semaphore] = {}
+        condition = asyncio.Condition()
+        in_flight = 0
+        # Pages handed to workers count against max_pages, including those finished before a resume
+        dispatched = self.crawl_stats['total_pages']
         
-        # Download current page and get links
-        links = self.download_page(start_url, depth)
+        def budget_spent() -> bool:
+            return self.max_pages is not None and dispatched >= self.max_pages
         
-        # Recursively crawl found links
-        for link in links:
-            if link not in self.visited_urls:
-                self.crawl_recursive(link, depth + 1)
+        async def worker():
+            nonlocal in_flight, dispatched
+            while True:
+                async with condition:
+                    while not frontier and in_flight and not budget_spent():
+                        await condition.wait()
+                    if not frontier or budget_spent():
+                        condition.notify_all()
+                        return
+                    url, depth = frontier.pop()
+                    dispatched += 1
+                    in_flight += 1
+                
+                links: List[str] = []
+                try:
+                    host = urlparse(url).netloc
+                    if host not in host_limits:
+                        host_limits[host] = asyncio.Semaphore(self.per_host_concurrency)
+                    async with host_limits[host]:
+                        links = await asyncio.to_thread(self._fetch_page, url, depth)
+                except Exception as e:
+                    print(f"  ✗ Worker error on {url}: {e}")
+                finally:
+                    async with condition:
+                        if depth + 1 <= self.max_depth:
+                            for link in links:
+                                frontier.push(link, depth + 1)
+                        self.fetch_meter.observe_depth(len(frontier))
+                        in_flight -= 1
+                        condition.notify_all()
+        
+        self.fetch_meter.start()
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        self.fetch_meter.stop()
+        if budget_spent() and frontier:
+            print(f"⊘ Page budget of {self.max_pages} reached, {len(frontier)} queued pages not crawled "
+                  f"(raise --max-pages and use --resume to continue)")
     
-    def crawl(self, start_url: str):
-        """Main crawling method"""
+    def crawl(self, start_url: str, resume: bool = False):
+        """
+        Main crawling method
+        
+        Args:
+            start_url: The URL to start crawling from
+            resume: Continue an interrupted crawl from the state saved in the output directory
+        """
+        # Fetched as given (a directory URL keeps its trailing slash); raises ValueError if malformed
+        start_url = urldefrag(start_url.strip())[0]
+        self.link_extractor.canonicalizer.canonicalize(start_url)
         self.crawl_stats['start_time'] = time.time()
+        self.state_store = CrawlStateStore(
+            self.output_dir / 'crawl_state.db',
+            checkpoint_interval=self.config_manager.get("checkpoint_interval", 5)
+        )
+        if resume and not self.state_store.get_meta('start_url'):
+            print("No saved crawl state found, starting a new crawl")
+            resume = False
+        # A resumed crawl keeps the page records already streamed to the report
+        self.report_writer = CrawlReportWriter(self.output_dir / 'crawl_report.jsonl', append=resume)
+        if self.output_format in ('text', 'both'):
+            # Resumed and incremental crawls add new shards; unchanged pages keep their records in the old ones
+            self.text_writer = TextShardWriter(
+                self.output_dir / 'text',
+                shard_size=self.config_manager.get("text_shard_size", 1000),
+                append=resume or self.incremental is not None
+            )
         print(f"Starting crawl of: {start_url}")
         print(f"Output directory: {self.output_dir}")
         print(f"Max depth: {self.max_depth}")
+        print(f"Workers: {self.concurrency} (max {self.per_host_concurrency} per host)")
+        print(f"Visited set: {self.visited_backend}")
+        print(f"Output format: {self.output_format}")
+        if self.max_pages:
+            print(f"Page budget: {self.max_pages}")
         print(f"Config file: {self.config_manager.config_file}")
+        self.telemetry.start()
+        self.progress_reporter = ProgressReporter(
+            self.telemetry,
+            interval=self.progress_interval,
+            metrics_file=self.metrics_file
+        )
+        self.progress_reporter.start()
+        if self.metrics_port:
+            try:
+                self.metrics_server = MetricsServer(self.telemetry, self.metrics_port)
+                print(f"Metrics: {self.metrics_server.start()} (progress: /progress)")
+            except OSError as e:
+                print(f"  ⚠ Could not start metrics endpoint on port {self.metrics_port}: {e}")
+                self.metrics_server = None
         print("-" * 50)
         
-        self.crawl_recursive(start_url)
-        
-        self.crawl_stats['end_time'] = time.time()
-        self.print_summary()
-        self.save_crawl_report()
+        interrupted = False
+        try:
+            asyncio.run(self.crawl_async(start_url, resume=resume))
+        except KeyboardInterrupt:
+            interrupted = True
+            raise
+        finally:
+            # Let queued renders and attachments finish unless the user asked to stop
+            if self.render_stage is not None:
+                self.render_stage.close(cancel_pending=interrupted)
+            self.attachments.close(cancel_pending=interrupted)
+            if self.text_writer is not None:
+                self.text_writer.close()
+            if self.content_store is not None:
+                self.content_store.close()
+            if self.browser_pool is not None:
+                self.browser_pool.close()
+            self.state_store.close()
+            self.visited_urls.close()
+            self.frontier_seen.close()
+            self.crawl_stats['end_time'] = time.time()
+            self.progress_reporter.stop()
+            self.print_summary()
+            self.save_crawl_report()
+            if self.metrics_server is not None:
+                self.metrics_server.stop()
     
     def print_summary(self):
         """Print crawl summary"""
@@ -377,18 +958,92 @@ class YCrawl:
         print(f"Total pages processed: {self.crawl_stats['total_pages']}")
         print(f"Successful downloads: {self.crawl_stats['successful_downloads']}")
         print(f"Failed downloads: {self.crawl_stats['failed_downloads']}")
+        if self.incremental is not None:
+            print(f"Unchanged pages skipped: {self.crawl_stats['unchanged_pages']}")
+        scheduler_stats = self.scheduler.get_stats()
+        print(f"Blocked by robots.txt: {self.crawl_stats['robots_blocked']}, "
+              f"retries: {self.crawl_stats['retries']}, backoffs: {scheduler_stats['backoffs']}, "
+              f"throttle wait: {scheduler_stats['throttle_wait_time']:.1f}s")
         print(f"Duration: {duration:.2f} seconds")
+        attachment_stats = self.attachments.get_stats()
+        if attachment_stats['files_downloaded'] or attachment_stats['files_failed']:
+            print(f"Attachments downloaded: {attachment_stats['files_downloaded']} "
+                  f"({attachment_stats['bytes_downloaded'] / 1024 / 1024:.1f} MB, "
+                  f"{attachment_stats['bytes_per_second'] / 1024 / 1024:.2f} MB/s), "
+                  f"failed: {attachment_stats['files_failed']}, resumed: {attachment_stats['files_resumed']}")
+        fetch_stats = self.fetch_meter.get_stats()
+        print(f"Fetch stage: {fetch_stats['workers']} workers, {fetch_stats['utilization']:.0%} busy, "
+              f"frontier max {fetch_stats['max_queue_depth']}")
+        if self.render_stage is not None:
+            render_stats = self.render_stage.get_stats()
+            print(f"Render stage: {render_stats['workers']} workers, {render_stats['utilization']:.0%} busy, "
+                  f"queue max {render_stats['max_queue_depth']}/{render_stats['queue_size']}, "
+                  f"fetch waited {render_stats['backpressure_time']:.1f}s on a full queue")
+        if self.sitemap_reader is not None:
+            sitemap_stats = self.sitemap_reader.get_stats()
+            print(f"Sitemaps read: {sitemap_stats['sitemaps_read']} (failed: {sitemap_stats['sitemaps_failed']}), "
+                  f"URLs seeded: {self.crawl_stats.get('sitemap_urls', 0)}")
+        if self.text_writer is not None:
+            print(f"Text records written: {self.text_writer.records_written} "
+                  f"(shards in {self.text_writer.text_dir})")
+        telemetry_stats = self.telemetry.get_stats()
+        timings = [f"{stage} {timer['avg']:.2f}s/{timer['p95']:.2f}s"
+                   for stage, timer in telemetry_stats['stages'].items() if timer['count']]
+        if timings:
+            print(f"Stage timings (avg/p95): {', '.join(timings)}")
+        if telemetry_stats['errors']:
+            print("Errors: " + ", ".join(f"{error['stage']} {error['class']} x{error['count']}"
+                                         for error in telemetry_stats['errors']))
+        if self.content_store is not None:
+            store_stats = self.content_store.get_stats()
+            print(f"Deduplicated: {store_stats['exact_duplicates']} identical pages, "
+                  f"{store_stats['near_duplicates']} near-identical pages, "
+                  f"{store_stats['duplicate_files']} duplicate files "
+                  f"({store_stats['bytes_saved'] / 1024 / 1024:.1f} MB saved)")
+        if self.browser_pool is not None:
+            pool_stats = self.browser_pool.get_stats()
+            print(f"PDFs rendered by browser pool: {pool_stats['pages_rendered']} "
+                  f"({pool_stats['pages_per_second']:.2f} pages/sec, "
+                  f"avg {pool_stats['avg_render_time']:.2f}s, max {pool_stats['max_render_time']:.2f}s)")
+            print(f"Browser pool failures: {pool_stats['render_failures']}, "
+                  f"launches: {pool_stats['browser_launches']}, recycles: {pool_stats['context_recycles']}")
+            if 'asset_cache' in pool_stats:
+                cache_stats = pool_stats['asset_cache']
+                print(f"Asset cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+                      f"{cache_stats['bytes_served'] / 1024 / 1024:.1f} MB served from disk")
         print(f"Files saved to: {self.output_dir}")
         print("=" * 50)
     
     def save_crawl_report(self):
-        """Save crawl report as JSON"""
+        """
+        Finish the crawl report
+        
+        Page records were already streamed to crawl_report.jsonl; this appends the
+        summary line to it and writes the same summary to crawl_report.json.
+        """
         report = {
             'crawl_stats': self.crawl_stats,
-            'url_to_filename': self.url_to_filename,
-            'visited_urls': list(self.visited_urls)
+            'pdf_render_stats': self.browser_pool.get_stats() if self.browser_pool else None,
+            'attachment_stats': self.attachments.get_stats(),
+            'scheduler_stats': self.scheduler.get_stats(),
+            'content_store_stats': self.content_store.get_stats() if self.content_store else None,
+            'sitemap_stats': self.sitemap_reader.get_stats() if self.sitemap_reader else None,
+            'pipeline_stats': {
+                'fetch': self.fetch_meter.get_stats(),
+                'render': self.render_stage.get_stats() if self.render_stage else None
+            },
+            'telemetry': self.telemetry.get_stats(),
+            'visited_backend': self.visited_backend,
+            'output_format': self.output_format,
+            'text_records_written': self.text_writer.records_written if self.text_writer else 0,
+            'visited_urls_count': len(self.visited_urls)
         }
         
+        if self.report_writer is not None:
+            self.report_writer.write_summary(report)
+            self.report_writer.close()
+            print(f"Page records saved to: {self.report_writer.report_path}")
+        
         report_path = self.output_dir / 'crawl_report.json'
         with open(report_path, 'w') as f:
             json.dump(report, f, indent=2)
@@ -405,7 +1060,15 @@ def main():
 Examples:
   python ycrawl.py https://example.com
   python ycrawl.py https://example.com --output-dir ./my_pages --max-depth 5
+  python ycrawl.py https://example.com --concurrency 16 --per-host-concurrency 8
+  python ycrawl.py https://example.com --concurrency 32 --render-workers 8
   python ycrawl.py --set-api-key YOUR_API_KEY
+  python ycrawl.py https://example.com --output-dir ./my_pages --resume
+  python ycrawl.py https://example.com --output-dir ./my_pages --incremental
+  python ycrawl.py https://example.com --max-depth 10 --visited-backend bloom
+  python ycrawl.py https://example.com --output-format text
+  python ycrawl.py https://example.com --max-depth 5 --max-pages 1000
+  python ycrawl.py https://example.com --metrics-port 9108 --progress-interval 30
   python ycrawl.py --config-file my_config.json https://example.com
         """
     )
@@ -414,8 +1077,29 @@ Examples:
     parser.add_argument('--api-key', help='Firecrawl API key (overrides config file)')
     parser.add_argument('--output-dir', help='Output directory for HTML files (overrides config file)')
     parser.add_argument('--max-depth', type=int, help='Maximum crawl depth (overrides config file)')
+    parser.add_argument('--concurrency', type=int, help='Number of pages fetched in parallel (overrides config file)')
+    parser.add_argument('--per-host-concurrency', type=int, help='Maximum parallel requests per host (overrides config file)')
     parser.add_argument('--config-file', default='config.json', help='Configuration file path (default: config.json)')
     parser.add_argument('--set-api-key', help='Set API key in configuration file')
+    parser.add_argument('--resume', action='store_true', help='Resume the interrupted crawl saved in the output directory')
+    parser.add_argument('--incremental', action='store_true', default=None,
+                        help='Skip pages unchanged since the previous crawl (ETag/Last-Modified or content hash)')
+    parser.add_argument('--render-workers', type=int,
+                        help='Number of pages rendered to PDF in parallel (default: CPU count, overrides config file)')
+    parser.add_argument('--visited-backend', choices=VISITED_BACKENDS,
+                        help='How visited URLs are tracked: memory (exact), bloom (compact) or disk (overrides config file)')
+    parser.add_argument('--output-format', choices=OUTPUT_FORMATS,
+                        help='Save pages as PDFs, as extracted text in JSONL shards, or both (overrides config file)')
+    parser.add_argument('--max-pages', type=int,
+                        help='Stop after this many pages, crawling the highest-priority pages first (overrides config file)')
+    parser.add_argument('--progress-interval', type=float,
+                        help='Seconds between progress lines with ETA, 0 to disable (overrides config file)')
+    parser.add_argument('--metrics-file',
+                        help='File kept up to date with Prometheus-format metrics (overrides config file)')
+    parser.add_argument('--metrics-port', type=int,
+                        help='Serve /metrics and /progress on this local port (overrides config file)')
+    parser.add_argument('--no-sitemap', action='store_false', dest='use_sitemaps', default=None,
+                        help='Do not seed the crawl from sitemap.xml')
     
     args = parser.parse_args()
     
@@ -425,6 +1109,15 @@ Examples:
         config_manager.update_api_key(args.set_api_key)
         return
     
+    # When resuming without a URL, continue from the start URL saved with the crawl state
+    if args.resume and not args.url:
+        config_manager = ConfigManager(args.config_file)
+        state_path = Path(args.output_dir or config_manager.get("default_output_dir")) / 'crawl_state.db'
+        if state_path.exists():
+            state_store = CrawlStateStore(state_path)
+            args.url = state_store.get_meta('start_url')
+            state_store.close()
+    
     # Check if URL is provided
     if not args.url:
         parser.print_help()
@@ -442,11 +1135,22 @@ Examples:
         api_key=args.api_key,
         output_dir=args.output_dir,
         max_depth=args.max_depth,
-        config_file=args.config_file
+        config_file=args.config_file,
+        concurrency=args.concurrency,
+        per_host_concurrency=args.per_host_concurrency,
+        incremental=args.incremental,
+        visited_backend=args.visited_backend,
+        render_workers=args.render_workers,
+        output_format=args.output_format,
+        use_sitemaps=args.use_sitemaps,
+        max_pages=args.max_pages,
+        progress_interval=args.progress_interval,
+        metrics_file=args.metrics_file,
+        metrics_port=args.metrics_port
     )
     
     try:
-        crawler.crawl(args.url)
+        crawler.crawl(args.url, resume=args.resume)
     except KeyboardInterrupt:
         print("\nCrawl interrupted by user")
     except Exception as e: